@@ -1,6 +1,13 @@
 const express = require('express');
 const router = express.Router();
 const Content = require('../models/Content');
+const MLService = require('../services/mlService');
+
+// Keep the ML service's catalog current (fire and forget)
+function indexInML(content) {
+  MLService.indexContent([content.toObject()])
+    .catch((error) => console.error('ML content index error:', error.message));
+}
 
 // @route   GET /api/content
 // @desc    Get all content
@@ -56,6 +63,7 @@ router.post('/', async (req, res) => {
   try {
     const content = new Content(req.body);
     await content.save();
+    indexInML(content);
 
     res.status(201).json({
       success: true,
@@ -94,6 +102,7 @@ router.put('/:id', async (req, res) => {
     if (!content) {
       return res.status(404).json({ message: 'Content not found' });
     }
+    indexInML(content);
 
     res.json({
       success: true,
@@ -2,6 +2,23 @@ const express = require('express');
 const router = express.Router();
 const Interaction = require('../models/Interaction');
 const mongoose = require('mongoose');
+const MLService = require('../services/mlService');
+
+// Append a logged interaction to the ML service's stored history. When the
+// service has no state for the user (restart or eviction) nothing is stored,
+// so seed it from Mongo instead; the saved interaction is already included.
+async function syncMLState(userId, interaction) {
+  const result = await MLService.appendInteraction(userId, interaction);
+  if (!result.needsSeed) return;
+
+  const interactionHistory = await Interaction.find({ userId })
+    .sort({ timestamp: -1 })
+    .limit(20)
+    .lean();
+  interactionHistory.reverse(); // oldest first
+
+  await MLService.seedUserState(userId, interactionHistory);
+}
 
 // @route   POST /api/interactions/log
 // @desc    Log user interaction (Week 4 feature)
@@ -11,6 +28,10 @@ router.post('/log', async (req, res) => {
     const interaction = new Interaction(req.body);
     await interaction.save();
 
+    // Keep the ML service's per-user history current (fire and forget)
+    syncMLState(String(interaction.userId), interaction.toObject())
+      .catch((error) => console.error('ML state sync error:', error.message));
+
     res.status(201).json({
       success: true,
       message: 'Interaction logged successfully',
@@ -6,26 +6,40 @@ const MLService = require('../services/mlService');
 
 // @route   POST /api/interventions/check
 // @desc    Check if intervention is needed based on current session
+//          (send sessionId and sessionDelta - focus samples, idle seconds and
+//          errors since the previous check - to keep the break check incremental)
 // @access  Public
 router.post('/check', async (req, res) => {
   try {
-    const { userId, currentSession } = req.body;
+    const { userId, currentSession, sessionId, sessionDelta } = req.body;
+    const live = { sessionId, sessionDelta };
 
-    // Get recent interaction history
-    const interactionHistory = await Interaction.find({ userId })
-      .sort({ timestamp: -1 })
-      .limit(20)
-      .lean();
+    const user = await User.findById(userId);
+    const userRhythm = user?.learningRhythm || {};
 
-    // Check for struggle
-    const struggleData = await MLService.detectStruggle(currentSession, interactionHistory);
+    // Struggle, break and performance in one ML call using the service's
+    // stored history; seed it from Mongo only when the service has no
+    // state for this user yet
+    let tick = await MLService.sessionTick(userId, currentSession, userRhythm, null, null, live);
 
-    // Check for break needed
-    const user = await User.findById(userId);
-    const breakData = await MLService.getOptimalBreakTime(
-      currentSession,
-      user?.learningRhythm || {}
-    );
+    if (tick.historySource === 'none') {
+      const interactionHistory = await Interaction.find({ userId })
+        .sort({ timestamp: -1 })
+        .limit(20)
+        .lean();
+      interactionHistory.reverse(); // oldest first
+
+      await MLService.seedUserState(userId, interactionHistory);
+      // The first tick already took this sessionDelta; only re-run the history-based tasks
+      tick = { ...tick, ...await MLService.sessionTick(
+        userId, currentSession, userRhythm, interactionHistory,
+        sessionId ? ['struggle', 'performance'] : null
+      ) };
+    }
+
+    const struggleData = { success: tick.success, historySource: tick.historySource, ...tick.struggle };
+    const breakData = { success: tick.success, ...tick.break };
+    const performanceData = { success: tick.success, ...tick.performance };
 
     // Determine intervention priority
     let intervention = null;
@@ -71,7 +85,8 @@ router.post('/check', async (req, res) => {
       needsIntervention: intervention !== null,
       intervention,
       struggleData,
-      breakData
+      breakData,
+      performanceData
     });
 
   } catch (error) {
@@ -5,6 +5,25 @@ const Content = require('../models/Content');
 const Interaction = require('../models/Interaction');
 const MLService = require('../services/mlService');
 
+// Lessons picked by the ML service's candidate pipeline, re-read from Mongo
+// (in the pipeline's order) so deleted, inactive and completed ones drop out
+async function selectContent(user, interactions, features, formats, limit) {
+  const selection = await MLService.selectContent(user._id.toString(), features, {
+    recentContentIds: [...new Set(interactions.map(i => String(i.contentId)))],
+    formats,
+    limit: limit + user.completedLessons.length
+  });
+  const ids = (selection.content || []).map(item => String(item._id));
+  if (!ids.length) return [];
+
+  const content = await Content.find({
+    _id: { $in: ids, $nin: user.completedLessons },
+    isActive: true
+  });
+  const byId = new Map(content.map(c => [c._id.toString(), c]));
+  return ids.map(id => byId.get(id)).filter(Boolean).slice(0, limit);
+}
+
 // @route   GET /api/learning/recommendations/:userId
 // @desc    Get personalized content recommendations with ML
 // @access  Public
@@ -37,28 +56,41 @@ router.get('/recommendations/:userId', async (req, res) => {
     const difficultyRec = mlRecommendations.recommendations?.find(r => r.type === 'difficulty');
     const formatRec = mlRecommendations.recommendations?.find(r => r.type === 'format');
 
-    const query = {
-      isActive: true,
-      _id: { $nin: user.completedLessons }
-    };
+    const formats = formatRec && formatRec.value !== 'mixed' ? [formatRec.value] : undefined;
 
-    if (difficultyRec) {
-      query.difficulty = difficultyRec.value;
-    }
+    // Rank the whole catalog when the ML service has it; otherwise query
+    // the recommended difficulty and format
+    let recommendations = mlRecommendations.features
+      ? await selectContent(user, interactions, mlRecommendations.features, formats, 10)
+      : [];
+    const contentSource = recommendations.length ? 'candidate-pipeline' : 'query';
 
-    if (formatRec && formatRec.value !== 'mixed') {
-      query.format = formatRec.value;
-    }
+    if (!recommendations.length) {
+      const query = {
+        isActive: true,
+        _id: { $nin: user.completedLessons }
+      };
 
-    const recommendations = await Content.find(query)
-      .limit(10)
-      .sort({ createdAt: -1 });
+      if (difficultyRec) {
+        query.difficulty = difficultyRec.value;
+      }
+
+      if (formats) {
+        query.format = formats[0];
+      }
+
+      recommendations = await Content.find(query)
+        .limit(10)
+        .sort({ createdAt: -1 });
+    }
 
     res.json({
       success: true,
       count: recommendations.length,
       recommendations,
+      contentSource,
       mlInsights: mlRecommendations.recommendations,
+      mlLearningPath: mlRecommendations.learningPath,
       mlSource: mlRecommendations.source || 'ml-api'
     });
   } catch (error) {
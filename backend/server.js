@@ -4,6 +4,8 @@ const cors = require('cors');
 const helmet = require('helmet');
 const morgan = require('morgan');
 require('dotenv').config();
+const Content = require('./models/Content');
+const MLService = require('./services/mlService');
 
 const app = express();
 
@@ -25,7 +27,20 @@ const connectDB = async () => {
   }
 };
 
-connectDB();
+// Send the lesson catalog to the ML service (content index and candidate
+// pipeline); routes keep it current as lessons are created and edited
+const syncContentCatalog = async () => {
+  const content = await Content.find({ isActive: true }).lean();
+  for (let start = 0; start < content.length; start += 500) {
+    const result = await MLService.indexContent(content.slice(start, start + 500));
+    if (!result.success) return;
+  }
+  console.log(`📚 Synced ${content.length} lessons to the ML service`);
+};
+
+connectDB()
+  .then(syncContentCatalog)
+  .catch((error) => console.error('Content catalog sync error:', error.message));
 
 // Routes
 app.use('/api/users', require('./routes/userRoutes'));
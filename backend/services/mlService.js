@@ -100,11 +100,13 @@ class MLService {
   }
 
   // AI Adaptive Features (Feature #2 - Struggle Detection)
-  static async detectStruggle(currentSession, interactionHistory) {
+  // Pass interactionHistory = null with a userId to use the ML service's stored history
+  static async detectStruggle(currentSession, interactionHistory, userId) {
     try {
       const response = await axios.post(`${ML_API_URL}/api/ml/detect-struggle`, {
+        userId,
         currentSession,
-        interactionHistory
+        ...(interactionHistory ? { interactionHistory } : {})
       }, { timeout: 5000 });
       
       return response.data;
@@ -139,6 +141,81 @@ class MLService {
     }
   }
 
+  // Live session poll: struggle, break and performance analysis in one round trip
+  // Pass interactionHistory = null with a userId to use the ML service's stored history.
+  // live = { sessionId, sessionDelta } keeps the break analysis incremental: the delta
+  // holds only the focus samples, idle seconds and errors since the previous tick
+  static async sessionTick(userId, currentSession, userRhythm, interactionHistory, tasks, live) {
+    try {
+      const response = await axios.post(`${ML_API_URL}/api/ml/session-tick`, {
+        userId,
+        currentSession,
+        userRhythm,
+        ...(interactionHistory ? { interactionHistory } : {}),
+        ...(tasks ? { tasks } : {}),
+        ...(live?.sessionId ? { sessionId: live.sessionId, sessionDelta: live.sessionDelta || {} } : {})
+      }, { timeout: 5000 });
+      
+      return response.data;
+    } catch (error) {
+      console.error('ML Session Tick error:', error.message);
+      const duration = (currentSession?.duration || 0) / 60;
+      return { 
+        success: false, 
+        struggle: { isStruggling: false, suggestedInterventions: [] },
+        break: {
+          needsBreak: duration > 25,
+          message: duration > 25 ? 'Consider taking a break' : 'Keep going!',
+          suggestedDuration: 5
+        },
+        performance: { predictedScore: 70, confidence: 0.3 }
+      };
+    }
+  }
+
+  // Streaming struggle detection: forward raw session events (pause, rewind,
+  // error, help, focus) and get back any struggle-level changes they caused
+  static async streamSessionEvents(sessionId, events, expectedDuration) {
+    try {
+      const response = await axios.post(`${ML_API_URL}/api/ml/session-events`, {
+        sessionId,
+        events,
+        ...(expectedDuration ? { expectedDuration } : {})
+      }, { timeout: 3000 });
+      
+      return response.data;
+    } catch (error) {
+      console.error('ML Session Events error:', error.message);
+      return { success: false, changes: [] };
+    }
+  }
+
+  // Incremental break recommendation: send only the focus samples, idle
+  // seconds and errors since the previous call for this session
+  static async updateSessionFatigue(sessionId, delta, userRhythm) {
+    try {
+      const response = await axios.post(`${ML_API_URL}/api/ml/session-fatigue`, {
+        sessionId,
+        focusSamples: delta.focusSamples || [],
+        idleSeconds: delta.idleSeconds || 0,
+        errors: delta.errors || 0,
+        ...(delta.duration ? { duration: delta.duration } : {}),
+        userRhythm
+      }, { timeout: 3000 });
+
+      return response.data;
+    } catch (error) {
+      console.error('ML Session Fatigue error:', error.message);
+      const duration = (delta.duration || 0) / 60;
+      return {
+        success: false,
+        needsBreak: duration > 25,
+        message: duration > 25 ? 'Take a 5-minute break' : 'Keep going!',
+        suggestedDuration: 5
+      };
+    }
+  }
+
   // AI Adaptive Features (Feature #7 - Neurodiversity Detection)
   static async detectNeurodiversityPatterns(interactionHistory) {
     try {
@@ -159,11 +236,13 @@ class MLService {
   }
 
   // AI Adaptive Features (Feature #11 - Skill Mastery)
-  static async updateSkillMastery(currentMastery, interaction) {
+  // model: 'ema' (default) or 'bkt' (Bayesian Knowledge Tracing)
+  static async updateSkillMastery(currentMastery, interaction, model) {
     try {
       const response = await axios.post(`${ML_API_URL}/api/ml/update-skill-mastery`, {
         currentMastery,
-        interaction
+        interaction,
+        model
       }, { timeout: 5000 });
       
       return response.data;
@@ -177,6 +256,99 @@ class MLService {
     }
   }
 
+  // Spaced repetition: record new practice (optional) and get the skills due soonest
+  static async getReviewSchedule(userId, interactions, limit = 5) {
+    try {
+      const response = await axios.post(`${ML_API_URL}/api/ml/review-schedule`, {
+        userId,
+        ...(interactions ? { interactions } : {}),
+        limit
+      }, { timeout: 5000 });
+
+      return response.data;
+    } catch (error) {
+      console.error('ML Review Schedule error:', error.message);
+      return { success: false, nextReviews: [] };
+    }
+  }
+
+  // Spaced repetition: due reviews for a whole class in one call
+  static async getClassReviewQueues(userIds, limit = 5) {
+    try {
+      const response = await axios.post(`${ML_API_URL}/api/ml/review-schedule/class`, {
+        userIds,
+        limit
+      }, { timeout: 10000 });
+
+      return response.data;
+    } catch (error) {
+      console.error('ML Class Review Schedule error:', error.message);
+      return { success: false, count: 0, queues: {} };
+    }
+  }
+
+  // Content embeddings: index new/changed lessons and (optionally) who took them
+  static async indexContent(items, interactions) {
+    try {
+      const response = await axios.post(`${ML_API_URL}/api/ml/content-index`, {
+        items,
+        ...(interactions ? { interactions } : {})
+      }, { timeout: 30000 });
+
+      return response.data;
+    } catch (error) {
+      console.error('ML Content Index error:', error.message);
+      return { success: false, added: 0, interactionsRecorded: 0 };
+    }
+  }
+
+  // "More like this lesson"
+  static async getSimilarContent(contentId, limit = 5) {
+    try {
+      const response = await axios.post(`${ML_API_URL}/api/ml/similar-content`, {
+        contentId,
+        limit
+      }, { timeout: 5000 });
+
+      return response.data;
+    } catch (error) {
+      console.error('ML Similar Content error:', error.message);
+      return { success: false, similar: [] };
+    }
+  }
+
+  // Collaborative filtering: lessons similar students completed, per user
+  static async getCollaborativeCandidates(userIds, limit = 20) {
+    try {
+      const response = await axios.post(`${ML_API_URL}/api/ml/cf-candidates`, {
+        userIds,
+        limit
+      }, { timeout: 10000 });
+
+      return response.data;
+    } catch (error) {
+      console.error('ML Collaborative Candidates error:', error.message);
+      return { success: false, count: 0, candidates: {} };
+    }
+  }
+
+  // Two-stage selection: candidate generators, then adaptive re-ranking
+  // options: { recentContentIds, formats, subjects, limit }
+  static async selectContent(userId, userFeatures, options = {}) {
+    try {
+      const response = await axios.post(`${ML_API_URL}/api/ml/select-content`, {
+        userId,
+        userFeatures,
+        ...options
+      }, { timeout: 5000 });
+
+      return response.data;
+    } catch (error) {
+      console.error('ML Select Content error:', error.message);
+      return { success: false, content: [] };
+    }
+  }
+
   // AI Adaptive Features (Feature #5 - Adaptive UI)
   static async getAdaptiveUISettings(behaviorPatterns, currentSettings) {
     try {
@@ -218,6 +390,56 @@ class MLService {
     }
   }
 
+  // Server-side user state: append one new interaction to the ML service's history
+  static async appendInteraction(userId, interaction) {
+    try {
+      const response = await axios.post(`${ML_API_URL}/api/ml/state/append`, {
+        userId,
+        interaction
+      }, { timeout: 3000 });
+      
+      return response.data;
+    } catch (error) {
+      console.error('ML State Append error:', error.message);
+      return { success: false };
+    }
+  }
+
+  // Server-side user state: replace the stored history (oldest first)
+  static async seedUserState(userId, interactionHistory) {
+    try {
+      const response = await axios.post(`${ML_API_URL}/api/ml/state/seed`, {
+        userId,
+        interactionHistory
+      }, { timeout: 5000 });
+      
+      return response.data;
+    } catch (error) {
+      console.error('ML State Seed error:', error.message);
+      return { success: false };
+    }
+  }
+
+  // Batch scoring: performance, struggle and neurodiversity for many users in one call
+  // users: [{ userId, interactionHistory, currentSession }]
+  static async batchScore(users, tasks) {
+    try {
+      const response = await axios.post(`${ML_API_URL}/api/ml/batch`, {
+        users,
+        ...(tasks ? { tasks } : {})
+      }, { timeout: 30000 });
+      
+      return response.data;
+    } catch (error) {
+      console.error('ML Batch Scoring error:', error.message);
+      return { 
+        success: false, 
+        count: 0,
+        results: []
+      };
+    }
+  }
+
   // Fallback methods when ML service is unavailable
 
   static getFallbackRecommendations(userProfile) {
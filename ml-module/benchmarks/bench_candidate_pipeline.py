@@ -0,0 +1,86 @@
+"""
+Benchmark: two-stage candidate pipeline vs full-catalog scoring
+
+For catalogs growing 100x, times one student's selection with
+adaptive_content_selection over the whole catalog and with
+CandidatePipeline (subject, difficulty, collaborative and trending
+generators, then the same scorer; forced on at every size), reports
+p50/p99 and checks that both pick the same lessons. The pipeline scores
+catalogs below TWO_STAGE_MIN_ITEMS in full by default.
+
+Usage: python benchmarks/bench_candidate_pipeline.py [requests] [max_items]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from bench_content_selection import make_catalog, make_users
+
+from src.candidate_pipeline import GENERATORS, TWO_STAGE_MIN_ITEMS, CandidatePipeline
+from src.collaborative import CollaborativeFilter, implicit_strength
+from src.recommender import CONTENT_FORMATS, CONTENT_SUBJECTS, ContentCatalog, ContentRecommender
+
+
+def latencies(func, calls):
+    """Per-call wall times in ms"""
+    times = []
+    for args in calls:
+        begin = time.perf_counter()
+        func(*args)
+        times.append((time.perf_counter() - begin) * 1000)
+    return np.array(times)
+
+
+def main():
+    n_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    max_items = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    rng = np.random.default_rng(0)
+    recommender = ContentRecommender()
+    users = make_users(n_requests, rng)
+    student_ids = [f"student-{k}" for k in rng.integers(0, 2_000, n_requests)]
+
+    print(f"{'items':>9} {'full p50':>9} {'full p99':>9} {'pipe p50':>9} {'pipe p99':>9} {'ranked':>7} {'same':>6}")
+    n = max_items // 100
+    while n <= max_items:
+        items = make_catalog(n, rng)
+        catalog = ContentCatalog(items)
+        picks = rng.integers(0, n, 50_000)
+        cf = CollaborativeFilter.fit_interactions(
+            [f"student-{k}" for k in rng.integers(0, 2_000, len(picks))], [f"content-{k}" for k in picks],
+            implicit_strength(rng.uniform(30, 100, len(picks)), rng.uniform(40, 100, len(picks))),
+            factors=16, iterations=3)
+        pipeline = CandidatePipeline(items, collaborative=cf, two_stage_min_items=0)
+        pipeline.record_interactions([{'contentId': f"content-{k}"} for k in picks[:5_000]])
+
+        calls = []
+        for k, user in enumerate(users):
+            formats = [CONTENT_FORMATS[k % len(CONTENT_FORMATS)]] if k % 3 == 0 else None
+            subjects = [CONTENT_SUBJECTS[k % len(CONTENT_SUBJECTS)]] if k % 4 == 0 else None
+            recent = [f"content-{j}" for j in rng.integers(0, n, 5)]
+            calls.append((user, student_ids[k], recent, 5, formats, subjects))
+
+        full = latencies(lambda u, _, __, limit, f, s: recommender.adaptive_content_selection_batch(
+            [u], catalog, limit, f, s), calls)
+        pipe = latencies(pipeline.select, calls)
+        same = sum(pipeline.select(*call)[0] == recommender.adaptive_content_selection_batch(
+            [call[0]], catalog, call[3], call[4], call[5])[0] for call in calls)
+        ranked = np.mean([pipeline.select(*call)[1]['ranked'] for call in calls[:50]])
+        print(f"{n:>9,} {np.percentile(full, 50):>8.2f}ms {np.percentile(full, 99):>8.2f}ms "
+              f"{np.percentile(pipe, 50):>8.2f}ms {np.percentile(pipe, 99):>8.2f}ms {ranked:>7.0f} "
+              f"{same / len(calls):>6.0%}")
+        n *= 10
+
+    stages = {name: [] for name in GENERATORS + ('rank',)}
+    for call in calls:
+        for name, ms in pipeline.select(*call)[1]['timingsMs'].items():
+            stages[name].append(ms)
+    print('stage p99 at the largest catalog: ' + ', '.join(
+        f"{name} {np.percentile(ms, 99):.2f}ms (budget {pipeline.budgets_ms[name]:g})" for name, ms in stages.items()))
+    print(f"over budget: {dict(pipeline.over_budget) or 'none'}")
+    print(f"two-stage selection is used from {TWO_STAGE_MIN_ITEMS:,} items by default")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: cohort-wide neurodiversity scan
+
+Writes a synthetic JSON Lines export (users x interactions, interleaved
+as a real export would be), runs the scan job over it and compares a
+sample of users against per-user detect_neurodiversity_patterns.
+
+Usage: python benchmarks/bench_cohort_scan.py [users] [interactions_per_user] [workers]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from common import make_interactions
+
+from src.cohort_scan import load_columns, save_results, scan, user_result
+from src.predictor import PerformancePredictor
+from src.wire_format import json_dumps, json_loads
+
+
+def write_export(path, n_users, per_user, seed=0):
+    """JSON Lines export built from realistic rows with randomized user and behaviour fields"""
+    rng = np.random.default_rng(seed)
+    templates = make_interactions(2_000, seed=seed)
+    total = n_users * per_user
+    users = rng.permutation(np.repeat(np.arange(n_users), per_user))
+    picks = rng.integers(0, len(templates), total)
+    tabs = rng.poisson(rng.choice([1.5, 4.5], n_users))[users]
+    rewinds = rng.poisson(rng.choice([2.0, 5.0], n_users))[users]
+    with open(path, 'wb') as f:
+        for k in range(total):
+            row = dict(templates[picks[k]])
+            row['userId'] = f"user-{users[k]}"
+            row['behaviorMetrics'] = {'tabSwitches': int(tabs[k]), 'idleTime': 30}
+            row['mediaMetrics'] = dict(row['mediaMetrics'], rewindCount=int(rewinds[k]))
+            f.write(json_dumps(row) + b'\n')
+
+
+def main():
+    n_users = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'interactions.jsonl')
+        begin = time.perf_counter()
+        write_export(path, n_users, per_user)
+        print(f"{n_users:,} users x {per_user} interactions: "
+              f"{os.path.getsize(path) / 2**20:.0f} MiB export written in {time.perf_counter() - begin:.1f}s")
+
+        begin = time.perf_counter()
+        user_ids, columns = load_columns(path, workers)
+        loaded = time.perf_counter()
+        results = scan(user_ids, columns)
+        scanned = time.perf_counter()
+        out = os.path.join(tmp, 'results.npz')
+        save_results(out, results)
+        saved = time.perf_counter()
+        print(f"  {workers} worker(s): load+extract {loaded - begin:.1f}s, scan {scanned - loaded:.2f}s, "
+              f"write {saved - scanned:.2f}s -> total {saved - begin:.1f}s "
+              f"({os.path.getsize(out) / 2**20:.1f} MiB results)")
+
+        # Spot-check against the per-user path
+        predictor = PerformancePredictor()
+        rows = {}
+        sample = {f"user-{u}" for u in range(0, n_users, max(1, n_users // 200))}
+        with open(path, 'rb') as f:
+            for line in f:
+                row = json_loads(line)
+                if row['userId'] in sample:
+                    rows.setdefault(row['userId'], []).append(row)
+        keys = ('detectedPatterns', 'patternScores', 'confidence', 'needsMoreData')
+        mismatches = sum(
+            {k: v for k, v in predictor.detect_neurodiversity_patterns(history).items() if k in keys}
+            != user_result(results, user)
+            for user, history in rows.items()
+        )
+        print(f"  spot check: {len(rows)} users, {mismatches} differ from detect_neurodiversity_patterns")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: implicit-ALS collaborative filtering on millions of interactions
+
+Students and lessons each belong to one of a few dozen topics, and most
+of a student's interactions are with lessons of their topic. The
+interaction matrix is built, 20% of the pairs are held out, and ALS is
+trained on the rest. Reports build and training time, recall@10
+against a most-popular baseline and against the best possible topic
+model (within a topic, lessons are picked uniformly), and batch serving
+latency.
+
+Usage: python benchmarks/bench_collaborative.py [interactions] [students] [lessons]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from common import timeit
+
+from src.collaborative import (CollaborativeFilter, ImplicitALS, holdout, implicit_strength,
+                               interaction_matrix, recall_at_k)
+
+TOPICS = 50
+ON_TOPIC = 0.8
+
+
+def simulate(n, n_users, n_items, rng):
+    """Per-interaction user ids, content ids and strengths"""
+    user_topic = rng.integers(0, TOPICS, n_users)
+    item_topic = rng.integers(0, TOPICS, n_items)
+    by_topic = np.argsort(item_topic, kind='stable')
+    topic_start = np.searchsorted(item_topic[by_topic], np.arange(TOPICS))
+    topic_size = np.bincount(item_topic, minlength=TOPICS)
+
+    users = rng.integers(0, n_users, n)
+    topic = user_topic[users]
+    on_topic = by_topic[topic_start[topic] + (rng.random(n) * topic_size[topic]).astype(np.int64)]
+    items = np.where(rng.random(n) < ON_TOPIC, on_topic, rng.integers(0, n_items, n))
+    strength = implicit_strength(rng.uniform(30, 100, n), rng.uniform(40, 100, n))
+    return [f"student-{u}" for u in users.tolist()], [f"content-{i}" for i in items.tolist()], strength
+
+
+class Popularity:
+    """Most-popular baseline with ImplicitALS's recommend()"""
+
+    recommend = ImplicitALS.recommend
+
+    def __init__(self, matrix):
+        self.user_factors = np.ones((matrix.shape[0], 1), dtype=np.float32)
+        self.item_factors = np.asarray(matrix.getnnz(axis=0), dtype=np.float32)[:, None]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    n_users = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    n_items = int(sys.argv[3]) if len(sys.argv) > 3 else 20_000
+    rng = np.random.default_rng(0)
+    user_ids, content_ids, strength = simulate(n, n_users, n_items, rng)
+
+    begin = time.perf_counter()
+    matrix, users, contents = interaction_matrix(user_ids, content_ids, strength)
+    built = time.perf_counter() - begin
+    train, test = holdout(matrix)
+    print(f"{n:,} interactions -> {len(users):,} x {len(contents):,} matrix, {matrix.nnz:,} pairs "
+          f"in {built:.1f}s")
+
+    model = ImplicitALS(n_jobs=os.cpu_count())
+    begin = time.perf_counter()
+    model.fit(train)
+    trained = time.perf_counter() - begin
+    print(f"trained {model.factors} factors x {model.iterations} iterations on {train.nnz:,} pairs "
+          f"in {trained:.1f}s ({model.n_jobs} thread{'s' if model.n_jobs > 1 else ''})")
+
+    print(f"recall@10 on {test.nnz:,} held-out pairs: ALS {recall_at_k(model, train, test, 10):.4f}, "
+          f"most popular {recall_at_k(Popularity(train), train, test, 10):.4f} "
+          f"(chance {10 / len(contents):.4f}; a topic oracle gets ~{ON_TOPIC * 10 * TOPICS / len(contents):.4f})")
+
+    cf = CollaborativeFilter(model, train, users, contents)
+    batch = users[:1_000].tolist()
+    per_batch = timeit(lambda: cf.candidates(batch, limit=20), 3)
+    single = timeit(lambda: cf.candidates(batch[:1], limit=20), 20)
+    print(f"top-20 candidates: {single * 1e3:.2f}ms for one student, "
+          f"{per_batch * 1e3:.0f}ms for {len(batch):,} ({per_batch / len(batch) * 1e3:.2f}ms each)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: content embedding index ("more like this lesson")
+
+Builds a memory-mapped index over a synthetic catalog and reports build
+time, incremental add and interaction-recording cost, and k-NN query
+latency (p50/p99) at 1k/10k/100k lessons against the 5ms target. A
+co-occurrence check plants "courses" (lessons of one subject and
+difficulty always taken together) and measures how many of a lesson's
+top-10 neighbors come from its own course, before and after recording
+the interactions.
+
+Usage: python benchmarks/bench_content_index.py [students]
+"""
+
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bench_content_selection import make_catalog
+
+from src.content_index import ContentEmbeddingIndex
+
+COURSE_SIZE = 10
+
+
+def query_latency(index, rng, n, queries=200):
+    """p50 / p99 of similar() over random lessons, in ms"""
+    picks = rng.integers(0, n, queries)
+    times = []
+    for k in picks.tolist():
+        begin = time.perf_counter()
+        index.similar(f"content-{k}", 10)
+        times.append(time.perf_counter() - begin)
+    return np.percentile(times, 50) * 1e3, np.percentile(times, 99) * 1e3
+
+
+def main():
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    rng = np.random.default_rng(0)
+
+    print(f"{'lessons':>8} {'build':>8} {'add 1k':>8} {'p50':>7} {'p99':>7}")
+    for n in (1_000, 10_000, 100_000):
+        items = make_catalog(n + 1_000, rng)
+        for k, item in enumerate(items):
+            item['tags'] = [f"topic-{k % 200}"]
+        with tempfile.TemporaryDirectory() as path:
+            index = ContentEmbeddingIndex(path)
+            begin = time.perf_counter()
+            index.add(items[:n])
+            build = time.perf_counter() - begin
+            begin = time.perf_counter()
+            index.add(items[n:])
+            added = time.perf_counter() - begin
+            p50, p99 = query_latency(index, rng, n)
+            print(f"{n:>8,} {build * 1e3:>6.0f}ms {added * 1e3:>6.1f}ms {p50:>5.2f}ms {p99:>5.2f}ms")
+            del index
+
+    # Co-occurrence: courses of COURSE_SIZE lessons sharing subject and difficulty;
+    # each student takes one whole course
+    n = 100_000
+    items = make_catalog(n, rng)
+    index = ContentEmbeddingIndex()
+    index.add(items)
+    order = np.lexsort((rng.random(n), [i['difficulty'] for i in items], [i['subject'] for i in items]))
+    members = order.reshape(-1, COURSE_SIZE)
+    course_of = np.empty(n, dtype=np.int64)
+    course_of[order] = np.arange(n) // COURSE_SIZE
+    taken = rng.integers(0, len(members), students)
+    interactions = [{'userId': f"student-{s}", 'contentId': f"content-{lesson}"}
+                    for s, course in enumerate(taken.tolist()) for lesson in members[course].tolist()]
+    sample = members[np.unique(taken)[:200], 0].tolist()
+
+    def course_hits():
+        return np.mean([[course_of[int(hit['contentId'].split('-')[1])] == course_of[k]
+                         for hit in index.similar(f"content-{k}", 10)] for k in sample])
+
+    metadata_only = course_hits()
+    begin = time.perf_counter()
+    index.record_interactions(interactions)
+    recorded = time.perf_counter() - begin
+    print(f"\n{len(interactions):,} interactions from {students:,} students recorded in {recorded * 1e3:.0f}ms "
+          f"({recorded / len(interactions) * 1e6:.1f}us each)")
+    print(f"top-10 neighbors from the lesson's own course (9 possible): metadata only {metadata_only:.1%}, "
+          f"with interactions {course_hits():.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark: columnar InteractionBatch vs. per-method dict parsing
+
+For histories of 1k-100k interactions, compares a request that runs
+predict_performance, detect_struggle, detect_neurodiversity_patterns and
+DataPreprocessor.extract_features on the raw interaction list (each method
+parses it again) against parsing once into an InteractionBatch and
+sharing it.
+
+Usage: python benchmarks/bench_interaction_batch.py
+"""
+
+from common import make_interactions, timeit
+
+from src.interaction_batch import InteractionBatch
+from src.predictor import PerformancePredictor
+from src.preprocessor import DataPreprocessor
+
+SIZES = [1_000, 10_000, 100_000]
+SESSION = {'behaviorMetrics': {'pauseFrequency': 6}, 'focusLevel': 3, 'performance': {'score': 40}}
+
+
+def run_all(predictor, preprocessor, history):
+    predictor.predict_performance(history)
+    predictor.detect_struggle(SESSION, history)
+    predictor.detect_neurodiversity_patterns(history)
+    preprocessor.extract_features(history)
+
+
+def main():
+    predictor = PerformancePredictor()
+    preprocessor = DataPreprocessor()
+
+    print(f"{'interactions':>12} {'shared batch':>14} {'per-method':>12} {'speedup':>8}")
+    for n in SIZES:
+        interactions = make_interactions(n)
+        repeat = 5 if n <= 10_000 else 2
+
+        # Shared: parse once, every method reads the same cached columns
+        shared = timeit(lambda: run_all(predictor, preprocessor, InteractionBatch(interactions)), repeat)
+        per_method = timeit(lambda: run_all(predictor, preprocessor, interactions), repeat)
+        print(f"{n:>12,} {shared * 1000:>12.1f}ms {per_method * 1000:>10.1f}ms "
+              f"{per_method / shared:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
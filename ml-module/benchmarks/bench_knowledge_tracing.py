@@ -0,0 +1,110 @@
+"""
+Benchmark: Bayesian Knowledge Tracing fitting and batched updates
+
+Simulates students practicing a skill catalog under known per-skill BKT
+parameters, then:
+- fits the parameters back with batched EM and reports time and
+  recovery error
+- updates the mastery of a whole class in one batch, compared with a
+  scalar per-observation loop
+
+Usage: python benchmarks/bench_knowledge_tracing.py [skills] [students] [interactions_per_student]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+import common  # noqa: F401  (puts ml-module on sys.path)
+
+from src.knowledge_tracing import BayesianKnowledgeTracer, PARAM_NAMES
+from src.skill_mastery import SkillIndex, SkillMasteryArrays, skill_scores
+
+PARAM_RANGES = {'p_init': (0.05, 0.5), 'p_learn': (0.05, 0.3), 'p_guess': (0.05, 0.3), 'p_slip': (0.02, 0.2)}
+
+
+def simulate(n_skills, n_students, per_student, seed=0):
+    """Interaction logs generated from random true parameters"""
+    rng = np.random.default_rng(seed)
+    true = {name: rng.uniform(lo, hi, n_skills) for name, (lo, hi) in PARAM_RANGES.items()}
+    names = [f"skill-{k}" for k in range(n_skills)]
+    logs = []
+    for student in range(n_students):
+        known = rng.random(n_skills) < true['p_init']
+        skills = rng.integers(0, n_skills, per_student)
+        draws = rng.random((per_student, 2))
+        for k, (u_correct, u_learn) in zip(skills.tolist(), draws.tolist()):
+            p_correct = 1 - true['p_slip'][k] if known[k] else true['p_guess'][k]
+            correct = u_correct < p_correct
+            logs.append({'userId': f"student-{student}", 'skills': [names[k]],
+                         'performance': {'score': 90 if correct else 30}})
+            if not known[k] and u_learn < true['p_learn'][k]:
+                known[k] = True
+    return logs, true, names
+
+
+def scalar_update(tracer, mastery, interactions):
+    """Reference: one Python-level BKT update per observation"""
+    params = {name: tracer.params[name].tolist() for name in PARAM_NAMES}
+    for interaction in interactions:
+        correct = interaction['performance']['score'] / 100 >= tracer.correct_threshold
+        for skill in interaction['skills']:
+            k = tracer.index.intern(skill)
+            prior = mastery.get(skill, params['p_init'][k])
+            guess, slip, learn = params['p_guess'][k], params['p_slip'][k], params['p_learn'][k]
+            if correct:
+                posterior = prior * (1 - slip) / (prior * (1 - slip) + (1 - prior) * guess)
+            else:
+                posterior = prior * slip / (prior * slip + (1 - prior) * (1 - guess))
+            mastery[skill] = posterior + (1 - posterior) * learn
+
+
+def main():
+    n_skills = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    n_students = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    per_student = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    logs, true, names = simulate(n_skills, n_students, per_student)
+    print(f"{n_skills} skills, {n_students:,} students x {per_student} interactions ({len(logs):,} observations)")
+
+    index = SkillIndex()
+    index.intern_many(names)
+    tracer = BayesianKnowledgeTracer(index)
+    summary = tracer.fit(logs)
+    print(f"  EM fit: {summary['seconds']:.2f}s, {summary['iterations']} iterations, "
+          f"{summary['sequences']:,} (student, skill) sequences")
+    for name in PARAM_NAMES:
+        error = np.abs(tracer.params[name][:n_skills] - true[name])
+        print(f"    {name:<8} mean abs error {error.mean():.3f}")
+
+    # One batch for the whole class vs. a scalar loop
+    histories = [logs[s * per_student:(s + 1) * per_student] for s in range(n_students)]
+    states = [SkillMasteryArrays(index) for _ in histories]
+    begin = time.perf_counter()
+    tracer.update(states, histories)
+    batched = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    reference = []
+    for history in histories:
+        mastery = {}
+        scalar_update(tracer, mastery, history)
+        reference.append(mastery)
+    scalar = time.perf_counter() - begin
+
+    # Both paths must first read the interaction dicts
+    begin = time.perf_counter()
+    for history in histories:
+        skill_scores(history)
+    parsing = time.perf_counter() - begin
+
+    error = max(abs(float(state.mastery[index.intern(skill)]) - value)
+                for state, mastery in zip(states, reference) for skill, value in mastery.items())
+    print(f"  class update: batched {batched * 1000:.0f}ms vs scalar loop {scalar * 1000:.0f}ms "
+          f"({scalar / batched:.1f}x), max difference {error:.1e}")
+    print(f"    excluding {parsing * 1000:.0f}ms of dict parsing: batched {(batched - parsing) * 1000:.0f}ms "
+          f"vs scalar {(scalar - parsing) * 1000:.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
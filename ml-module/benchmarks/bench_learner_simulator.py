@@ -0,0 +1,72 @@
+"""
+Benchmark: vectorized learner simulation throughput and a policy sweep
+
+Reports learner-steps per second at several population sizes, against
+the cost of evaluating the break and difficulty policies one learner at
+a time (a lower bound for a per-learner simulation loop). Then compares
+the current hand-tuned thresholds with a few alternatives on the same
+simulated learners.
+
+Usage: python benchmarks/bench_learner_simulator.py [learners] [lessons]
+"""
+
+import sys
+
+import numpy as np
+
+from common import timeit
+
+from src.learner_simulator import LearnerSimulator, summarize
+from src.predictor import PerformancePredictor
+from src.recommender import ContentRecommender
+
+POLICIES = {
+    'current': {},
+    'recommender difficulty': {'difficulty': 'recommender'},
+    'advanced at 80 / 0.7': {'advanced_score': 80, 'advanced_completion': 0.7},
+    'intermediate at 60 / 0.5': {'intermediate_score': 60, 'intermediate_completion': 0.5},
+    'break at fatigue 0.6': {'fatigue_threshold': 0.6},
+    'mastery at 0.85': {'mastery_threshold': 0.85}
+}
+
+
+def scalar_policies(n):
+    """Break and difficulty decisions made one learner-step at a time"""
+    predictor = PerformancePredictor()
+    recommender = ContentRecommender()
+    rng = np.random.default_rng(0)
+    minutes, focus, scores = rng.uniform(0, 60, n).tolist(), rng.uniform(1, 10, n).tolist(), rng.uniform(0, 100, n).tolist()
+    rhythm = {'averageAttentionSpan': 20}
+    for k in range(n):
+        predictor._break_result(minutes[k], 8.0, focus[k], 0, 1, rhythm)
+        recommender.recommend_difficulty(scores[k], focus[k])
+
+
+def main():
+    n_learners = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    lessons = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    print(f"{'learners':>9} {'steps/s':>10}")
+    for n in (1_000, 10_000, n_learners):
+        simulator = LearnerSimulator(n)
+        elapsed = timeit(lambda: simulator.run(lessons=lessons), 2)
+        print(f"{n:>9,} {n * lessons / elapsed / 1e6:>9.2f}M")
+    per_step = timeit(lambda: scalar_policies(2_000), 2) / 2_000
+    print(f"per-learner policy calls alone: {1 / per_step / 1e6:.3f}M steps/s")
+
+    simulator = LearnerSimulator(n_learners)
+    print(f"\n{n_learners:,} learners x {lessons} lessons, median (p10-p90)")
+    print(f"{'policy':<26} {'ability gain':>18} {'skills':>12} {'mean score':>18} {'breaks':>12} {'dropout':>8}")
+    for name, policy in POLICIES.items():
+        summary = summarize(simulator.run(policy, lessons))
+
+        def cell(metric, digits=2):
+            s = summary[metric]
+            return f"{s['p50']:.{digits}f} ({s['p10']:.{digits}f}-{s['p90']:.{digits}f})"
+
+        print(f"{name:<26} {cell('abilityGain'):>18} {cell('skillsMastered', 0):>12} "
+              f"{cell('meanScore', 1):>18} {cell('breaks', 0):>12} {summary['dropped']['mean']:>8.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: materialized learning paths vs per-request recomputation
+
+Writes a synthetic export, materializes every user's recommendations,
+marks 1% of the users dirty and reruns the job incrementally, then
+compares a store lookup against recomputing /api/ml/recommend from the
+50 interactions the backend sends.
+
+Usage: python benchmarks/bench_learning_paths.py [users] [interactions_per_user]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from bench_cohort_scan import write_export
+from common import timeit
+
+from src.learning_paths import PATH_DTYPE, LearningPathStore, recommend, run
+from src.wire_format import json_loads
+
+PROFILE = {'learningStyle': 'visual', 'neurodiversityType': ['adhd']}
+
+
+def main():
+    n_users = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    per_user = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'interactions.jsonl')
+        write_export(path, n_users, per_user)
+        profiles = {f"user-{k}": PROFILE for k in range(n_users)}
+        store = LearningPathStore(os.path.join(tmp, 'store'))
+
+        begin = time.perf_counter()
+        result = run(store, path, profiles)
+        print(f"full run: {result['users']:,} users ({n_users * per_user:,} interactions) "
+              f"in {time.perf_counter() - begin:.1f}s, {PATH_DTYPE.itemsize} bytes per user")
+
+        dirty = [f"user-{k}" for k in rng.choice(n_users, n_users // 100, replace=False)]
+        store.mark_dirty(dirty)
+        begin = time.perf_counter()
+        result = run(store, path, profiles)
+        print(f"incremental run: {result['computed']:,} dirty users recomputed, {result['kept']:,} kept "
+              f"in {time.perf_counter() - begin:.1f}s")
+
+        with open(path, 'rb') as f:
+            history = [row for row in map(json_loads, f) if row['userId'] == 'user-0']
+        history = sorted(history, key=lambda row: row['timestamp'], reverse=True)[:50]  # as the backend queries
+        users = [f"user-{k}" for k in rng.integers(0, n_users, 1_000)]
+        assert store.get('user-0', PROFILE) == recommend(history, PROFILE)
+
+        lookup = timeit(lambda: [store.get(user, PROFILE) for user in users], 5) / len(users)
+        live = timeit(lambda: recommend(history, PROFILE), 20)
+        print(f"per request: store lookup {lookup * 1e6:.0f}us, recompute from {len(history)} interactions "
+              f"{live * 1e6:.0f}us ({live / lookup:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: online vs. batch performance prediction
+
+Replays a 10k-interaction history one interaction at a time. After each
+new interaction, the batch predictor rescans the whole history while the
+online state does an O(1) update and reads its statistics. It also reports
+the largest deviation of the online statistics from the batch ones.
+
+Usage: python benchmarks/bench_online_performance.py
+"""
+
+import time
+
+import numpy as np
+
+from common import make_interactions, timeit
+
+from src.interaction_batch import InteractionBatch
+from src.online_performance import OnlinePerformanceState
+from src.predictor import PerformancePredictor
+
+HISTORY = 10_000
+CHECKPOINTS = (1_000, 5_000, 10_000)
+
+
+def main():
+    predictor = PerformancePredictor()
+    interactions = make_interactions(HISTORY)
+
+    print(f"{'history':>8} {'batch predict':>14} {'online update+predict':>22} {'speedup':>8}")
+    for n in CHECKPOINTS:
+        history = interactions[:n]
+        state = OnlinePerformanceState.from_history(history[:-1])
+
+        batch = timeit(lambda: predictor.predict_performance(history), 20)
+
+        def online():
+            # Each run appends one more interaction; 200 extra do not change the cost
+            state.push(history[-1])
+            return predictor.predict_performance_online(state)
+
+        incremental = timeit(online, 200)
+        print(f"{n:>8,} {batch * 1000:>12.3f}ms {incremental * 1e6:>20.1f}us {batch / incremental:>7.0f}x")
+
+    # Full replay: total cost of predicting after every interaction
+    state = OnlinePerformanceState()
+    begin = time.perf_counter()
+    for interaction in interactions:
+        state.push(interaction)
+        predictor.predict_performance_online(state)
+    online_total = time.perf_counter() - begin
+    print(f"\nOnline replay of {HISTORY:,} interactions (predict after each): {online_total * 1000:.0f}ms "
+          f"({online_total / HISTORY * 1e6:.1f}us per interaction)")
+
+    # Agreement with the batch statistics
+    scores = InteractionBatch(interactions).score
+    snapshot = state.snapshot()
+    weighted = np.average(scores, weights=np.exp(np.linspace(-1, 0, len(scores))))
+    print(f"Max deviation from batch: weighted mean {abs(weighted - snapshot['weighted_score']):.2e}, "
+          f"mean {abs(scores.mean() - snapshot['overall_avg']):.2e}, "
+          f"variance {abs(scores.var() - snapshot['variance']):.2e}")
+    same = predictor.predict_performance(interactions) == predictor.predict_performance_online(state)
+    print(f"Identical prediction dict at {HISTORY:,}: {same}")
+
+
+if __name__ == '__main__':
+    main()
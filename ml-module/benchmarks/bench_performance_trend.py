@@ -0,0 +1,102 @@
+"""
+Benchmark: least-squares trend engine vs the last-3-vs-mean trend heuristic
+
+The bundled datasets hold one interaction per student, so trajectories
+are simulated. Starting levels are drawn from the dataset's scores, and
+each student gets a true slope (flat, rising or falling) plus noise.
+Both trend rules are scored against the true direction. The next score
+is forecast by the predictor's weighted mean and by the trend line, and
+the coverage of its 80% interval is checked. Update cost is timed per new
+score (streaming) and per batch of users (vectorized).
+
+Usage: python benchmarks/bench_performance_trend.py [users]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from common import load_dataset, timeit
+
+from src.performance_trend import STABLE_SLOPE, LinearTrend, trend_batch, trend_sums
+
+NOISE = 8.0  # points
+
+
+def simulate(n_users, rng):
+    """Score sequences (back to back), lengths, true slopes and each student's next score"""
+    base = np.array([(row.get('performance') or {}).get('score', 0) for row in load_dataset()], dtype=float)
+    lengths = rng.integers(3, 51, n_users)
+    kind = rng.integers(0, 3, n_users)
+    true_slope = np.where(kind == 0, 0.0, np.where(kind == 1, 1, -1) * rng.uniform(0.75, 2.5, n_users))
+    start = np.clip(rng.choice(base, n_users) + rng.normal(0, 5, n_users), 20, 80)
+
+    owner = np.repeat(np.arange(n_users), lengths + 1)
+    position = np.arange(len(owner)) - np.repeat(np.cumsum(lengths + 1) - (lengths + 1), lengths + 1)
+    values = np.clip(np.rint(start[owner] + true_slope[owner] * position + rng.normal(0, NOISE, len(owner))), 0, 100)
+    last = np.cumsum(lengths + 1) - 1
+    keep = np.ones(len(values), dtype=bool)
+    keep[last] = False
+    return values[keep], lengths, true_slope, values[last]
+
+
+def heuristic(scores, lengths):
+    """Current rule: last-3 mean vs overall mean, plus the predictor's weighted mean"""
+    labels_, predictions = [], []
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    for u in range(len(lengths)):
+        s = scores[offsets[u]:offsets[u + 1]]
+        labels_.append('improving' if s[-3:].mean() > s.mean() else 'declining')
+        predictions.append(np.average(s, weights=np.exp(np.linspace(-1, 0, len(s)))))
+    return np.array(labels_), np.array(predictions)
+
+
+def main():
+    n_users = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    rng = np.random.default_rng(0)
+    scores, lengths, true_slope, next_score = simulate(n_users, rng)
+    truth = np.where(true_slope > STABLE_SLOPE, 'improving', np.where(true_slope < -STABLE_SLOPE, 'declining', 'stable'))
+
+    old_labels, old_prediction = heuristic(scores, lengths)
+    estimates = trend_batch(scores, lengths, k=1)
+    new_labels = np.array([e['direction'] for e in estimates])
+    points = np.array([e['forecast'][0] for e in estimates])
+    lower, upper = np.array([e['interval'][0] for e in estimates]).T
+
+    print(f"{n_users:,} simulated students, {len(scores):,} scores (3-50 per student, noise sd {NOISE:g})")
+    print(f"{'':<22} {'heuristic':>10} {'trend':>8}")
+    print(f"{'direction accuracy':<22} {np.mean(old_labels == truth):>10.1%} {np.mean(new_labels == truth):>8.1%}")
+    trending = truth != 'stable'
+    print(f"{'  trending students':<22} {np.mean(old_labels[trending] == truth[trending]):>10.1%} "
+          f"{np.mean(new_labels[trending] == truth[trending]):>8.1%}")
+    print(f"{'next-score MAE':<22} {np.mean(np.abs(old_prediction - next_score)):>10.2f} "
+          f"{np.mean(np.abs(points - next_score)):>8.2f}")
+    covered = (next_score >= lower) & (next_score <= upper)
+    print(f"{'80% interval coverage':<22} {'-':>10} {np.mean(covered):>8.1%}")
+
+    # Streaming: one new score for a student with a 50-score history
+    history = scores[:50] if lengths[0] >= 50 else np.resize(scores, 50)
+    trend = LinearTrend.from_scores(history)
+    recompute = timeit(lambda: (history[-3:].mean() > history.mean(),
+                                np.average(history, weights=np.exp(np.linspace(-1, 0, len(history))))), 200)
+    incremental = timeit(lambda: trend.add(70.0), 200)
+    print(f"\nper new score (50-score history): recompute {recompute * 1e6:.1f}us, "
+          f"trend update {incremental * 1e6:.2f}us")
+
+    # Batch: every student's trend state at once vs one LinearTrend per student
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    sample = min(n_users, 2_000)
+    begin = time.perf_counter()
+    for u in range(sample):
+        LinearTrend.from_scores(scores[offsets[u]:offsets[u + 1]])
+    per_user = (time.perf_counter() - begin) / sample * n_users
+    owner = np.repeat(np.arange(n_users), lengths)
+    age = offsets[1:][owner] - 1 - np.arange(len(owner))
+    sums = timeit(lambda: trend_sums(scores, owner, age, n_users), 3)
+    full = timeit(lambda: trend_batch(scores, lengths), 3)
+    print(f"all {n_users:,} students: trend state {sums * 1e3:.1f}ms vectorized vs ~{per_user * 1e3:.0f}ms "
+          f"per student; with fits and response dicts {full * 1e3:.0f}ms")
+
+if __name__ == '__main__':
+    main()
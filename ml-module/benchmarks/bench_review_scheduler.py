@@ -0,0 +1,82 @@
+"""
+Benchmark: "what should I review next" with SM-2 heaps
+
+For one student with a growing number of practiced skills, compares a
+full scan (SkillMasteryArrays.recommendations, which examines every
+skill) with popping the next reviews off the student's due-time heap.
+Then schedules a class of students, computes everyone's due list in
+one call and reports the saved state size.
+
+Usage: python benchmarks/bench_review_scheduler.py [class_size] [skills_per_student]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from common import timeit
+
+from src.review_scheduler import ReviewScheduler
+from src.skill_mastery import SkillMasteryArrays
+
+DAY = 86400
+
+
+def practice(rng, n_skills, n_interactions, prefix='skill'):
+    skills = rng.integers(0, n_skills, n_interactions)
+    scores = rng.integers(20, 101, n_interactions)
+    return [{'skills': [f"{prefix}-{s}"], 'performance': {'score': int(score)}}
+            for s, score in zip(skills.tolist(), scores.tolist())]
+
+
+def main():
+    class_size = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    per_student = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = np.random.default_rng(0)
+    now = time.time()
+
+    print(f"{'skills':>8} {'full scan':>10} {'heap (5)':>9}")
+    for n_skills in (100, 1_000, 10_000, 100_000):
+        history = practice(rng, n_skills, 2 * n_skills)
+        mastery = SkillMasteryArrays()
+        mastery.update_many(history, now=now - 10 * DAY)
+        scheduler = ReviewScheduler()
+        scheduler.review('student', history, now=now - 10 * DAY)
+
+        scan = timeit(lambda: mastery.recommendations(k=5, now=now), 20)
+        heap = timeit(lambda: scheduler.next_reviews('student', limit=5, now=now), 20)
+        print(f"{n_skills:>8,} {scan * 1e6:>8.0f}us {heap * 1e6:>7.0f}us")
+
+    # A class: each student practiced over the past month
+    scheduler = ReviewScheduler()
+    users = [f"student-{k}" for k in range(class_size)]
+    begin = time.perf_counter()
+    for user in users:
+        for day in range(30):
+            scheduler.review(user, practice(rng, 5 * per_student, per_student // 30 + 1),
+                             now=now - (30 - day) * DAY)
+    reviewed = time.perf_counter() - begin
+    stats = scheduler.stats()
+
+    batch = timeit(lambda: scheduler.class_due(users, limit=10, now=now), 5)
+    one_by_one = timeit(lambda: [scheduler.next_reviews(user, limit=10, now=now) for user in users], 5)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'reviews.npz')
+        scheduler.save(path)
+        size = os.path.getsize(path)
+        begin = time.perf_counter()
+        ReviewScheduler.load(path)
+        loaded = time.perf_counter() - begin
+
+    print(f"\nclass of {class_size}: {stats['cards']:,} cards scheduled in {reviewed:.2f}s")
+    print(f"  class due lists: {batch * 1e3:.1f}ms in one call "
+          f"({one_by_one * 1e3:.1f}ms for per-student next reviews)")
+    print(f"  saved state: {size / 1024:.0f} KiB ({size / stats['cards']:.1f} bytes/card), "
+          f"loaded in {loaded * 1e3:.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: break-recommendation cost as a session grows
+
+A client polls every 30 seconds for 90 minutes, sending one focus sample
+per poll. The stateless path receives the whole focusLevelTimeline each
+time (decoded from JSON, as the endpoint does). The incremental path
+sends only the new sample to the server-side fatigue state. Reports the
+cost per poll at several points in the session.
+
+Usage: python benchmarks/bench_session_fatigue.py
+"""
+
+import json
+
+import numpy as np
+
+from common import timeit
+
+from src.predictor import PerformancePredictor
+from src.session_fatigue import FatigueTracker
+
+POLL_SECONDS = 30
+CHECKPOINTS = (1, 30, 60, 90)  # minutes
+
+
+def main():
+    predictor = PerformancePredictor()
+    rhythm = {'averageAttentionSpan': 20, 'preferredBreakInterval': 25}
+    rng = np.random.default_rng(0)
+    levels = np.clip(rng.normal(7, 1.5, 90 * 60 // POLL_SECONDS), 1, 10).round().astype(int).tolist()
+
+    tracker = FatigueTracker()
+    print(f"{'minute':>6} {'timeline':>9} {'full timeline':>14} {'incremental':>12}")
+    for minute in CHECKPOINTS:
+        n = minute * 60 // POLL_SECONDS
+        timeline = [{'level': level, 'timestamp': f"2025-01-01T10:{k // 2 % 60:02d}:00"}
+                    for k, level in enumerate(levels[:n])]
+        body = json.dumps({'sessionData': {'duration': minute * 60,
+                                           'attentionMetrics': {'focusLevelTimeline': timeline}},
+                           'userRhythm': rhythm})
+        delta = json.dumps({'sessionId': 's', 'focusSamples': timeline[-1:], 'userRhythm': rhythm})
+
+        def stateless():
+            data = json.loads(body)
+            return predictor.calculate_optimal_break_time(data['sessionData'], data['userRhythm'])
+
+        def incremental():
+            data = json.loads(delta)
+            state = tracker.ingest('s', data['focusSamples'], duration=minute * 60)
+            return predictor.calculate_optimal_break_time_online(state, data['userRhythm'])
+
+        full = timeit(stateless, 200)
+        online = timeit(incremental, 200)
+        print(f"{minute:>6} {n:>9} {full * 1e6:>12.1f}us {online * 1e6:>10.1f}us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark: array-backed vs. dict-based skill mastery
+
+A catalog of several hundred skills and a class of students, each with
+a backlog of tagged interactions. Compares the per-interaction dict
+update plus full-sort recommendations (the previous SkillMasteryTracker
+logic, reproduced below) with SkillMasteryArrays' batched update and
+argpartition top-k, and reports the largest mastery difference (float32
+storage).
+
+Usage: python benchmarks/bench_skill_mastery.py [skills] [students] [interactions_per_student]
+"""
+
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import common  # noqa: F401  (puts ml-module on sys.path)
+
+from src.skill_mastery import SkillIndex, SkillMasteryArrays
+
+
+def dict_update(mastery, interaction, alpha=0.3):
+    """Reference: the per-interaction dict update"""
+    score = interaction.get('performance', {}).get('score', 0) / 100
+    for skill in interaction.get('skills', []):
+        entry = mastery.get(skill)
+        if entry is None:
+            mastery[skill] = {'masteryLevel': score, 'practiceCount': 1,
+                              'averageScore': score, 'lastPracticed': datetime.now()}
+        else:
+            count = entry['practiceCount'] + 1
+            mastery[skill] = {
+                'masteryLevel': min(1.0, entry['masteryLevel'] * (1 - alpha) + score * alpha),
+                'practiceCount': count,
+                'averageScore': (entry['averageScore'] * entry['practiceCount'] + score) / count,
+                'lastPracticed': datetime.now()
+            }
+
+
+def dict_recommendations(mastery, threshold=0.75):
+    """Reference: build every recommendation, sort, keep ten"""
+    recommendations = []
+    for skill, data in mastery.items():
+        m = data['masteryLevel']
+        days_since = (datetime.now() - data['lastPracticed']).days
+        if m < 0.5:
+            priority = 'high'
+        elif m < threshold or days_since > 7:
+            priority = 'medium'
+        else:
+            priority = 'low'
+        recommendations.append({'skill': skill, 'masteryLevel': round(m, 2),
+                                'priority': priority, 'daysSincePractice': days_since})
+    order = {'high': 3, 'medium': 2, 'low': 1}
+    recommendations.sort(key=lambda x: (order[x['priority']], -x['masteryLevel']), reverse=True)
+    return recommendations[:10]
+
+
+def make_backlog(n_skills, n_students, per_student, seed=0):
+    rng = np.random.default_rng(seed)
+    names = [f"skill-{i:04d}" for i in range(n_skills)]
+    popularity = rng.permutation(1.0 / np.arange(1, n_skills + 1) ** 0.8)  # Zipf-like
+    popularity /= popularity.sum()
+    backlog = []
+    for _ in range(n_students):
+        tags = rng.choice(n_skills, (per_student, 3), p=popularity)
+        scores = rng.integers(20, 101, per_student)
+        backlog.append([
+            {'skills': list({names[t] for t in row}), 'performance': {'score': int(s)}}
+            for row, s in zip(tags.tolist(), scores.tolist())
+        ])
+    return backlog
+
+
+def main():
+    n_skills = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    n_students = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    per_student = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    backlog = make_backlog(n_skills, n_students, per_student)
+    print(f"{n_skills} skills, {n_students:,} students x {per_student} interactions")
+
+    begin = time.perf_counter()
+    dict_states = []
+    for interactions in backlog:
+        mastery = {}
+        for interaction in interactions:
+            dict_update(mastery, interaction)
+        dict_states.append(mastery)
+    dict_update_time = time.perf_counter() - begin
+    begin = time.perf_counter()
+    for mastery in dict_states:
+        dict_recommendations(mastery)
+    dict_rec_time = time.perf_counter() - begin
+
+    index = SkillIndex()
+    begin = time.perf_counter()
+    array_states = []
+    for interactions in backlog:
+        arrays = SkillMasteryArrays(index)
+        arrays.update_many(interactions)
+        array_states.append(arrays)
+    array_update_time = time.perf_counter() - begin
+    begin = time.perf_counter()
+    for arrays in array_states:
+        arrays.recommendations()
+    array_rec_time = time.perf_counter() - begin
+
+    print(f"  {'':<16} {'dict':>10} {'arrays':>10} {'speedup':>8}")
+    for label, slow, fast in (('update', dict_update_time, array_update_time),
+                              ('recommend top-10', dict_rec_time, array_rec_time)):
+        print(f"  {label:<16} {slow * 1000:>8.0f}ms {fast * 1000:>8.0f}ms {slow / fast:>7.1f}x")
+
+    # Round trip through the API's dict format
+    begin = time.perf_counter()
+    for mastery in dict_states[:200]:
+        SkillMasteryArrays.from_dict(mastery, index).to_dict()
+    edge = (time.perf_counter() - begin) / min(200, n_students)
+    print(f"  dict <-> arrays round trip: {edge * 1e6:.0f}us per student")
+
+    error = max(
+        abs(entry['masteryLevel'] - float(arrays.mastery[index.intern(skill)]))
+        for mastery, arrays in zip(dict_states, array_states)
+        for skill, entry in mastery.items()
+    )
+    held = sum(a.mastery.nbytes + a.average_score.nbytes + a.practice_count.nbytes + a.last_practiced.nbytes
+               for a in array_states)
+    print(f"  max mastery difference: {error:.1e}; array state {held / n_students:,.0f} bytes per student")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: streaming struggle detector throughput and memory
+
+Simulates tens of thousands of concurrent live sessions. Each receives
+a random mix of pause/rewind/error/help/focus events over half an hour,
+and the events of all sessions are interleaved in time order. Reports
+events per second for single-event and small-batch delivery, and the
+memory held per session.
+
+Usage: python benchmarks/bench_struggle_stream.py [sessions] [events_per_session]
+"""
+
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import common  # noqa: F401  (puts ml-module on sys.path)
+
+from src.struggle_stream import StruggleStream
+
+EVENT_KINDS = np.array(['pause', 'rewind', 'error', 'help', 'focus'])
+KIND_WEIGHTS = [0.35, 0.2, 0.15, 0.05, 0.25]
+
+
+def make_events(n_sessions, per_session, seed=0):
+    """Interleaved (session_id, event) pairs in time order"""
+    rng = np.random.default_rng(seed)
+    total = n_sessions * per_session
+    sessions = np.repeat(np.arange(n_sessions), per_session)
+    times = 1_700_000_000 + rng.uniform(0, 1800, total)
+    kinds = rng.choice(len(EVENT_KINDS), total, p=KIND_WEIGHTS)
+    values = rng.integers(1, 11, total)
+    order = np.argsort(times, kind='stable')
+
+    events = []
+    for i in order:
+        event = {'type': EVENT_KINDS[kinds[i]], 'timestamp': float(times[i])}
+        if kinds[i] == 4:
+            event['value'] = int(values[i])
+        events.append((f"session-{sessions[i]}", event))
+    return events
+
+
+def run(events, batch_size):
+    stream = StruggleStream()
+    changes = 0
+    begin = time.perf_counter()
+    if batch_size == 1:
+        for session_id, event in events:
+            changes += len(stream.process(session_id, (event,)))
+    else:
+        # Group consecutive runs per session, as a client flushing every few events would
+        pending = {}
+        for session_id, event in events:
+            queue = pending.setdefault(session_id, [])
+            queue.append(event)
+            if len(queue) >= batch_size:
+                changes += len(stream.process(session_id, queue))
+                pending[session_id] = []
+        for session_id, queue in pending.items():
+            if queue:
+                changes += len(stream.process(session_id, queue))
+    elapsed = time.perf_counter() - begin
+    return stream, elapsed, changes
+
+
+def main():
+    n_sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    per_session = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    events = make_events(n_sessions, per_session)
+    print(f"{n_sessions:,} concurrent sessions, {len(events):,} events")
+
+    for batch_size in (1, 10):
+        stream, elapsed, changes = run(events, batch_size)
+        print(f"  batch of {batch_size:>2}: {len(events) / elapsed:>10,.0f} events/s "
+              f"({elapsed:.2f}s, {changes:,} level changes, {stream.stats()['sessions']:,} sessions)")
+
+    # Memory on a smaller sample (tracing allocations is slow)
+    sample_sessions = min(n_sessions, 2_000)
+    sample = make_events(sample_sessions, per_session, seed=1)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    stream = StruggleStream()
+    for session_id, event in sample:
+        stream.process(session_id, (event,))
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"  memory: {held / sample_sessions:,.0f} bytes per session "
+          f"(ring of {stream.n_buckets} buckets, independent of event count)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: timestamp decoding
+
+Decodes 100k interaction timestamps in the formats clients send (naive
+ISO strings, JavaScript's 'Z'-suffixed toISOString output, strings with
+a UTC offset, and a mixed column with datetimes and gaps). Compares the
+per-value datetime.fromisoformat loop the hour and session-frequency
+features used before with the vectorized decoder, and checks that both
+give the same hours and study days.
+
+Usage: python benchmarks/bench_timestamps.py [rows]
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from common import timeit
+
+from src.timestamps import MISSING, US_PER_DAY, decode_timestamps, hour_of_day
+
+
+def per_value(values):
+    """Hours and distinct days the way the features computed them before"""
+    dates = []
+    for ts in values:
+        if isinstance(ts, str):
+            try:
+                dates.append(datetime.fromisoformat(ts.replace('Z', '+00:00')))
+            except ValueError:
+                dates.append(None)
+        else:
+            dates.append(ts)
+    hours = [d.hour if d else None for d in dates]
+    days = {d.date() for d in dates if d}
+    return hours, days
+
+
+def vectorized(values):
+    epoch = decode_timestamps(values)
+    present = epoch != MISSING
+    return hour_of_day(epoch), set((epoch[present] // US_PER_DAY).tolist()), present
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(0)
+    start = datetime(2025, 1, 1)
+    moments = [start + timedelta(seconds=int(s)) for s in np.sort(rng.integers(0, 180 * 86400, n))]
+
+    mixed = [m.isoformat() for m in moments]
+    for k in rng.choice(n, n // 10, replace=False):
+        mixed[k] = moments[k] if k % 2 else None
+
+    columns = {
+        'naive ISO': [m.isoformat() for m in moments],
+        "ISO + 'Z'": [m.isoformat(timespec='milliseconds') + 'Z' for m in moments],
+        'ISO +05:30': [m.isoformat() + '+05:30' for m in moments],
+        'mixed/gaps': mixed,
+    }
+
+    epoch_day = datetime(1970, 1, 1).date()
+    print(f"{n:,} timestamps")
+    print(f"{'format':<12} {'fromisoformat':>14} {'vectorized':>11} {'speedup':>8}  check")
+    for name, values in columns.items():
+        before = timeit(lambda: per_value(values), 3)
+        after = timeit(lambda: decode_timestamps(values), 3)
+
+        hours, days = per_value(values)
+        new_hours, new_days, present = vectorized(values)
+        same = ([h for h in hours if h is not None] == new_hours[present].tolist()
+                and {(d - epoch_day).days for d in days} == new_days)
+        print(f"{name:<12} {before * 1e3:>12.1f}ms {after * 1e3:>9.1f}ms {before / after:>7.1f}x  "
+              f"{'ok' if same else 'MISMATCH'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: request/response codecs for large interaction histories
+
+Compares the stdlib json module, orjson and MessagePack on
+predict-performance payloads built from all_interactions.json: encode
+and decode time and body size, then a full request through the Flask
+test client with the stock JSON provider, the orjson provider, and
+MessagePack in both directions.
+
+Usage: python benchmarks/bench_wire_format.py
+"""
+
+import json
+import os
+
+os.environ.setdefault('ML_LAZY_STARTUP', '1')
+
+from common import make_interactions, timeit
+
+from flask.json.provider import DefaultJSONProvider
+
+import ml_api
+from src import wire_format
+
+SIZES = [100, 1_000, 10_000]
+ROUTE = '/api/ml/predict-performance'
+
+
+def codecs():
+    yield 'json (stdlib)', lambda o: json.dumps(o).encode('utf-8'), json.loads
+    if wire_format.orjson is not None:
+        yield 'orjson', wire_format.json_dumps, wire_format.json_loads
+    if wire_format.msgpack_available():
+        yield 'msgpack', wire_format.msgpack_dumps, wire_format.msgpack_loads
+
+
+def bench_codecs(payload, repeat):
+    for name, dumps, loads in codecs():
+        body = dumps(payload)
+        encode = timeit(lambda: dumps(payload), repeat)
+        decode = timeit(lambda: loads(body), repeat)
+        print(f"  {name:<16} encode {encode * 1000:8.2f}ms  decode {decode * 1000:8.2f}ms  "
+              f"{len(body) / 1024:9.1f} KiB")
+
+
+def bench_requests(client, payload, repeat):
+    json_body = json.dumps(payload)
+    cases = [('json, stock provider', DefaultJSONProvider(ml_api.app),
+              dict(data=json_body, content_type='application/json'))]
+    if wire_format.orjson is not None:
+        cases.append(('json, orjson provider', ml_api.WireJSONProvider(ml_api.app),
+                      dict(data=json_body, content_type='application/json')))
+    if wire_format.msgpack_available():
+        cases.append(('msgpack', ml_api.WireJSONProvider(ml_api.app),
+                      dict(data=wire_format.msgpack_dumps(payload), content_type='application/msgpack',
+                           headers={'Accept': 'application/msgpack'})))
+
+    original = ml_api.app.json
+    try:
+        for name, provider, kwargs in cases:
+            ml_api.app.json = provider
+            assert client.post(ROUTE, **kwargs).status_code == 200
+            seconds = timeit(lambda: client.post(ROUTE, **kwargs), repeat)
+            print(f"  {name:<22} {seconds * 1000:8.2f}ms per request")
+    finally:
+        ml_api.app.json = original
+
+
+def main():
+    client = ml_api.app.test_client()
+    for n in SIZES:
+        repeat = 20 if n < 10_000 else 5
+        payload = {'userId': 'bench-user', 'interactionHistory': make_interactions(n)}
+        print(f"\n{n:,} interactions")
+        bench_codecs(payload, repeat)
+        bench_requests(client, payload, repeat)
+
+
+if __name__ == '__main__':
+    main()
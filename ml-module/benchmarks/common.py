@@ -0,0 +1,58 @@
+"""
+Shared helpers for the ml-module benchmarks
+
+Synthetic histories are built from the real rows in
+datasets/processed/all_interactions.json, with the behaviour/media
+metrics the backend adds filled in from plausible distributions.
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+ML_MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ML_MODULE_DIR)
+
+DATASET_PATH = os.path.join(ML_MODULE_DIR, 'datasets', 'processed', 'all_interactions.json')
+
+
+def load_dataset():
+    with open(DATASET_PATH, 'r') as f:
+        return json.load(f)
+
+
+def make_interactions(n, seed=42):
+    """n realistic interaction dicts (dataset rows + synthetic extra metrics)"""
+    rng = np.random.default_rng(seed)
+    base = load_dataset()
+    picks = rng.integers(0, len(base), n)
+    start = datetime(2025, 1, 1)
+    offsets = np.sort(rng.integers(0, 180 * 24 * 3600, n))
+
+    interactions = []
+    for k, idx in enumerate(picks):
+        row = dict(base[idx])
+        row['timestamp'] = (start + timedelta(seconds=int(offsets[k]))).isoformat()
+        row['contentType'] = 'text' if rng.random() < 0.4 else 'video'
+        row['sessionDuration'] = int(rng.integers(5, 60))
+        row['completed'] = bool(row.get('completionRate', 0) >= 80)
+        row['behaviorMetrics'] = {'tabSwitches': int(rng.poisson(2)), 'idleTime': int(rng.integers(0, 120))}
+        row['mediaMetrics'] = {'rewindCount': int(rng.poisson(2)),
+                               'averagePlaybackSpeed': float(rng.choice([0.75, 1.0, 1.25]))}
+        row['attentionMetrics'] = {'attentionSpan': int(rng.integers(5, 40))}
+        interactions.append(row)
+    return interactions
+
+
+def timeit(func, repeat=5):
+    """Best-of-N wall time in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - begin)
+    return best
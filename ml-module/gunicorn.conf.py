@@ -0,0 +1,103 @@
+"""
+NeuroLearn ML API - Gunicorn configuration
+Production multi-worker serving with models preloaded before fork
+
+ml_api is imported once in the master process (preload_app), so the
+sklearn models and predictor objects are loaded a single time and shared
+copy-on-write by every forked worker. gc.freeze() moves everything
+allocated during preload out of the collector's reach so garbage
+collection in the workers does not touch (and copy) those pages.
+
+Every setting can be overridden through the environment:
+
+    ML_BIND              host:port to listen on        (0.0.0.0:5001)
+    ML_WORKERS           worker processes              (1, see below)
+    ML_THREADS           threads per worker            (4)
+    ML_TIMEOUT           request timeout, seconds      (30)
+    ML_GRACEFUL_TIMEOUT  drain time on restart, secs   (30)
+    ML_MAX_REQUESTS      recycle a worker after N reqs (10000, 0 = never)
+
+Graceful restarts: `kill -HUP <master>` replaces workers after they finish
+in-flight requests. Because models are preloaded in the master, picking
+up new model files needs a full restart (`kill -USR2` then `-QUIT` on the
+old master).
+
+Workers and state: several subsystems keep state in process memory - the
+per-user state store, session fatigue and session event streams, review
+queues, the content embedding index and the candidate catalog. Each
+worker would hold its own copy, so writes would land on one random worker
+and reads elsewhere would see partial or stale data. The server therefore
+runs one worker by default and scales with threads.
+
+With ML_WORKERS > 1 only these endpoints are served:
+
+    /api/ml/recommend (learning path store is file-backed)
+    /api/ml/adaptive-difficulty, /api/ml/predict-engagement,
+    /api/ml/learning-insights, /api/ml/optimal-break,
+    /api/ml/detect-neurodiversity, /api/ml/batch,
+    /api/ml/update-skill-mastery, /api/ml/cf-candidates,
+    /api/ml/adaptive-ui-settings, /api/ml/gamification-preferences,
+    /api/ml/predict-performance, /api/ml/detect-struggle and
+    /api/ml/session-tick when the request carries its interactionHistory
+    (and, for session-tick, no sessionId)
+
+/api/ml/similar-content and /api/ml/select-content also work: the
+content index and the candidate catalog are opened read-only and follow
+the writes a single-worker server makes to the same files
+(ML_CONTENT_INDEX, ML_CONTENT_CATALOG).
+
+Everything else (/api/ml/state/*, /api/ml/session-fatigue,
+/api/ml/session-events, /api/ml/review-schedule, /api/ml/content-index,
+predict-performance, detect-struggle and session-tick without
+interactionHistory, and session-tick with a sessionId) keeps per-process
+state. With more than one worker these routes answer 409 rather than a
+per-worker answer; run a separate single-worker server for them.
+ML_STATE_READONLY also defaults to 1, so persisted state
+(ML_REVIEW_STATE, ML_CONTENT_INDEX, ML_CONTENT_CATALOG) is read at
+startup but never written back and workers cannot overwrite each
+other's files on exit.
+"""
+
+import gc
+import os
+
+bind = os.environ.get('ML_BIND', '0.0.0.0:5001')
+workers = int(os.environ.get('ML_WORKERS', 1))
+
+# Threads let concurrent requests share a worker's micro-batcher
+worker_class = 'gthread'
+threads = int(os.environ.get('ML_THREADS', 4))
+
+timeout = int(os.environ.get('ML_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('ML_GRACEFUL_TIMEOUT', 30))
+max_requests = int(os.environ.get('ML_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+preload_app = True
+wsgi_app = 'ml_api:app'
+accesslog = '-'
+
+# One core per worker: keep BLAS and sklearn from spawning a thread per
+# core inside every worker. Must be set before ml_api is preloaded.
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+os.environ.setdefault('OPENBLAS_NUM_THREADS', '1')
+os.environ.setdefault('MKL_NUM_THREADS', '1')
+os.environ.setdefault('ML_MODEL_N_JOBS', '1')
+
+# Preloading only shares models if they are loaded before fork
+os.environ['ML_LAZY_STARTUP'] = '0'
+
+# Workers must not write back per-process state to shared files, and
+# ml_api refuses the routes that need a single process
+os.environ.setdefault('ML_STATE_READONLY', '1' if workers > 1 else '0')
+os.environ['ML_WORKERS'] = str(workers)
+
+
+def when_ready(server):
+    """Master has preloaded the app; freeze it before workers fork"""
+    gc.freeze()
+    server.log.info(f"Preloaded ml_api; forking {workers} workers x {threads} threads")
+
+
+def post_fork(server, worker):
+    server.log.info(f"Worker {worker.pid} ready")
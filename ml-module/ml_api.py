@@ -3,52 +3,354 @@ NeuroLearn ML API Service
 Flask API bridge for serving machine learning recommendations and predictions
 """
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
 import sys
 import os
-import pickle
-import numpy as np
+import random
+import functools
+import atexit
 from datetime import datetime
 
+from src.startup import StartupTimer, LazyValue, load_model, preload
+
+startup_timer = StartupTimer()
+
+with startup_timer.phase('import flask'):
+    from flask import Flask, Request, Response, request, jsonify, has_request_context
+    from flask.json.provider import DefaultJSONProvider
+    from werkzeug.exceptions import BadRequest, UnsupportedMediaType
+    from flask_cors import CORS
+
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-try:
-    from src.preprocessor import FeatureExtractor
-    from src.recommender import ContentRecommender
-    from src.predictor import PerformancePredictor, SkillMasteryTracker
-except ImportError:
-    print("Warning: Could not import custom modules. Using fallback mode.")
-    FeatureExtractor = None
-    ContentRecommender = None
-    PerformancePredictor = None
-    SkillMasteryTracker = None
+from src.state_store import UserStateStore
+from src.response_cache import ResponseCache
+from src.metrics import registry as metrics_registry, stage
+from src import wire_format
+
+# ML_LAZY_STARTUP=1 defers numpy/sklearn imports and model loading until
+# an endpoint first needs them (fast cold start for autoscaling and tests)
+LAZY_STARTUP = os.environ.get('ML_LAZY_STARTUP', '0') == '1'
+MODEL_MMAP = os.environ.get('ML_MODEL_MMAP', '1') == '1'
+
+def wants_msgpack():
+    """True if the client's Accept header prefers MessagePack (and it is installed)"""
+    best = request.accept_mimetypes.best_match(
+        (wire_format.JSON_MIMETYPE,) + wire_format.MSGPACK_MIMETYPES,
+        default=wire_format.JSON_MIMETYPE
+    )
+    return wire_format.is_msgpack(best) and wire_format.msgpack_available()
+
+class WireJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson when installed. jsonify() answers in
+    MessagePack instead when the client asks for it via Accept, and the
+    encoding is reported as the 'serialize' metrics stage.
+    """
+    
+    def dumps(self, obj, **kwargs):
+        with stage('serialize'):
+            return wire_format.json_dumps(obj).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return wire_format.json_loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if has_request_context() and wants_msgpack():
+            with stage('serialize'):
+                body = wire_format.msgpack_dumps(obj)
+            response = self._app.response_class(body, mimetype=wire_format.MSGPACK_MIMETYPE)
+        else:
+            with stage('serialize'):
+                body = wire_format.json_dumps(obj)
+            response = self._app.response_class(body, mimetype=self.mimetype)
+        response.vary.add('Accept')
+        return response
+
+class WireRequest(Request):
+    """Request whose get_json() also decodes MessagePack bodies"""
+    
+    @property
+    def is_msgpack(self):
+        return wire_format.is_msgpack(self.mimetype)
+    
+    def get_json(self, force=False, silent=False, cache=True):
+        if not self.is_msgpack:
+            return super().get_json(force=force, silent=silent, cache=cache)
+        
+        cached = getattr(self, '_cached_msgpack', None)
+        if cached is not None:
+            return cached[0]
+        try:
+            if not wire_format.msgpack_available():
+                raise UnsupportedMediaType('MessagePack support is not installed on this server')
+            data = wire_format.msgpack_loads(self.get_data(cache=cache))
+        except UnsupportedMediaType:
+            if silent:
+                return None
+            raise
+        except Exception:
+            if silent:
+                return None
+            raise BadRequest('Failed to decode MessagePack body')
+        if cache:
+            self._cached_msgpack = (data,)
+        return data
+
+def response_payload(response):
+    """Decoded body of a JSON or MessagePack response"""
+    if wire_format.is_msgpack(response.mimetype):
+        return wire_format.msgpack_loads(response.get_data())
+    return response.get_json()
 
 app = Flask(__name__)
+app.request_class = WireRequest
+app.json = WireJSONProvider(app)
 CORS(app)  # Enable CORS for all routes
 
+@app.before_request
+def start_request_metrics():
+    metrics_registry.begin_request()
+    if request.is_json or request.is_msgpack:
+        with stage('parse'):
+            request.get_json(silent=True)
+
+@app.after_request
+def record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics_registry.end_request(route, response.status_code)
+    return response
+
+def _build_predictor():
+    try:
+        from src.predictor import PerformancePredictor
+    except ImportError:
+        print("Warning: Could not import predictor module. Using fallback mode.")
+        return None
+    return PerformancePredictor()
+
+def _build_skill_tracker():
+    try:
+        from src.predictor import SkillMasteryTracker
+    except ImportError:
+        print("Warning: Could not import predictor module. Using fallback mode.")
+        return None
+    # BKT parameters fitted with `python -m src.knowledge_tracing`
+    bkt_params = os.environ.get('ML_BKT_PARAMS') or os.path.join(models_dir, 'bkt_params.npz')
+    return SkillMasteryTracker(bkt_params=bkt_params if os.path.exists(bkt_params) else None)
+
 # Initialize AI modules
-predictor = PerformancePredictor() if PerformancePredictor else None
-skill_tracker = SkillMasteryTracker() if SkillMasteryTracker else None
+lazy_predictor = LazyValue('load predictor', _build_predictor, startup_timer)
+lazy_skill_tracker = LazyValue('load skill tracker', _build_skill_tracker, startup_timer)
+
+# ML_ONLINE_PERFORMANCE=1 keeps running performance statistics per stored
+# user, updated in O(1) per appended interaction, instead of rescanning
+# the stored history for each prediction
+ONLINE_PERFORMANCE = os.environ.get('ML_ONLINE_PERFORMANCE', '1') == '1'
+
+def _performance_tracker(max_history):
+    from src.online_performance import OnlinePerformanceState
+    return OnlinePerformanceState(window=max_history)
+
+# Per-user interaction windows so clients can send deltas instead of full histories
+state_store = UserStateStore(
+    max_users=int(os.environ.get('ML_STATE_MAX_USERS', 10000)),
+    max_history=int(os.environ.get('ML_STATE_MAX_HISTORY', 50)),
+    trackers={'performance': _performance_tracker} if ONLINE_PERFORMANCE else None
+)
+
+# Cache for endpoints whose response is a pure function of the payload
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get('ML_CACHE_MAX_ENTRIES', 4096)),
+    ttl_seconds=float(os.environ.get('ML_CACHE_TTL', 300)),
+    disk_dir=os.environ.get('ML_CACHE_DIR') or None
+)
+
+def cached_response(namespace):
+    """Serve repeated identical payloads from response_cache"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            data = request.get_json(silent=True)
+            if data is None:
+                return view(*args, **kwargs)
+            
+            key = response_cache.key(namespace, data)
+            cached = response_cache.get(key)
+            if cached is not None:
+                response = jsonify(cached)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+            
+            response = view(*args, **kwargs)
+            if not isinstance(response, tuple) and response.status_code == 200:
+                response_cache.put(key, response_payload(response))
+                response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+# Tasks available through /api/ml/batch
+BATCH_TASKS = ('performance', 'struggle', 'neurodiversity')
+
+# Analyses available through /api/ml/session-tick
+SESSION_TICK_TASKS = ('struggle', 'break', 'performance')
+
+# Mastery models for /api/ml/update-skill-mastery (ML_SKILL_MODEL sets the default)
+SKILL_MODELS = ('ema', 'bkt')
+DEFAULT_SKILL_MODEL = os.environ.get('ML_SKILL_MODEL', 'ema')
 
 # Load models (if they exist)
 models_dir = os.path.join(os.path.dirname(__file__), 'models')
-neurodiversity_model = None
-performance_model = None
-
-try:
-    if os.path.exists(os.path.join(models_dir, 'neurodiversity_classifier.pkl')):
-        with open(os.path.join(models_dir, 'neurodiversity_classifier.pkl'), 'rb') as f:
-            neurodiversity_model = pickle.load(f)
-        print("✓ Loaded neurodiversity classifier")
-    
-    if os.path.exists(os.path.join(models_dir, 'performance_predictor.pkl')):
-        with open(os.path.join(models_dir, 'performance_predictor.pkl'), 'rb') as f:
-            performance_model = pickle.load(f)
-        print("✓ Loaded performance predictor")
-except Exception as e:
-    print(f"Warning: Could not load models: {e}")
+
+def _load_model_file(filename):
+    path = os.path.join(models_dir, filename)
+    if not os.path.exists(path):
+        return None
+    try:
+        model = load_model(path, mmap=MODEL_MMAP)
+        print(f"✓ Loaded {filename}")
+        return model
+    except Exception as e:
+        print(f"Warning: Could not load model {filename}: {e}")
+        return None
+
+lazy_neurodiversity_model = LazyValue(
+    'load neurodiversity_classifier.pkl',
+    lambda: _load_model_file('neurodiversity_classifier.pkl'),
+    startup_timer
+)
+lazy_performance_model = LazyValue(
+    'load performance_predictor.pkl',
+    lambda: _load_model_file('performance_predictor.pkl'),
+    startup_timer
+)
+
+def _build_model_server():
+    # Micro-batched inference over the trained models
+    from src.model_server import ModelServer
+    return ModelServer(
+        lazy_neurodiversity_model.get(),
+        lazy_performance_model.get(),
+        max_batch_size=int(os.environ.get('ML_BATCH_MAX_SIZE', 32)),
+        max_wait_ms=float(os.environ.get('ML_BATCH_MAX_WAIT_MS', 2)),
+        n_jobs=int(os.environ['ML_MODEL_N_JOBS']) if os.environ.get('ML_MODEL_N_JOBS') else None
+    )
+
+lazy_model_server = LazyValue('start model server', _build_model_server, startup_timer)
+
+def _build_struggle_stream():
+    # Sliding-window struggle detection over raw live-session events
+    from src.struggle_stream import StruggleStream
+    return StruggleStream(
+        window_seconds=float(os.environ.get('ML_STREAM_WINDOW_SECONDS', 300)),
+        bucket_seconds=float(os.environ.get('ML_STREAM_BUCKET_SECONDS', 10)),
+        idle_ttl=float(os.environ.get('ML_STREAM_IDLE_TTL', 1800))
+    )
+
+lazy_struggle_stream = LazyValue('start struggle stream', _build_struggle_stream, startup_timer)
+
+def _build_fatigue_tracker():
+    # Incremental per-session fatigue state for break recommendations
+    from src.session_fatigue import FatigueTracker
+    return FatigueTracker(idle_ttl=float(os.environ.get('ML_FATIGUE_IDLE_TTL', 1800)))
+
+lazy_fatigue_tracker = LazyValue('start fatigue tracker', _build_fatigue_tracker, startup_timer)
+
+# Set by gunicorn.conf.py when several workers share the persisted state files
+state_readonly = os.environ.get('ML_STATE_READONLY', '0') == '1'
+multi_worker = int(os.environ.get('ML_WORKERS', 1)) > 1
+
+# Routes whose state lives in one process's memory; with several workers each
+# would answer from its own copy, so they are refused instead
+SINGLE_WORKER_ROUTES = {
+    'append_user_state', 'seed_user_state', 'drop_user_state',
+    'session_fatigue', 'end_session_fatigue', 'session_events', 'session_event_state',
+    'review_schedule', 'class_review_schedule', 'update_content_index'
+}
+# Routes that fall back to the state store when interactionHistory is omitted
+STORED_HISTORY_ROUTES = {'predict_performance', 'detect_struggle', 'session_tick'}
+
+@app.before_request
+def refuse_per_worker_state():
+    if not multi_worker:
+        return None
+    data = request.get_json(silent=True) or {}
+    if request.endpoint == 'session_tick' and data.get('sessionId'):
+        reason = 'with a sessionId it keeps per-worker fatigue state'
+    elif request.endpoint in STORED_HISTORY_ROUTES and 'interactionHistory' not in data:
+        reason = 'without interactionHistory it reads per-worker state'
+    elif request.endpoint in SINGLE_WORKER_ROUTES:
+        reason = 'it keeps per-worker state'
+    else:
+        return None
+    return jsonify({
+        'success': False,
+        'error': f"{request.path} needs a single-worker server: {reason}"
+    }), 409
+
+def _build_review_scheduler():
+    # SM-2 review queues; ML_REVIEW_STATE persists them across restarts
+    from src.review_scheduler import ReviewScheduler
+    path = os.environ.get('ML_REVIEW_STATE')
+    scheduler = ReviewScheduler.load(path) if path and os.path.exists(path) else ReviewScheduler()
+    if path and not state_readonly:
+        atexit.register(scheduler.save, path)
+    return scheduler
+
+lazy_review_scheduler = LazyValue('load review scheduler', _build_review_scheduler, startup_timer)
+
+def _build_content_index():
+    # "More like this" embeddings; ML_CONTENT_INDEX is a directory of memory-mapped vectors
+    # (read-only in multi-worker servers: a single-worker server owns the writes)
+    from src.content_index import ContentEmbeddingIndex
+    path = os.environ.get('ML_CONTENT_INDEX')
+    index = ContentEmbeddingIndex(path or None, readonly=state_readonly)
+    if path and not state_readonly:
+        atexit.register(index.flush)
+    return index
+
+lazy_content_index = LazyValue('open content index', _build_content_index, startup_timer)
+
+def _build_collaborative_filter():
+    # Implicit ALS factors trained with `python -m src.collaborative`
+    from src.collaborative import CollaborativeFilter
+    path = os.environ.get('ML_CF_MODEL') or os.path.join(models_dir, 'cf_model.npz')
+    return CollaborativeFilter.load(path) if os.path.exists(path) else None
+
+lazy_collaborative_filter = LazyValue('load collaborative filter', _build_collaborative_filter, startup_timer)
+
+def _build_learning_paths():
+    # Recommendations materialized by `python -m src.learning_paths`; ML_LEARNING_PATHS is the store directory
+    from src.learning_paths import LearningPathStore
+    path = os.environ.get('ML_LEARNING_PATHS')
+    if not path:
+        path = os.path.join(models_dir, 'learning_paths')
+        if not os.path.exists(os.path.join(path, 'current.json')):
+            return None
+    return LearningPathStore(path)
+
+lazy_learning_paths = LazyValue('open learning path store', _build_learning_paths, startup_timer)
+
+def _build_candidate_pipeline():
+    # Lessons arrive through /api/ml/content-index and are kept in ML_CONTENT_CATALOG
+    # (read-only in multi-worker servers); ML_CANDIDATE_LIMIT caps each generator and
+    # catalogs under ML_TWO_STAGE_MIN_ITEMS are scored in full
+    from src.candidate_pipeline import GENERATOR_LIMIT, TWO_STAGE_MIN_ITEMS, CandidatePipeline
+    return CandidatePipeline(
+        collaborative=lazy_collaborative_filter.get(),
+        generator_limit=int(os.environ.get('ML_CANDIDATE_LIMIT', GENERATOR_LIMIT)),
+        two_stage_min_items=int(os.environ.get('ML_TWO_STAGE_MIN_ITEMS', TWO_STAGE_MIN_ITEMS)),
+        path=os.environ.get('ML_CONTENT_CATALOG') or os.path.join(models_dir, 'content_catalog.json'),
+        readonly=state_readonly
+    )
+
+lazy_candidate_pipeline = LazyValue('start candidate pipeline', _build_candidate_pipeline, startup_timer)
+
+if not LAZY_STARTUP:
+    preload([lazy_predictor, lazy_skill_tracker, lazy_model_server])
+startup_timer.mark_ready()
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -58,11 +360,42 @@ def health_check():
         'service': 'NeuroLearn ML API',
         'timestamp': datetime.now().isoformat(),
         'models_loaded': {
-            'neurodiversity_classifier': neurodiversity_model is not None,
-            'performance_predictor': performance_model is not None
-        }
+            'neurodiversity_classifier': lazy_neurodiversity_model.peek() is not None,
+            'performance_predictor': lazy_performance_model.peek() is not None
+        },
+        'lazyStartup': LAZY_STARTUP,
+        'stateReadonly': state_readonly,
+        'multiWorker': multi_worker,
+        'startupTiming': startup_timer.report(),
+        'stateStore': state_store.stats(),
+        'responseCache': response_cache.stats(),
+        'microBatching': lazy_model_server.peek().stats() if lazy_model_server.loaded else {},
+        'struggleStream': lazy_struggle_stream.peek().stats() if lazy_struggle_stream.loaded else {},
+        'fatigueTracker': lazy_fatigue_tracker.peek().stats() if lazy_fatigue_tracker.loaded else {},
+        'reviewScheduler': lazy_review_scheduler.peek().stats() if lazy_review_scheduler.loaded else {},
+        'contentIndex': lazy_content_index.peek().stats() if lazy_content_index.loaded else {},
+        'collaborativeFilter': lazy_collaborative_filter.peek().stats() if lazy_collaborative_filter.peek() else {},
+        'learningPaths': lazy_learning_paths.peek().stats() if lazy_learning_paths.peek() else {},
+        'candidatePipeline': lazy_candidate_pipeline.peek().stats() if lazy_candidate_pipeline.loaded else {}
     })
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Per-route request counts, error counts and latency histograms, with
+    per-stage timings (parse, features, inference, serialize, handler)
+    
+    Prometheus text format by default; ?format=json for a JSON summary.
+    Counters are per worker process.
+    """
+    if request.args.get('format') == 'json':
+        return jsonify({
+            'success': True,
+            'routes': metrics_registry.snapshot(),
+            'modelFailures': metrics_registry.model_failures()
+        })
+    return Response(metrics_registry.prometheus(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/ml/recommend', methods=['POST'])
 def get_recommendations():
     """
@@ -74,24 +407,33 @@ def get_recommendations():
         "interactions": [...],
         "userProfile": {...}
     }
+    
+    Users materialized by the learning path job, with no interactions
+    appended since and the same profile, are answered from the store
+    without reading the interactions. Not response-cached: the answer
+    also depends on the store's generation and dirty marks.
     """
     try:
+        from src import learning_paths
         data = request.get_json()
         user_id = data.get('userId')
         interactions = data.get('interactions', [])
         user_profile = data.get('userProfile', {})
         
-        # Extract features from interactions
-        features = extract_features_from_interactions(interactions, user_profile)
-        
-        # Generate recommendations
-        recommendations = generate_recommendations(features, user_profile)
+        store = lazy_learning_paths.get()
+        result = store.get(str(user_id), user_profile) if store is not None and user_id else None
+        materialized = result is not None
+        if not materialized:
+            with stage('features'):
+                result = learning_paths.recommend(interactions, user_profile)
         
         return jsonify({
             'success': True,
             'userId': user_id,
-            'recommendations': recommendations,
-            'features': features,
+            'recommendations': result['recommendations'],
+            'features': result['features'],
+            'learningPath': result['learningPath'],
+            'materialized': materialized,
             'timestamp': datetime.now().isoformat()
         })
     
@@ -102,6 +444,7 @@ def get_recommendations():
         }), 500
 
 @app.route('/api/ml/adaptive-difficulty', methods=['POST'])
+@cached_response('adaptive-difficulty')
 def adaptive_difficulty():
     """
     Determine optimal difficulty level based on performance
@@ -114,6 +457,7 @@ def adaptive_difficulty():
     }
     """
     try:
+        from src.recommender import ADAPTIVE_DIFFICULTY_THRESHOLDS, DIFFICULTY_LEVELS, adaptive_difficulty_levels
         data = request.get_json()
         recent_performance = data.get('recentPerformance', [])
         current_level = data.get('currentLevel', 'beginner')
@@ -127,15 +471,9 @@ def adaptive_difficulty():
             completion_rate = 0.5
         
         # Determine next difficulty
-        if avg_score >= 85 and completion_rate >= 0.8:
-            next_difficulty = 'advanced'
-            confidence = 0.9
-        elif avg_score >= 70 and completion_rate >= 0.6:
-            next_difficulty = 'intermediate'
-            confidence = 0.8
-        else:
-            next_difficulty = 'beginner'
-            confidence = 0.7
+        level = int(adaptive_difficulty_levels(avg_score, completion_rate, **ADAPTIVE_DIFFICULTY_THRESHOLDS))
+        next_difficulty = DIFFICULTY_LEVELS[level]
+        confidence = (0.7, 0.8, 0.9)[level]
         
         # Adjust based on current level
         if current_level == 'advanced' and next_difficulty == 'beginner':
@@ -206,7 +544,7 @@ def predict_engagement():
             engagement_score += 0.1
         
         # Add some randomness for realism
-        engagement_score += np.random.uniform(-0.1, 0.1)
+        engagement_score += random.uniform(-0.1, 0.1)
         engagement_score = max(0, min(1, engagement_score))  # Clamp to [0, 1]
         
         return jsonify({
@@ -276,8 +614,9 @@ def learning_insights():
         
         # Learning pace
         if len(interactions) >= 10:
+            from src.timestamps import day_numbers, decode_timestamps
             recent_interactions = interactions[-10:]
-            time_span = len(set(i.get('date', '')[:10] for i in recent_interactions if i.get('date')))
+            time_span = len(set(day_numbers(decode_timestamps([i.get('date') for i in recent_interactions])).tolist()))
             if time_span <= 7:
                 insights.append({
                     'type': 'strength',
@@ -317,13 +656,22 @@ def predict_performance():
         "userId": "string",
         "interactionHistory": [...]
     }
+    
+    interactionHistory may be omitted to use the history stored for userId
+    via /api/ml/state/append.
     """
     try:
+        predictor = lazy_predictor.get()
+        model_server = lazy_model_server.get()
         data = request.get_json()
-        interaction_history = data.get('interactionHistory', [])
+        interaction_history, history_source = resolve_history(data)
         
         if predictor:
-            result = predictor.predict_performance(interaction_history)
+            interaction_history = parse_interactions(interaction_history)
+            if history_source == 'state':
+                result = stored_performance(predictor, data['userId'], interaction_history)
+            else:
+                result = predictor.predict_performance(interaction_history)
         else:
             # Fallback prediction
             if interaction_history:
@@ -343,9 +691,15 @@ def predict_performance():
                     'recommendations': ['Complete more lessons for better predictions']
                 }
         
+        model_prediction = optional_model_prediction('performance', model_server.predict_score,
+                                                     interaction_history)
+        if model_prediction:
+            result = {**result, 'modelPrediction': model_prediction}
+        
         return jsonify({
             'success': True,
-            **result
+            **result,
+            'historySource': history_source
         })
     
     except Exception as e:
@@ -361,17 +715,21 @@ def detect_struggle():
     
     Expected payload:
     {
+        "userId": "string",
         "currentSession": {...},
         "interactionHistory": [...]
     }
+    
+    interactionHistory may be omitted to use the history stored for userId.
     """
     try:
+        predictor = lazy_predictor.get()
         data = request.get_json()
         current_session = data.get('currentSession', {})
-        interaction_history = data.get('interactionHistory', [])
+        interaction_history, history_source = resolve_history(data)
         
         if predictor:
-            result = predictor.detect_struggle(current_session, interaction_history)
+            result = predictor.detect_struggle(current_session, parse_interactions(interaction_history))
         else:
             # Simple fallback
             pause_freq = current_session.get('behaviorMetrics', {}).get('pauseFrequency', 0)
@@ -383,7 +741,8 @@ def detect_struggle():
         
         return jsonify({
             'success': True,
-            **result
+            **result,
+            'historySource': history_source
         })
     
     except Exception as e:
@@ -404,6 +763,7 @@ def optimal_break_time():
     }
     """
     try:
+        predictor = lazy_predictor.get()
         data = request.get_json()
         session_data = data.get('sessionData', {})
         user_rhythm = data.get('userRhythm', {})
@@ -442,10 +802,13 @@ def detect_neurodiversity_patterns():
     }
     """
     try:
+        predictor = lazy_predictor.get()
+        model_server = lazy_model_server.get()
         data = request.get_json()
         interaction_history = data.get('interactionHistory', [])
         
         if predictor:
+            interaction_history = parse_interactions(interaction_history)
             result = predictor.detect_neurodiversity_patterns(interaction_history)
         else:
             result = {
@@ -455,6 +818,213 @@ def detect_neurodiversity_patterns():
                 'adaptiveRecommendations': []
             }
         
+        model_prediction = optional_model_prediction('neurodiversity', model_server.classify_neurodiversity,
+                                                     interaction_history)
+        if model_prediction:
+            result = {**result, 'modelPrediction': model_prediction}
+        
+        return jsonify({
+            'success': True,
+            **result
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ml/state/append', methods=['POST'])
+def append_user_state():
+    """
+    Append new interactions to a user's server-side history
+    
+    Expected payload:
+    {
+        "userId": "string",
+        "interaction": {...}            (or "interactions": [...], oldest first)
+    }
+    
+    Nothing is stored for a user the store does not know; the response then
+    has needsSeed set and the caller should send the full recent history to
+    /api/ml/state/seed.
+    """
+    try:
+        data = request.get_json()
+        user_id = data.get('userId')
+        if not user_id:
+            return jsonify({
+                'success': False,
+                'error': 'userId is required'
+            }), 400
+        
+        interactions = data.get('interactions')
+        if interactions is None:
+            interactions = [data['interaction']] if data.get('interaction') else []
+        
+        history_size = state_store.append(user_id, interactions)
+        mark_paths_dirty(user_id)
+        
+        return jsonify({
+            'success': True,
+            'userId': user_id,
+            'appended': len(interactions) if history_size is not None else 0,
+            'historySize': history_size or 0,
+            'needsSeed': history_size is None
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ml/state/seed', methods=['POST'])
+def seed_user_state():
+    """
+    Replace a user's server-side history (used when the store has no state)
+    
+    Expected payload:
+    {
+        "userId": "string",
+        "interactionHistory": [...]     (oldest first)
+    }
+    """
+    try:
+        data = request.get_json()
+        user_id = data.get('userId')
+        if not user_id:
+            return jsonify({
+                'success': False,
+                'error': 'userId is required'
+            }), 400
+        
+        history_size = state_store.seed(user_id, data.get('interactionHistory', []))
+        mark_paths_dirty(user_id)
+        
+        return jsonify({
+            'success': True,
+            'userId': user_id,
+            'historySize': history_size
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ml/state/<user_id>', methods=['DELETE'])
+def drop_user_state(user_id):
+    """Forget a user's server-side history"""
+    return jsonify({
+        'success': True,
+        'userId': user_id,
+        'removed': state_store.drop(user_id)
+    })
+
+@app.route('/api/ml/batch', methods=['POST'])
+def batch_scoring():
+    """
+    Score many users in one call (performance, struggle, neurodiversity)
+    
+    Expected payload:
+    {
+        "tasks": ["performance", "struggle", "neurodiversity"],
+        "users": [
+            {
+                "userId": "string",
+                "interactionHistory": [...],
+                "currentSession": {...}
+            }
+        ]
+    }
+    """
+    try:
+        predictor = lazy_predictor.get()
+        data = request.get_json()
+        users = data.get('users', [])
+        tasks = data.get('tasks', list(BATCH_TASKS))
+        
+        unknown = [t for t in tasks if t not in BATCH_TASKS]
+        if unknown:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown tasks: {', '.join(unknown)}"
+            }), 400
+        
+        if not predictor:
+            return jsonify({
+                'success': False,
+                'error': 'Predictor unavailable'
+            }), 503
+        
+        histories = parse_histories([u.get('interactionHistory', []) for u in users])
+        task_results = {}
+        if 'performance' in tasks:
+            task_results['performance'] = predictor.predict_performance_batch(histories)
+        if 'struggle' in tasks:
+            sessions = [u.get('currentSession', {}) for u in users]
+            task_results['struggle'] = predictor.detect_struggle_batch(sessions, histories)
+        if 'neurodiversity' in tasks:
+            task_results['neurodiversity'] = predictor.detect_neurodiversity_patterns_batch(histories)
+        
+        results = []
+        for index, user in enumerate(users):
+            entry = {'userId': user.get('userId')}
+            for task, outputs in task_results.items():
+                entry[task] = outputs[index]
+            results.append(entry)
+        
+        return jsonify({
+            'success': True,
+            'count': len(results),
+            'results': results
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ml/session-fatigue', methods=['POST'])
+def session_fatigue():
+    """
+    Incremental break recommendation for a live session (Feature #5)
+    
+    Expected payload (only what happened since the previous call):
+    {
+        "sessionId": "string",
+        "focusSamples": [{"level": 7, "timestamp": "..."}],
+        "idleSeconds": 30,
+        "errors": 1,
+        "duration": 1800,  // optional: session length in seconds
+        "userRhythm": {...}
+    }
+    
+    The server keeps the session's fatigue state, so the cost of each call
+    does not grow with the session. State expires after ML_FATIGUE_IDLE_TTL
+    seconds without updates.
+    """
+    try:
+        predictor = lazy_predictor.get()
+        data = request.get_json()
+        session_id = data.get('sessionId')
+        if not session_id:
+            return jsonify({
+                'success': False,
+                'error': 'sessionId is required'
+            }), 400
+        if not predictor:
+            return jsonify({
+                'success': False,
+                'error': 'Predictor unavailable'
+            }), 503
+        
+        state = ingest_fatigue(session_id, data)
+        result = predictor.calculate_optimal_break_time_online(state, data.get('userRhythm', {}))
+        
         return jsonify({
             'success': True,
             **result
@@ -466,6 +1036,171 @@ def detect_neurodiversity_patterns():
             'error': str(e)
         }), 500
 
+@app.route('/api/ml/session-fatigue/<session_id>', methods=['DELETE'])
+def end_session_fatigue(session_id):
+    """Forget a finished session's fatigue state"""
+    try:
+        return jsonify({
+            'success': True,
+            'ended': lazy_fatigue_tracker.get().end(session_id)
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ml/session-tick', methods=['POST'])
+def session_tick():
+    """
+    Struggle, break and performance analysis for a live session in one call
+    
+    Replaces separate detect-struggle, optimal-break and predict-performance
+    requests: the session and history are sent and parsed once and the
+    parsed history is shared by all three analyses.
+    
+    Expected payload:
+    {
+        "userId": "string",
+        "currentSession": {...},
+        "userRhythm": {...},
+        "interactionHistory": [...],
+        "tasks": ["struggle", "break", "performance"],
+        "sessionId": "string",  // optional: live session for the break analysis
+        "sessionDelta": {"focusSamples": [...], "idleSeconds": 30, "errors": 1, "duration": 1800}
+    }
+    
+    interactionHistory may be omitted to use the history stored for userId.
+    With a sessionId the break analysis feeds only sessionDelta (what
+    happened since the previous tick, as for /api/ml/session-fatigue) to
+    the session's incremental fatigue state, so its cost does not grow
+    with the session; without one it reads currentSession's whole focus
+    timeline.
+    """
+    try:
+        predictor = lazy_predictor.get()
+        data = request.get_json()
+        current_session = data.get('currentSession', {})
+        user_rhythm = data.get('userRhythm', {})
+        tasks = data.get('tasks', list(SESSION_TICK_TASKS))
+        
+        unknown = [t for t in tasks if t not in SESSION_TICK_TASKS]
+        if unknown:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown tasks: {', '.join(unknown)}"
+            }), 400
+        
+        if not predictor:
+            return jsonify({
+                'success': False,
+                'error': 'Predictor unavailable'
+            }), 503
+        
+        interaction_history, history_source = resolve_history(data)
+        history = parse_interactions(interaction_history)
+        
+        result = {}
+        if 'struggle' in tasks:
+            result['struggle'] = predictor.detect_struggle(current_session, history)
+        if 'break' in tasks:
+            session_id = data.get('sessionId')
+            if session_id:
+                state = ingest_fatigue(session_id, data.get('sessionDelta') or {})
+                result['break'] = predictor.calculate_optimal_break_time_online(state, user_rhythm)
+            else:
+                result['break'] = predictor.calculate_optimal_break_time(current_session, user_rhythm)
+        if 'performance' in tasks:
+            if history_source == 'state':
+                result['performance'] = stored_performance(predictor, data['userId'], history)
+            else:
+                result['performance'] = predictor.predict_performance(history)
+        
+        return jsonify({
+            'success': True,
+            **result,
+            'historySource': history_source
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ml/session-events', methods=['POST'])
+def session_events():
+    """
+    Feed raw live-session events to the streaming struggle detector
+    
+    Expected payload:
+    {
+        "sessionId": "string",
+        "expectedDuration": 600,
+        "events": [
+            {"type": "pause|rewind|error|help|focus", "timestamp": 1700000000000, "value": 4}
+        ]
+    }
+    
+    Timestamps are epoch milliseconds/seconds or ISO-8601 (default now);
+    "value" is only used for focus samples. Malformed events are skipped
+    without failing the rest. Returns the struggle-level changes the
+    events caused and the session's current window state.
+    """
+    try:
+        stream = lazy_struggle_stream.get()
+        data = request.get_json()
+        session_id = data.get('sessionId')
+        if not session_id:
+            return jsonify({
+                'success': False,
+                'error': 'sessionId is required'
+            }), 400
+        
+        changes = stream.process(session_id, data.get('events', []), data.get('expectedDuration'))
+        
+        return jsonify({
+            'success': True,
+            'changes': changes,
+            'state': stream.poll(session_id)
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ml/session-events/<session_id>', methods=['GET', 'DELETE'])
+def session_event_state(session_id):
+    """Current streaming struggle state of a session (GET), or end it (DELETE)"""
+    try:
+        stream = lazy_struggle_stream.get()
+        if request.method == 'DELETE':
+            return jsonify({
+                'success': True,
+                'ended': stream.end(session_id)
+            })
+        
+        state = stream.poll(session_id, now=datetime.now().timestamp())
+        if state is None:
+            return jsonify({
+                'success': False,
+                'error': 'Unknown session'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'state': state
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/ml/update-skill-mastery', methods=['POST'])
 def update_skill_mastery():
     """
@@ -474,17 +1209,30 @@ def update_skill_mastery():
     Expected payload:
     {
         "currentMastery": {...},
-        "interaction": {...}
+        "interaction": {...},
+        "interactions": [...],  // optional: many interactions, oldest first
+        "model": "ema" | "bkt"  // optional: EMA or Bayesian Knowledge Tracing
     }
     """
     try:
+        skill_tracker = lazy_skill_tracker.get()
         data = request.get_json()
         current_mastery = data.get('currentMastery', {})
-        interaction = data.get('interaction', {})
+        interactions = data.get('interactions') or [data.get('interaction', {})]
+        model = data.get('model') or DEFAULT_SKILL_MODEL
+        
+        if model not in SKILL_MODELS:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown skill model '{model}'. Available: {', '.join(SKILL_MODELS)}"
+            }), 400
         
         if skill_tracker:
-            updated_mastery = skill_tracker.update_skill_mastery(current_mastery, interaction)
-            recommendations = skill_tracker.get_skill_recommendations(updated_mastery)
+            # Convert to arrays once; dicts are rebuilt only for the response
+            mastery = skill_tracker.to_arrays(current_mastery)
+            skill_tracker.update_skill_mastery(mastery, interactions, model=model)
+            recommendations = skill_tracker.get_skill_recommendations(mastery)
+            updated_mastery = mastery.to_dict()
         else:
             updated_mastery = current_mastery
             recommendations = []
@@ -492,7 +1240,252 @@ def update_skill_mastery():
         return jsonify({
             'success': True,
             'updatedMastery': updated_mastery,
-            'recommendations': recommendations
+            'recommendations': recommendations,
+            'model': model
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ml/review-schedule', methods=['POST'])
+def review_schedule():
+    """
+    Spaced-repetition review queue for one student
+    
+    Expected payload:
+    {
+        "userId": "string",
+        "interactions": [...],  // optional: new practice to record, oldest first
+        "limit": 5
+    }
+    
+    Each skill is rescheduled with SM-2 from its practice scores at the
+    interactions' timestamps (practice before a skill is due does not count
+    as a review); the response lists the skills due soonest (O(log n) per
+    skill returned).
+    """
+    try:
+        scheduler = lazy_review_scheduler.get()
+        data = request.get_json()
+        user_id = data.get('userId')
+        if not user_id:
+            return jsonify({
+                'success': False,
+                'error': 'userId is required'
+            }), 400
+        
+        interactions = data.get('interactions') or []
+        if interactions:
+            scheduler.review(user_id, interactions)
+        
+        return jsonify({
+            'success': True,
+            'userId': user_id,
+            'nextReviews': scheduler.next_reviews(user_id, limit=int(data.get('limit', 5)))
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ml/review-schedule/class', methods=['POST'])
+def class_review_schedule():
+    """
+    Due reviews for every student in a class, computed in one pass
+    
+    Expected payload:
+    {
+        "userIds": ["string", ...],
+        "limit": 5  // per student, most overdue first
+    }
+    """
+    try:
+        scheduler = lazy_review_scheduler.get()
+        data = request.get_json()
+        user_ids = data.get('userIds') or []
+        queues = scheduler.class_due(user_ids, limit=int(data.get('limit', 5)))
+        
+        return jsonify({
+            'success': True,
+            'count': len(queues),
+            'queues': queues
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ml/content-index', methods=['POST'])
+def update_content_index():
+    """
+    Add lessons and interactions to the content embedding index and the
+    candidate pipeline's catalog
+    
+    Expected payload:
+    {
+        "items": [...],  // content documents (_id, subject, difficulty, contentType, format, tags)
+        "interactions": [...]  // optional: {userId, contentId} pairs
+    }
+    
+    Only new or changed rows are recomputed; re-sending a lesson refreshes
+    its metadata. Interactions also count towards trending lessons. The
+    catalog is saved for restarts and for the read-only workers.
+    """
+    try:
+        index = lazy_content_index.get()
+        if index.readonly:
+            return jsonify({
+                'success': False,
+                'error': 'Content index is read-only in this server; send updates to the single-worker server'
+            }), 409
+        pipeline = lazy_candidate_pipeline.get()
+        data = request.get_json()
+        items = data.get('items') or []
+        interactions = data.get('interactions') or []
+        added = index.add(items)
+        recorded = index.record_interactions(interactions)
+        pipeline.update(items)
+        pipeline.record_interactions(interactions)
+        pipeline.save()
+        
+        return jsonify({
+            'success': True,
+            'added': added,
+            'interactionsRecorded': recorded,
+            'index': index.stats(),
+            'catalogItems': len(pipeline)
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ml/similar-content', methods=['POST'])
+def similar_content():
+    """
+    "More like this lesson": nearest lessons in the content embedding index
+    
+    Expected payload:
+    {
+        "contentId": "string",
+        "limit": 5
+    }
+    """
+    try:
+        index = lazy_content_index.get()
+        index.refresh()
+        data = request.get_json()
+        content_id = data.get('contentId')
+        if not content_id:
+            return jsonify({
+                'success': False,
+                'error': 'contentId is required'
+            }), 400
+        if str(content_id) not in index:
+            return jsonify({
+                'success': False,
+                'error': f"content '{content_id}' is not indexed"
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'contentId': content_id,
+            'similar': index.similar(content_id, int(data.get('limit', 5)))
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ml/select-content', methods=['POST'])
+def select_content():
+    """
+    Adaptive content selection over generated candidates (large catalogs)
+    
+    Expected payload:
+    {
+        "userId": "string",
+        "userFeatures": {...},  // performance_score, avg_focus_level, avg_completion_rate, ...
+        "recentContentIds": ["string", ...],  // optional: lessons taken lately
+        "formats": [...],  // optional filter
+        "subjects": [...],  // optional filter
+        "limit": 5
+    }
+    
+    Subject, difficulty, collaborative and trending generators propose
+    lessons from the catalog sent to /api/ml/content-index and the
+    adaptive_content_selection scorer ranks them; catalogs smaller than
+    ML_TWO_STAGE_MIN_ITEMS are scored in full instead. The pipeline report
+    has candidates per generator and per-stage timings against their
+    budgets.
+    """
+    try:
+        pipeline = lazy_candidate_pipeline.get()
+        pipeline.refresh()
+        data = request.get_json()
+        user_id = data.get('userId')
+        content, report = pipeline.select(
+            data.get('userFeatures') or {},
+            str(user_id) if user_id else None,
+            data.get('recentContentIds') or [],
+            int(data.get('limit', 5)),
+            data.get('formats'),
+            data.get('subjects')
+        )
+        
+        return jsonify({
+            'success': True,
+            'userId': user_id,
+            'content': content,
+            'pipeline': report
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/ml/cf-candidates', methods=['POST'])
+def collaborative_candidates():
+    """
+    Lessons that similar students completed, from precomputed ALS factors
+    
+    Expected payload:
+    {
+        "userIds": ["string", ...],
+        "limit": 20  // per student
+    }
+    
+    Lessons a student already took are skipped; students the model was
+    not trained on get an empty list.
+    """
+    try:
+        cf = lazy_collaborative_filter.get()
+        if cf is None:
+            return jsonify({
+                'success': False,
+                'error': 'collaborative model not trained (python -m src.collaborative)'
+            }), 503
+        data = request.get_json()
+        user_ids = [str(user) for user in data.get('userIds') or []]
+        candidates = cf.candidates(user_ids, limit=int(data.get('limit', 20)))
+        
+        return jsonify({
+            'success': True,
+            'count': len(candidates),
+            'candidates': candidates
         })
     
     except Exception as e:
@@ -502,6 +1495,7 @@ def update_skill_mastery():
         }), 500
 
 @app.route('/api/ml/adaptive-ui-settings', methods=['POST'])
+@cached_response('adaptive-ui-settings')
 def adaptive_ui_settings():
     """
     Get adaptive UI settings based on user behavior (Feature #5)
@@ -553,6 +1547,7 @@ def adaptive_ui_settings():
         }), 500
 
 @app.route('/api/ml/gamification-preferences', methods=['POST'])
+@cached_response('gamification-preferences')
 def analyze_gamification_preferences():
     """
     Analyze gamification preferences (Feature #12)
@@ -604,76 +1599,77 @@ def analyze_gamification_preferences():
 
 # Helper functions
 
-def extract_features_from_interactions(interactions, user_profile):
-    """Extract ML features from user interactions"""
-    if not interactions:
-        return {
-            'avg_session_duration': 0,
-            'completion_rate': 0,
-            'avg_score': 0,
-            'interaction_count': 0,
-            'focus_level': 0.5
-        }
-    
-    return {
-        'avg_session_duration': sum(i.get('sessionDuration', 0) for i in interactions) / len(interactions),
-        'completion_rate': sum(1 for i in interactions if i.get('completed', False)) / len(interactions),
-        'avg_score': sum(i.get('performance', {}).get('score', 0) for i in interactions) / len(interactions),
-        'interaction_count': len(interactions),
-        'focus_level': sum(i.get('focusLevel', 5) for i in interactions) / len(interactions) / 10
-    }
+def parse_interactions(interactions):
+    """Parse an interaction list into a columnar InteractionBatch (once per request)"""
+    from src.interaction_batch import InteractionBatch
+    if isinstance(interactions, InteractionBatch):
+        return interactions
+    with stage('features'):
+        return InteractionBatch(interactions or [])
 
-def generate_recommendations(features, user_profile):
-    """Generate content recommendations based on features"""
-    recommendations = []
-    
-    # Difficulty recommendation
-    avg_score = features.get('avg_score', 50)
-    if avg_score >= 80:
-        difficulty = 'advanced'
-    elif avg_score >= 60:
-        difficulty = 'intermediate'
-    else:
-        difficulty = 'beginner'
-    
-    recommendations.append({
-        'type': 'difficulty',
-        'value': difficulty,
-        'confidence': 0.8
-    })
+def parse_histories(histories):
+    """Parse several users' interaction lists into one InteractionBatch"""
+    from src.interaction_batch import InteractionBatch
+    with stage('features'):
+        return InteractionBatch.from_histories(histories)
+
+def resolve_history(data):
+    """
+    Pick the interaction history for a request
     
-    # Format recommendation based on learning style
-    learning_style = user_profile.get('learningStyle', 'mixed')
-    format_map = {
-        'visual': 'video',
-        'auditory': 'audio',
-        'kinesthetic': 'interactive',
-        'reading': 'text',
-        'mixed': 'mixed'
-    }
+    Returns (history, source) where source is 'request' when the client
+    sent interactionHistory, 'state' when it was read from the state store
+    and 'none' when neither is available.
+    """
+    if 'interactionHistory' in data:
+        return data.get('interactionHistory') or [], 'request'
     
-    recommendations.append({
-        'type': 'format',
-        'value': format_map.get(learning_style, 'mixed'),
-        'confidence': 0.7
-    })
+    user_id = data.get('userId')
+    if user_id:
+        history = state_store.get_history(user_id)
+        if history is not None:
+            return history, 'state'
     
-    # Break frequency recommendation
-    avg_duration = features.get('avg_session_duration', 30)
-    if avg_duration > 45:
-        break_recommendation = 'Consider taking a 5-minute break every 45 minutes'
-    elif avg_duration < 20:
-        break_recommendation = 'Try extending sessions to 20-25 minutes for better retention'
+    return [], 'none'
+
+def optional_model_prediction(model, predict, interaction_history):
+    """
+    A trained model's extra prediction for a response that is already
+    complete without it: a timeout or model error returns None and is
+    counted in /metrics instead of failing the request
+    """
+    try:
+        return predict(interaction_history)
+    except Exception as e:
+        metrics_registry.record_model_failure(model)
+        print(f"Warning: {model} model prediction failed: {e!r}")
+        return None
+
+def ingest_fatigue(session_id, delta):
+    """Add a live session's new focus samples, idle seconds and errors to its fatigue state"""
+    return lazy_fatigue_tracker.get().ingest(
+        session_id,
+        delta.get('focusSamples', []),
+        idle_seconds=delta.get('idleSeconds', 0),
+        errors=delta.get('errors', 0),
+        duration=delta.get('duration')
+    )
+
+def stored_performance(predictor, user_id, history):
+    """Performance prediction for a user's server-side history"""
+    if ONLINE_PERFORMANCE:
+        result = state_store.read_tracker(user_id, 'performance', predictor.predict_performance_online)
     else:
-        break_recommendation = 'Your session length is optimal!'
-    
-    recommendations.append({
-        'type': 'study_habit',
-        'value': break_recommendation,
-        'confidence': 0.75
-    })
-    
-    return recommendations
+        result = state_store.cached(user_id, 'performance', lambda _: predictor.predict_performance(history))
+    if result is None:  # user evicted since the history was read
+        result = predictor.predict_performance(history)
+    return result
+
+def mark_paths_dirty(user_id):
+    """Stop serving a user's materialized recommendations until the next job run"""
+    store = lazy_learning_paths.get()
+    if store is not None:
+        store.mark_dirty([str(user_id)])
 
 def generate_reasoning(avg_score, completion_rate, recommended_level):
     """Generate human-readable reasoning for difficulty recommendation"""
@@ -700,8 +1696,13 @@ if __name__ == '__main__':
     print("🧠 NeuroLearn ML API Service Starting...")
     print("=" * 60)
     print(f"Models Directory: {models_dir}")
-    print(f"Neurodiversity Model: {'✓ Loaded' if neurodiversity_model else '✗ Not found'}")
-    print(f"Performance Model: {'✓ Loaded' if performance_model else '✗ Not found'}")
+    if LAZY_STARTUP:
+        print("Lazy startup: models load on first use")
+    else:
+        print(f"Neurodiversity Model: {'✓ Loaded' if lazy_neurodiversity_model.peek() else '✗ Not found'}")
+        print(f"Performance Model: {'✓ Loaded' if lazy_performance_model.peek() else '✗ Not found'}")
+    print("=" * 60)
+    print(startup_timer.format())
     print("=" * 60)
     print("Starting Flask server on http://localhost:5001")
     print("=" * 60)
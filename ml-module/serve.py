@@ -0,0 +1,65 @@
+"""
+NeuroLearn ML API - Production Server
+Preloads models in the master process, then forks worker processes
+
+Usage:
+    python serve.py                       # one worker, 4 threads
+    python serve.py --threads 16 --timeout 30
+    python serve.py --workers 8           # stateless endpoints only (others answer 409)
+
+Settings are described in gunicorn.conf.py. On platforms without fork
+(Windows) this falls back to Flask's threaded server with debug off.
+"""
+
+import argparse
+import os
+import sys
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Run the NeuroLearn ML API in production mode')
+    parser.add_argument('--bind', help='host:port to listen on (default 0.0.0.0:5001)')
+    parser.add_argument('--workers', type=int, help='worker processes (default 1; with more, stateful endpoints answer 409)')
+    parser.add_argument('--threads', type=int, help='threads per worker (default 4)')
+    parser.add_argument('--timeout', type=int, help='request timeout in seconds (default 30)')
+    parser.add_argument('--graceful-timeout', type=int, help='seconds to drain on restart (default 30)')
+    parser.add_argument('--max-requests', type=int, help='recycle workers after N requests (default 10000)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    overrides = {
+        'ML_BIND': args.bind,
+        'ML_WORKERS': args.workers,
+        'ML_THREADS': args.threads,
+        'ML_TIMEOUT': args.timeout,
+        'ML_GRACEFUL_TIMEOUT': args.graceful_timeout,
+        'ML_MAX_REQUESTS': args.max_requests
+    }
+    for key, value in overrides.items():
+        if value is not None:
+            os.environ[key] = str(value)
+
+    os.chdir(os.path.dirname(CONFIG_PATH))
+
+    try:
+        from gunicorn.app.wsgiapp import WSGIApplication
+    except ImportError:
+        WSGIApplication = None
+
+    if WSGIApplication is None or not hasattr(os, 'fork'):
+        print("⚠ gunicorn unavailable on this platform - using single-process threaded server")
+        from ml_api import app
+        host, _, port = os.environ.get('ML_BIND', '0.0.0.0:5001').rpartition(':')
+        app.run(host=host, port=int(port), debug=False, threaded=True)
+        return
+
+    sys.argv = [sys.argv[0], '--config', CONFIG_PATH]
+    WSGIApplication('%(prog)s [OPTIONS]').run()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,23 @@
 """
 NeuroLearn ML Module Initialization
+
+Submodules are imported on first attribute access so that importing one
+module (e.g. src.state_store) does not pull in numpy for the others.
 """
 
-from .preprocessor import DataPreprocessor
-from .recommender import ContentRecommender
+import importlib
 
 __version__ = '0.1.0'
 __all__ = ['DataPreprocessor', 'ContentRecommender']
+
+_LAZY_EXPORTS = {
+    'DataPreprocessor': '.preprocessor',
+    'ContentRecommender': '.recommender'
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
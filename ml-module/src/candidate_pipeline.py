@@ -0,0 +1,379 @@
+"""
+NeuroLearn Candidate Pipeline
+Two-stage content selection for large catalogs
+
+adaptive_content_selection scores every item, so its cost grows with the
+catalog. Here cheap generators each propose at most `generator_limit`
+lessons and only their union is ranked by the same scorer:
+
+- subject: lessons in the subjects of the student's recent lessons
+- difficulty: lessons in the difficulty the scorer rates highest for the
+  student (then the next best), within the requested subjects
+- collaborative: ALS neighbours (CollaborativeFilter.candidates)
+- trending: the most interacted-with lessons, by exponentially decayed
+  counts
+
+The subject and difficulty generators read posting lists: catalog rows
+grouped by (subject, difficulty) cell, each in catalog order, so taking
+the first rows of a few cells costs O(generator_limit) whatever the
+catalog size. Trending rows are recomputed when interactions are
+recorded, off the request path. Scores depend on an item only through its
+difficulty and ties keep catalog order, so with generator_limit >= limit
+the difficulty generator alone covers the full scan's selection; the
+others widen the ranked pool.
+
+Below `two_stage_min_items` lessons one vectorized pass over the whole
+catalog is faster than generating candidates (0.3ms against 2ms at 10k
+lessons, 1.6ms against 3ms at 100k), so smaller catalogs are scored in
+full with the same scorer and report no generator stages.
+
+Every stage has a latency budget. Generators run in order and the
+others are skipped once the candidate stage has used the sum of their
+budgets; the difficulty generator always runs, so selections never
+depend on machine load for the rows that match the full scan. The ranker
+sees at most `max_candidates` rows, earlier generators first. Stage
+timings are returned with each selection and recorded as request stages
+for /metrics.
+
+With a path the catalog and trending counts are kept in a JSON file,
+written by save() and loaded on start. The file has a single writer;
+read-only pipelines (extra server workers) reload it when it changes
+(refresh()).
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .content_index import content_id
+from .metrics import stage
+from .recommender import CONTENT_FORMATS, CONTENT_SUBJECTS, DIFFICULTY_LEVELS, ContentCatalog, ContentRecommender
+
+GENERATORS = ('subject', 'difficulty', 'collaborative', 'trending')
+STAGE_BUDGETS_MS = {
+    'subject': 2.0,
+    'difficulty': 2.0,
+    'collaborative': 5.0,
+    'trending': 1.0,
+    'rank': 5.0
+}
+GENERATOR_LIMIT = 300
+TWO_STAGE_MIN_ITEMS = 200_000
+MAX_CANDIDATES = 1000
+TRENDING_HALF_LIFE = 3 * 24 * 3600  # seconds
+
+# Posting list cells: codes from -1 (missing or unknown) up
+_SUBJECT_CODES = np.arange(-1, len(CONTENT_SUBJECTS))
+_DIFFICULTY_CODES = np.arange(-1, len(DIFFICULTY_LEVELS))
+_CELLS = len(_SUBJECT_CODES) * len(_DIFFICULTY_CODES)
+
+
+def _cell(subject: int, difficulty: int) -> int:
+    return (subject + 1) * len(_DIFFICULTY_CODES) + difficulty + 1
+
+
+class _CatalogState:
+    """A catalog with its posting lists and trending counts (replaced whole on update)"""
+
+    def __init__(self, catalog: ContentCatalog, counts: np.ndarray):
+        self.catalog = catalog
+        self.ids = [content_id(item) for item in catalog.items]
+        self.rows = {cid: row for row, cid in enumerate(self.ids)}
+        key = (catalog.subject.astype(np.int64) + 1) * len(_DIFFICULTY_CODES) + catalog.difficulty + 1
+        self.order = np.argsort(key, kind='stable')
+        self.bounds = np.searchsorted(key[self.order], np.arange(_CELLS + 1))
+        self.counts = counts
+        self.trending = np.zeros(0, dtype=np.int64)
+
+
+class CandidatePipeline:
+    """Candidate generators plus adaptive_content_selection re-ranking"""
+
+    def __init__(self, items: Optional[List[Dict]] = None, collaborative=None,
+                 recommender: Optional[ContentRecommender] = None,
+                 budgets_ms: Optional[Dict[str, float]] = None,
+                 generator_limit: int = GENERATOR_LIMIT, max_candidates: int = MAX_CANDIDATES,
+                 trending_half_life: float = TRENDING_HALF_LIFE,
+                 two_stage_min_items: int = TWO_STAGE_MIN_ITEMS,
+                 path: Optional[str] = None, readonly: bool = False):
+        """
+        Args:
+            items: Initial catalog (content documents with _id), added to
+                the saved one
+            collaborative: CollaborativeFilter for the collaborative
+                generator (src.collaborative), if trained
+            recommender: ContentRecommender whose scorer ranks the candidates
+            budgets_ms: Per-stage latency budgets (STAGE_BUDGETS_MS keys)
+            generator_limit: Most candidates per generator
+            max_candidates: Most candidates ranked per selection
+            trending_half_life: Seconds for a trending count to halve
+            two_stage_min_items: Smallest catalog that uses the generators;
+                smaller ones are scored in full
+            path: JSON file to keep the catalog in (loaded if it exists);
+                None keeps it in memory
+            readonly: Never write the file (save() is a no-op); another
+                process writes it
+        """
+        self.path = path
+        self.readonly = readonly and bool(path)
+        self.collaborative = collaborative
+        self.recommender = recommender or ContentRecommender()
+        self.budgets_ms = {**STAGE_BUDGETS_MS, **(budgets_ms or {})}
+        self.generator_limit = generator_limit
+        self.max_candidates = max_candidates
+        self.trending_half_life = trending_half_life
+        self.two_stage_min_items = two_stage_min_items
+        self.selections = 0
+        self.full_scans = 0
+        self.over_budget = Counter()
+        self.skipped = Counter()
+        self._lock = threading.Lock()
+        self._recorded_at = time.time()
+        self._state = _CatalogState(ContentCatalog([]), np.zeros(0))
+        self._mtime = None
+        if path and os.path.exists(path):
+            self._load()
+        if items:
+            self.update(items)
+
+    def __len__(self) -> int:
+        return len(self._state.ids)
+
+    def _load(self):
+        """Replace the catalog and trending counts with the saved ones"""
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path) as f:
+            saved = json.load(f)
+        state = _CatalogState(ContentCatalog(saved['items']), np.array(saved['counts'], dtype=float))
+        with self._lock:
+            self._recorded_at = saved['recordedAt']
+            self._rank_trending(state)
+            self._state = state
+        self._mtime = mtime
+
+    def refresh(self) -> bool:
+        """Reload a read-only pipeline if its writer saved the catalog; returns True if it did"""
+        if not self.readonly:
+            return False
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self._load()
+        return True
+
+    def save(self):
+        """Write the catalog and trending counts to path (no-op in memory or read-only)"""
+        if not self.path or self.readonly:
+            return
+        with self._lock:
+            state = self._state
+            saved = {'items': state.catalog.items, 'counts': state.counts.tolist(), 'recordedAt': self._recorded_at}
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(saved, f)
+            os.replace(tmp, self.path)
+
+    def update(self, items: List[Dict]) -> int:
+        """
+        Add lessons, or replace ones already in the catalog (by _id)
+
+        The catalog and posting lists are rebuilt; trending counts carry over.
+
+        Returns:
+            Number of lessons new to the catalog
+        """
+        if not items:
+            return 0
+        with self._lock:
+            old = self._state
+            merged = dict(zip(old.ids, old.catalog.items))
+            new = len(set(map(content_id, items)) - merged.keys())
+            merged.update((content_id(item), item) for item in items)
+            counts = np.zeros(len(merged))
+            counts[:len(old.ids)] = old.counts  # existing ids keep their position
+            state = _CatalogState(ContentCatalog(list(merged.values())), counts)
+            self._rank_trending(state)
+            self._state = state
+        return new
+
+    def record_interactions(self, interactions: List[Dict]) -> int:
+        """
+        Count interactions ({contentId}) towards trending lessons
+
+        Returns:
+            Number of interactions with lessons in the catalog
+        """
+        with self._lock:
+            state = self._state
+            rows = [state.rows.get(str(i.get('contentId'))) for i in interactions]
+            rows = np.array([row for row in rows if row is not None], dtype=np.int64)
+            now = time.time()
+            state.counts *= 0.5 ** ((now - self._recorded_at) / self.trending_half_life)
+            self._recorded_at = now
+            if len(rows):
+                state.counts += np.bincount(rows, minlength=len(state.counts))
+            self._rank_trending(state)
+        return len(rows)
+
+    def _rank_trending(self, state: _CatalogState):
+        """Keep the generator_limit most-interacted rows, best first"""
+        active = np.flatnonzero(state.counts > 0)
+        if len(active) > self.generator_limit:
+            active = active[np.argpartition(-state.counts[active], self.generator_limit)[:self.generator_limit]]
+        state.trending = active[np.argsort(-state.counts[active], kind='stable')]
+
+    def _take(self, state: _CatalogState, subjects: np.ndarray, difficulties: np.ndarray,
+              limit: int, wanted: int) -> np.ndarray:
+        """First `limit` rows (catalog order) of the given subject x difficulty cells in the wanted formats"""
+        parts = []
+        for subject in subjects.tolist():
+            for difficulty in difficulties.tolist():
+                k = _cell(subject, difficulty)
+                rows = state.order[state.bounds[k]:state.bounds[k + 1]]
+                if wanted:
+                    # Scan the cell in chunks until enough rows match
+                    found, count = [], 0
+                    for start in range(0, len(rows), 4 * limit):
+                        chunk = rows[start:start + 4 * limit]
+                        found.append(chunk[(state.catalog.formats[chunk] & wanted) != 0])
+                        count += len(found[-1])
+                        if count >= limit:
+                            break
+                    rows = np.concatenate(found) if found else rows
+                parts.append(rows[:limit])
+        return np.sort(np.concatenate(parts))[:limit] if parts else np.zeros(0, dtype=np.int64)
+
+    def _generate(self, name: str, state: _CatalogState, features: Dict[str, float], user_id: Optional[str],
+                  recent: List[str], subjects: np.ndarray, wanted: int) -> np.ndarray:
+        limit = self.generator_limit
+        if name == 'subject':
+            recent_rows = np.array([state.rows[cid] for cid in map(str, recent) if cid in state.rows], dtype=np.int64)
+            studied = np.unique(state.catalog.subject[recent_rows])
+            return self._take(state, studied[np.isin(studied, subjects)], _DIFFICULTY_CODES, limit, wanted)
+        if name == 'difficulty':
+            # Difficulties by the scorer's rating, best first; tied ones are merged in catalog order
+            table = self.recommender.selection_scores([features])[0]
+            difficulty = np.append(np.arange(len(DIFFICULTY_LEVELS)), -1)  # the last column is for -1
+            parts = []
+            for score in np.unique(table)[::-1].tolist():
+                rows = self._take(state, subjects, difficulty[table == score], limit, wanted)
+                parts.append(rows)
+                limit -= len(rows)
+                if not limit:
+                    break
+            return np.concatenate(parts)
+        if name == 'collaborative':
+            if self.collaborative is None or user_id is None:
+                return np.zeros(0, dtype=np.int64)
+            found = self.collaborative.candidates([user_id], limit)[user_id]
+            rows = np.array([state.rows[c['contentId']] for c in found if c['contentId'] in state.rows], dtype=np.int64)
+        else:
+            rows = state.trending
+        keep = np.isin(state.catalog.subject[rows], subjects)
+        if wanted:
+            keep &= (state.catalog.formats[rows] & wanted) != 0
+        return rows[keep][:limit]
+
+    def select(self, user_features: Dict[str, float], user_id: Optional[str] = None,
+               recent_content_ids: Optional[List[str]] = None, limit: int = 5,
+               formats: Optional[List[str]] = None,
+               subjects: Optional[List[str]] = None) -> Tuple[List[Dict], Dict[str, Any]]:
+        """
+        adaptive_content_selection over generated candidates
+
+        Args:
+            user_features: Extracted user features
+            user_id: Student id for the collaborative generator
+            recent_content_ids: Lessons the student took lately (subject generator)
+            limit: Recommendations to return
+            formats: Only items offered in one of these formats
+            subjects: Only items in one of these subjects
+
+        Returns:
+            (selected items, report) where the report holds whether the
+            generators ran (twoStage), candidates per generator, the number
+            ranked, per-stage timings in ms and the stages that were skipped
+            or over budget
+        """
+        state = self._state
+        two_stage = len(state.ids) >= self.two_stage_min_items
+        report = {'twoStage': two_stage, 'candidates': {}, 'timingsMs': {}, 'skipped': [], 'overBudget': [],
+                  'ranked': 0}
+        wanted = sum(1 << CONTENT_FORMATS.index(f) for f in set(formats or ()) if f in CONTENT_FORMATS)
+        if formats and not wanted:
+            return [], report  # no known format: nothing matches
+        subject_codes = (np.unique([CONTENT_SUBJECTS.index(s) for s in subjects if s in CONTENT_SUBJECTS]).astype(np.int64)
+                         if subjects else _SUBJECT_CODES)
+
+        if not two_stage:
+            started = time.perf_counter()
+            with stage('rank'):
+                selected = self.recommender.adaptive_content_selection_batch(
+                    [user_features], state.catalog, limit, formats, subjects)[0] if len(state.ids) else []
+            self._time(report, 'rank', time.perf_counter() - started)
+            report['ranked'] = len(state.ids)
+            with self._lock:
+                self.selections += 1
+                self.full_scans += 1
+                self.over_budget.update(report['overBudget'])
+            return selected, report
+
+        generated = []
+        budget = sum(self.budgets_ms[name] for name in GENERATORS) / 1000
+        begin = time.perf_counter()
+        for name in GENERATORS:
+            if name != 'difficulty' and time.perf_counter() - begin >= budget:
+                report['skipped'].append(name)
+                continue
+            started = time.perf_counter()
+            with stage(f"candidates_{name}"):
+                rows = self._generate(name, state, user_features, user_id, recent_content_ids or [],
+                                      subject_codes, wanted)
+            self._time(report, name, time.perf_counter() - started)
+            report['candidates'][name] = len(rows)
+            generated.append(rows)
+
+        started = time.perf_counter()
+        with stage('rank'):
+            pool = np.concatenate(generated) if generated else np.zeros(0, dtype=np.int64)
+            unique, first = np.unique(pool, return_index=True)
+            if len(unique) > self.max_candidates:
+                unique = np.sort(pool[np.sort(first)[:self.max_candidates]])
+            selected = self.recommender.adaptive_content_selection_batch(
+                [user_features], state.catalog.subset(unique), limit, formats, subjects)[0] if len(unique) else []
+        self._time(report, 'rank', time.perf_counter() - started)
+        report['ranked'] = len(unique)
+
+        with self._lock:
+            self.selections += 1
+            self.skipped.update(report['skipped'])
+            self.over_budget.update(report['overBudget'])
+        return selected, report
+
+    def _time(self, report: Dict[str, Any], name: str, seconds: float):
+        report['timingsMs'][name] = round(seconds * 1000, 3)
+        if seconds * 1000 > self.budgets_ms[name]:
+            report['overBudget'].append(name)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'items': len(self),
+            'persistent': bool(self.path),
+            'readonly': self.readonly,
+            'trending': len(self._state.trending),
+            'collaborative': self.collaborative is not None,
+            'budgetsMs': self.budgets_ms,
+            'twoStageMinItems': self.two_stage_min_items,
+            'selections': self.selections,
+            'fullScans': self.full_scans,
+            'skipped': dict(self.skipped),
+            'overBudget': dict(self.over_budget)
+        }
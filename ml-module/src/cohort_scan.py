@@ -0,0 +1,204 @@
+"""
+NeuroLearn Cohort Neurodiversity Scan
+Nightly ADHD / dyslexia / autism pattern scan over every student
+
+Loads all students' interactions, extracts only the columns the pattern
+rules read, groups rows by user and scores everyone with the grouped
+reductions in PerformancePredictor.neurodiversity_scores. Parsing and
+column extraction, the expensive part, is split into chunks across a
+process pool. A JSON Lines export is split by byte range so each worker
+reads and parses its own part of the file. A JSON array is parsed once
+and its chunks are handed to forked workers.
+
+Results are written as one compressed .npz with one entry per user:
+user ids, interaction counts, float32 pattern scores and confidence, and
+a bitmask of detected patterns (bit 0 adhd, 1 dyslexia, 2 autism).
+
+    python -m src.cohort_scan interactions.jsonl results.npz --workers 8
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .interaction_batch import InteractionBatch
+from .predictor import PerformancePredictor
+from .wire_format import json_loads
+
+# Columns read by the pattern rules
+SCAN_COLUMNS = ('tab_switches', 'focus_level', 'completion_rate', 'attention_span',
+                'rewinds', 'playback_speed', 'is_text', 'revisit_count', 'hours')
+PATTERNS = ('adhd', 'dyslexia', 'autism')
+MIN_INTERACTIONS = 5  # as in detect_neurodiversity_patterns
+
+# Rows of a parsed JSON array, inherited by forked workers
+_rows: List[Dict] = []
+
+
+def _extract(rows: List[Dict], columns: Tuple[str, ...]) -> Tuple[List[Any], Dict[str, np.ndarray]]:
+    batch = InteractionBatch(rows)
+    return [row.get('userId') for row in rows], {name: getattr(batch, name) for name in columns}
+
+
+def _extract_lines(task: Tuple[str, int, int, Tuple[str, ...]]):
+    """Parse and extract one byte range of a JSON Lines file"""
+    path, start, end, columns = task
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return _extract([json_loads(line) for line in data.splitlines() if line.strip()], columns)
+
+
+def _extract_range(task: Tuple[int, int, Tuple[str, ...]]):
+    """Extract one slice of the parsed JSON array"""
+    start, end, columns = task
+    return _extract(_rows[start:end], columns)
+
+
+def _line_ranges(path: str, chunks: int) -> List[Tuple[str, int, int]]:
+    """Split a JSON Lines file into about `chunks` byte ranges on line boundaries"""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for k in range(1, chunks):
+            f.seek(max(bounds[-1], size * k // chunks))
+            f.readline()
+            position = f.tell()
+            if position >= size:
+                break
+            if position > bounds[-1]:
+                bounds.append(position)
+    bounds.append(size)
+    return [(path, lo, hi) for lo, hi in zip(bounds, bounds[1:]) if hi > lo]
+
+
+def _map(function, tasks: List, workers: int) -> Iterator:
+    if workers <= 1 or len(tasks) <= 1:
+        return map(function, tasks)
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+    with context.Pool(min(workers, len(tasks))) as pool:
+        return iter(pool.map(function, tasks))
+
+
+def load_columns(path: str, workers: Optional[int] = None, chunk_rows: int = 200_000,
+                 columns: Tuple[str, ...] = SCAN_COLUMNS) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Read an interactions export into per-row user ids and scan columns
+
+    Args:
+        path: JSON array (.json) or JSON Lines (.jsonl / .ndjson) file
+        workers: Processes used for parsing and extraction (default: CPU count)
+        chunk_rows: Rows per task (JSON Lines: approximate, by file size)
+        columns: InteractionBatch columns to extract (default: the scan's)
+
+    Returns:
+        (user_ids, columns) with one entry per interaction
+    """
+    global _rows
+    workers = workers or os.cpu_count() or 1
+    if path.endswith(('.jsonl', '.ndjson')):
+        size = os.path.getsize(path)
+        with open(path, 'rb') as f:
+            sample = f.read(1 << 20)
+        bytes_per_row = len(sample) / max(1, sample.count(b'\n'))
+        chunks = max(workers, int(size / bytes_per_row / chunk_rows) + 1)
+        tasks = [(*bounds, columns) for bounds in _line_ranges(path, chunks)]
+        parts = list(_map(_extract_lines, tasks, workers))
+    else:
+        with open(path, 'rb') as f:
+            _rows = json_loads(f.read())
+        try:
+            tasks = [(start, start + chunk_rows, columns) for start in range(0, len(_rows), chunk_rows)]
+            parts = list(_map(_extract_range, tasks, workers))
+        finally:
+            _rows = []
+
+    user_ids = np.array([user for users, _ in parts for user in users], dtype=str)
+    return user_ids, {
+        name: np.concatenate([part[name] for _, part in parts]) if parts else np.zeros(0)
+        for name in columns
+    }
+
+
+def scan(user_ids: np.ndarray, columns: Dict[str, np.ndarray],
+         predictor: Optional[PerformancePredictor] = None) -> Dict[str, np.ndarray]:
+    """
+    Pattern scores for every user from per-row columns
+
+    Returns:
+        Result arrays, one entry per user (sorted by user id)
+    """
+    predictor = predictor or PerformancePredictor()
+    users, owner, lengths = np.unique(user_ids, return_inverse=True, return_counts=True)
+    order = np.argsort(owner, kind='stable')
+    batch = InteractionBatch.from_columns({name: values[order] for name, values in columns.items()}, lengths)
+
+    scores = predictor.neurodiversity_scores(batch)
+    enough = lengths >= MIN_INTERACTIONS
+    detected = np.zeros(len(users), dtype=np.uint8)
+    for bit, pattern in enumerate(PATTERNS):
+        detected |= ((scores[pattern] >= 0.5) & enough).astype(np.uint8) << bit
+
+    return {
+        'userIds': users,
+        'interactions': lengths.astype(np.int32),
+        **{pattern: scores[pattern].astype(np.float32) for pattern in PATTERNS},
+        'confidence': np.where(enough, (scores['adhd'] + scores['dyslexia'] + scores['autism']) / 3, 0.0).astype(np.float32),
+        'detected': detected
+    }
+
+
+def save_results(path: str, results: Dict[str, np.ndarray]):
+    np.savez_compressed(path, **results)
+
+
+def load_results(path: str) -> Dict[str, np.ndarray]:
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def user_result(results: Dict[str, np.ndarray], user_id: str) -> Optional[Dict[str, Any]]:
+    """One user's entry in the detect-neurodiversity response format (None if absent)"""
+    users = results['userIds']
+    k = int(np.searchsorted(users, user_id))
+    if k >= len(users) or users[k] != user_id:
+        return None
+    if results['interactions'][k] < MIN_INTERACTIONS:
+        return {'detectedPatterns': [], 'confidence': 0.0, 'needsMoreData': True}
+    return {
+        'detectedPatterns': [p for bit, p in enumerate(PATTERNS) if results['detected'][k] >> bit & 1],
+        'patternScores': {p: round(float(results[p][k]), 2) for p in PATTERNS},
+        'confidence': round(float(results['confidence'][k]), 2),
+        'needsMoreData': bool(results['interactions'][k] < 10)
+    }
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Scan every user for neurodiversity patterns')
+    parser.add_argument('interactions', help='interactions export (.json array or .jsonl)')
+    parser.add_argument('output', help='results file (.npz)')
+    parser.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    parser.add_argument('--chunk-rows', type=int, default=200_000, help='rows per worker task (default 200000)')
+    args = parser.parse_args(argv)
+
+    begin = time.perf_counter()
+    user_ids, columns = load_columns(args.interactions, args.workers, args.chunk_rows)
+    loaded = time.perf_counter()
+    results = scan(user_ids, columns)
+    save_results(args.output, results)
+    done = time.perf_counter()
+
+    print(f"✓ Scanned {len(results['userIds']):,} users ({len(user_ids):,} interactions) "
+          f"in {done - begin:.1f}s (load {loaded - begin:.1f}s, scan {done - loaded:.1f}s) -> {args.output}")
+    for bit, pattern in enumerate(PATTERNS):
+        print(f"  {pattern:<9} {int(np.count_nonzero(results['detected'] >> bit & 1)):,} users")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,207 @@
+"""
+NeuroLearn Interaction Batch
+Columnar representation of interaction histories
+
+Each metric the predictor, preprocessor and model server read is exposed
+as a NumPy column. Columns are extracted from the interaction dicts on
+first access and cached, so a request pays one pass per column it actually
+uses no matter how many methods consume it. A batch can hold one user's
+history or many users' histories back to back, with owner/position arrays
+for grouped reductions.
+"""
+
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+try:
+    from .timestamps import decode_timestamps, hour_of_day
+except ImportError:  # run as a script
+    from timestamps import decode_timestamps, hour_of_day
+
+# Emotion -> stability score, as used by DataPreprocessor
+EMOTION_SCORES = {
+    'confident': 1.0,
+    'engaged': 0.8,
+    'neutral': 0.5,
+    'confused': 0.3,
+    'frustrated': 0.1
+}
+
+_EMPTY = {}
+
+
+def _column(values: List[Any], default: float) -> np.ndarray:
+    """Float column with missing (None) values replaced by the default"""
+    column = np.array(values, dtype=float)
+    missing = np.isnan(column)
+    if missing.any():
+        column[missing] = default
+    return column
+
+
+def _field(rows: List[Dict], key: str, default: float) -> np.ndarray:
+    return _column([i.get(key, default) for i in rows], default)
+
+
+def _nested(rows: List[Dict], parent: str, key: str, default: float) -> np.ndarray:
+    return _column([(i.get(parent) or _EMPTY).get(key, default) for i in rows], default)
+
+
+class InteractionBatch:
+    """Interaction histories for one or more users as lazily built NumPy columns"""
+
+    def __init__(self, interactions: List[Dict], lengths: Optional[List[int]] = None):
+        self._rows = interactions
+        n = len(interactions)
+
+        # Grouping: which user each row belongs to and its position in that history
+        self.lengths = np.array(lengths if lengths is not None else [n], dtype=np.int64)
+        self.owner = np.repeat(np.arange(len(self.lengths)), self.lengths)
+        starts = np.cumsum(self.lengths) - self.lengths
+        self.position = np.arange(n) - starts[self.owner]
+
+    @classmethod
+    def from_histories(cls, histories: List[List[Dict]]) -> 'InteractionBatch':
+        """Build one batch from several users' histories"""
+        flat = [i for history in histories for i in history]
+        return cls(flat, [len(history) for history in histories])
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray],
+                     lengths: Optional[List[int]] = None) -> 'InteractionBatch':
+        """
+        Build a batch directly from pre-extracted columns
+
+        Args:
+            columns: Column name (e.g. 'score', 'focus_level') -> array.
+                Columns not given fall back to their defaults.
+            lengths: Per-user history lengths (one user if omitted)
+        """
+        n = len(next(iter(columns.values()))) if columns else 0
+        batch = cls([_EMPTY] * n, lengths)
+        for name, values in columns.items():
+            batch.__dict__[name] = values
+        return batch
+
+    @classmethod
+    def coerce(cls, interactions: Union['InteractionBatch', List[Dict], None]) -> 'InteractionBatch':
+        """Accept either an existing batch or a plain list of interaction dicts"""
+        if isinstance(interactions, cls):
+            return interactions
+        return cls(interactions or [])
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def n_users(self) -> int:
+        return len(self.lengths)
+
+    # Columns
+
+    @cached_property
+    def score(self) -> np.ndarray:
+        return _nested(self._rows, 'performance', 'score', 0)
+
+    @cached_property
+    def hints(self) -> np.ndarray:
+        return _nested(self._rows, 'performance', 'hints', 0)
+
+    @cached_property
+    def completion_rate(self) -> np.ndarray:
+        return _field(self._rows, 'completionRate', 0)
+
+    @cached_property
+    def focus_level(self) -> np.ndarray:
+        return _field(self._rows, 'focusLevel', 5)
+
+    @cached_property
+    def duration(self) -> np.ndarray:
+        return _field(self._rows, 'duration', 0)
+
+    @cached_property
+    def session_duration(self) -> np.ndarray:
+        return _field(self._rows, 'sessionDuration', 0)
+
+    @cached_property
+    def completed(self) -> np.ndarray:
+        return np.array([bool(i.get('completed', False)) for i in self._rows], dtype=bool)
+
+    @cached_property
+    def pause_frequency(self) -> np.ndarray:
+        return _nested(self._rows, 'features', 'pauseFrequency', 0)
+
+    @cached_property
+    def revisit_count(self) -> np.ndarray:
+        return _nested(self._rows, 'features', 'revisitCount', 0)
+
+    @cached_property
+    def tab_switches(self) -> np.ndarray:
+        return _nested(self._rows, 'behaviorMetrics', 'tabSwitches', 0)
+
+    @cached_property
+    def rewinds(self) -> np.ndarray:
+        return _nested(self._rows, 'mediaMetrics', 'rewindCount', 0)
+
+    @cached_property
+    def playback_speed(self) -> np.ndarray:
+        return _nested(self._rows, 'mediaMetrics', 'averagePlaybackSpeed', 1.0)
+
+    @cached_property
+    def attention_span(self) -> np.ndarray:
+        return _nested(self._rows, 'attentionMetrics', 'attentionSpan', 20)
+
+    @cached_property
+    def is_text(self) -> np.ndarray:
+        return np.array(['text' in str(i.get('contentType', '')) for i in self._rows], dtype=bool)
+
+    @cached_property
+    def is_complete(self) -> np.ndarray:
+        return np.array([i.get('interactionType') == 'complete' for i in self._rows], dtype=bool)
+
+    @cached_property
+    def emotion_score(self) -> np.ndarray:
+        score = EMOTION_SCORES.get
+        return np.array([score(i.get('emotionalState', 'neutral'), 0.5) for i in self._rows], dtype=float)
+
+    @cached_property
+    def content_ids(self) -> List[Any]:
+        return [i.get('contentId') for i in self._rows]
+
+    @cached_property
+    def timestamps(self) -> List[Any]:
+        return [i.get('timestamp') for i in self._rows]
+
+    @cached_property
+    def mean_score(self) -> float:
+        """Mean score of the whole batch (shared by methods scoring one user)"""
+        return np.mean(self.score) if len(self) else np.float64(0.0)
+
+    @cached_property
+    def epoch_us(self) -> np.ndarray:
+        """Timestamps decoded once to int64 epoch microseconds (timestamps.MISSING where absent)"""
+        return decode_timestamps(self.timestamps)
+
+    @cached_property
+    def hours(self) -> np.ndarray:
+        """Hour of day of each interaction (current hour where missing)"""
+        return hour_of_day(self.epoch_us).astype(float)
+
+    # Grouped reductions over users (length n_users)
+
+    def group_sum(self, values: np.ndarray) -> np.ndarray:
+        return np.bincount(self.owner, weights=values, minlength=self.n_users)
+
+    def group_mean(self, values: np.ndarray) -> np.ndarray:
+        """Per-user mean (0 for users with no interactions)"""
+        return self.group_sum(values) / np.maximum(self.lengths, 1)
+
+    def group_var(self, values: np.ndarray) -> np.ndarray:
+        """Per-user population variance"""
+        mean = self.group_mean(values)
+        return self.group_mean((values - mean[self.owner]) ** 2)
+
+    def group_std(self, values: np.ndarray) -> np.ndarray:
+        return np.sqrt(self.group_var(values))
@@ -0,0 +1,377 @@
+"""
+NeuroLearn Bayesian Knowledge Tracing
+Per-skill BKT mastery model with batched updates and EM fitting
+
+SkillMasteryTracker's default EMA moves mastery a fixed 30% toward each
+score. BKT instead models a hidden known/unknown state per skill with
+four parameters:
+
+- p_init:  P(known) before the first practice
+- p_learn: P(unknown -> known) after each practice
+- p_guess: P(correct | unknown)
+- p_slip:  P(incorrect | known)
+
+A score of at least `correct_threshold` counts as a correct response.
+masteryLevel holds P(known) after the latest practice. An interaction
+without 'skills' tags counts as practice of its contentId, in fitting
+and in updates alike (historical logs are often tagged only by lesson).
+
+Posterior updates are vectorized over every (student, skill) pair in a
+batch. Repeated practice of the same pair is applied in rounds, one
+vectorized step per occurrence. fit() estimates the parameters per
+skill with Baum-Welch EM over all practice sequences at once. The
+sequences are laid out time-major and sorted by length, so each time
+step is a single NumPy operation over the sequences still active.
+
+The tracer's SkillIndex holds only the skills it has parameters for
+(fitted or loaded); updates look skills up without interning them, so
+unfitted skills use the defaults and do not grow the parameter arrays.
+
+Fit from the command line:
+    python -m src.knowledge_tracing datasets/processed/all_interactions.json models/bkt_params.npz
+"""
+
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .skill_mastery import SkillIndex, SkillMasteryArrays, group_occurrences, interaction_skills, skill_scores
+
+DEFAULT_PARAMS = {'p_init': 0.2, 'p_learn': 0.15, 'p_guess': 0.2, 'p_slip': 0.1}
+PARAM_NAMES = tuple(DEFAULT_PARAMS)
+
+
+class BayesianKnowledgeTracer:
+    """Per-skill BKT parameters plus vectorized posterior updates"""
+
+    def __init__(self, index: Optional[SkillIndex] = None, correct_threshold: float = 0.6,
+                 max_guess: float = 0.3, max_slip: float = 0.3, **defaults):
+        """
+        Args:
+            index: Skill interning table for the fitted parameters (default: a new one)
+            correct_threshold: Minimum 0-1 score counted as a correct response
+            max_guess: Upper bound on fitted guess probabilities
+            max_slip: Upper bound on fitted slip probabilities (the bounds
+                keep EM away from the degenerate "known means wrong" solution)
+            **defaults: Override DEFAULT_PARAMS for skills with no fitted values
+        """
+        self.index = index if index is not None else SkillIndex()
+        self.correct_threshold = correct_threshold
+        self.max_guess = max_guess
+        self.max_slip = max_slip
+        self.defaults = {**DEFAULT_PARAMS, **defaults}
+        self.params = {name: np.full(0, value) for name, value in self.defaults.items()}
+        self.fitted = np.zeros(0, dtype=bool)
+
+    def _ensure_capacity(self, size: int):
+        if size <= len(self.fitted):
+            return
+        capacity = max(size, 2 * len(self.fitted), 16)
+        for name, values in self.params.items():
+            grown = np.full(capacity, self.defaults[name])
+            grown[:len(values)] = values
+            self.params[name] = grown
+        fitted = np.zeros(capacity, dtype=bool)
+        fitted[:len(self.fitted)] = self.fitted
+        self.fitted = fitted
+
+    def skill_params(self, skill: str) -> Dict[str, float]:
+        return {name: float(values[0]) for name, values in self.param_values([skill]).items()}
+
+    def param_values(self, skills: List[str]) -> Dict[str, np.ndarray]:
+        """Parameters of each named skill (the defaults for skills without fitted values)"""
+        rows = self.index.lookup_many(skills)
+        known = rows >= 0
+        if not known.any():
+            return {name: np.full(len(rows), value) for name, value in self.defaults.items()}
+        rows = np.where(known, rows, 0)
+        return {name: np.where(known, values[rows], self.defaults[name]) for name, values in self.params.items()}
+
+    # Posterior updates
+
+    @staticmethod
+    def step(prior: np.ndarray, correct: np.ndarray, learn: np.ndarray, guess: np.ndarray,
+             slip: np.ndarray) -> np.ndarray:
+        """One BKT update: P(known) after observing `correct` and the learning transition"""
+        known = np.where(correct, prior * (1 - slip), prior * slip)
+        unknown = np.where(correct, (1 - prior) * guess, (1 - prior) * (1 - guess))
+        posterior = known / (known + unknown)
+        return posterior + (1 - posterior) * learn
+
+    def update(self, states: List[SkillMasteryArrays], interactions: List[List[Dict]],
+               now: Optional[float] = None):
+        """
+        Apply each student's interactions (oldest first) to their mastery arrays
+
+        All students and skills are updated together: the k-th practice of
+        every (student, skill) pair in the batch is one vectorized step.
+        Skill ids are those of each student's own index.
+
+        Args:
+            states: One SkillMasteryArrays per student (updated in place)
+            interactions: The matching interaction lists
+            now: Epoch seconds to record as lastPracticed (default: current time)
+        """
+        students, ids, names, scores = [], [], [], []
+        for student, (state, history) in enumerate(zip(states, interactions)):
+            skills, values = skill_scores(history, content_fallback=True)
+            if not skills:
+                continue
+            students.append(np.full(len(skills), student, dtype=np.int64))
+            ids.append(state.index.intern_many(skills))
+            state._ensure_capacity(len(state.index))
+            names.extend(skills)
+            scores.extend(values)
+        if not names:
+            return
+
+        ids = np.concatenate(ids)
+        students = np.concatenate(students)
+        n_skills = int(ids.max()) + 1
+        scores = np.asarray(scores, dtype=np.float64)
+
+        # Group practice by (student, skill); pairs come out sorted by student
+        order, pairs, starts, counts, group, _ = group_occurrences(students * n_skills + ids)
+        scores = scores[order]
+        correct = scores >= self.correct_threshold
+        pair_skill = pairs % n_skills
+        pair_student = pairs // n_skills
+        bounds = np.searchsorted(pair_student, np.arange(len(states) + 1))
+        params = self.param_values([names[k] for k in order[starts].tolist()])
+
+        # Start from each student's current mastery, or the skill prior if unpracticed
+        prior = params['p_init'].copy()
+        for student, state in enumerate(states):
+            lo, hi = bounds[student], bounds[student + 1]
+            if lo == hi:
+                continue
+            skill_ids = pair_skill[lo:hi]
+            practiced = state.practice_count[skill_ids] > 0
+            prior[lo:hi][practiced] = state.mastery[skill_ids[practiced]]
+
+        # Round r applies the r-th practice of every pair that has one
+        active = np.arange(len(pairs))
+        for r in range(int(counts.max())):
+            active = active[counts[active] > r]
+            occurrence = starts[active] + r
+            prior[active] = self.step(prior[active], correct[occurrence], params['p_learn'][active],
+                                      params['p_guess'][active], params['p_slip'][active])
+
+        score_sums = np.bincount(group, weights=scores)
+        for student, state in enumerate(states):
+            lo, hi = bounds[student], bounds[student + 1]
+            if lo == hi:
+                continue
+            skill_ids = pair_skill[lo:hi]
+            state.mastery[skill_ids] = prior[lo:hi]
+            state.record_practice(skill_ids, counts[lo:hi], score_sums[lo:hi], now)
+
+    def update_many(self, state: SkillMasteryArrays, interactions: List[Dict], now: Optional[float] = None):
+        """Apply one student's interactions (oldest first)"""
+        self.update([state], [interactions], now)
+
+    # Fitting
+
+    def _sequences(self, interactions: Iterable[Dict]):
+        """Per (user, skill) practice sequences laid out time-major, longest first"""
+        users, names, scores = {}, [], []
+        user_codes = []
+        for interaction in interactions:
+            tags = interaction_skills(interaction, content_fallback=True)
+            score = (interaction.get('performance') or {}).get('score', 0) / 100
+            user = users.setdefault(interaction.get('userId'), len(users))
+            names.extend(tags)
+            scores.extend([score] * len(tags))
+            user_codes.extend([user] * len(tags))
+        if not names:
+            return None
+
+        ids = self.index.intern_many(names)
+        n_skills = len(self.index)
+        self._ensure_capacity(n_skills)
+        correct = np.asarray(scores) >= self.correct_threshold
+        order, pairs, starts, lengths, group, position = group_occurrences(
+            np.asarray(user_codes, dtype=np.int64) * n_skills + ids
+        )
+
+        # Rows sorted by length (longest first) so step t covers rows [0, active[t])
+        row_order = np.argsort(-lengths, kind='stable')
+        row_of_pair = np.empty_like(row_order)
+        row_of_pair[row_order] = np.arange(len(pairs))
+        row = row_of_pair[group]
+        time_major = np.lexsort((row, position))
+
+        max_len = int(lengths.max())
+        active = len(pairs) - np.cumsum(np.bincount(lengths, minlength=max_len + 1))[:max_len]
+        return {
+            'obs': correct[order][time_major],
+            'row': row[time_major],
+            'row_skill': (pairs % n_skills)[row_order],
+            'active': active,
+            'offsets': np.concatenate([[0], np.cumsum(active)])
+        }
+
+    def _e_step(self, seq: Dict[str, np.ndarray]):
+        """Scaled forward-backward over every sequence; returns expected counts"""
+        obs, offsets, active, row_skill = seq['obs'], seq['offsets'], seq['active'], seq['row_skill']
+        init, learn, guess, slip = (self.params[name][row_skill] for name in PARAM_NAMES)
+        total, steps = len(obs), len(active)
+
+        # Emission probabilities of each observation under unknown / known
+        flat_row = seq['row']
+        e_unknown = np.where(obs, guess[flat_row], 1 - guess[flat_row])
+        e_known = np.where(obs, 1 - slip[flat_row], slip[flat_row])
+
+        alpha = np.empty((total, 2))
+        scale = np.empty(total)
+        for t in range(steps):
+            a, here = active[t], slice(offsets[t], offsets[t + 1])
+            if t == 0:
+                p_unknown, p_known = 1 - init, init
+            else:
+                prev = alpha[offsets[t - 1]:offsets[t - 1] + a]
+                p_unknown = prev[:, 0] * (1 - learn[:a])
+                p_known = prev[:, 0] * learn[:a] + prev[:, 1]
+            f_unknown = p_unknown * e_unknown[here]
+            f_known = p_known * e_known[here]
+            c = f_unknown + f_known
+            alpha[here, 0] = f_unknown / c
+            alpha[here, 1] = f_known / c
+            scale[here] = c
+
+        beta = np.ones((total, 2))
+        xi = np.zeros(total)  # expected unknown -> known transitions out of each step
+        for t in range(steps - 2, -1, -1):
+            a = active[t + 1]
+            nxt = slice(offsets[t + 1], offsets[t + 2])
+            cur = slice(offsets[t], offsets[t] + a)
+            weighted_known = e_known[nxt] * beta[nxt, 1] / scale[nxt]
+            weighted_unknown = e_unknown[nxt] * beta[nxt, 0] / scale[nxt]
+            beta[cur, 0] = (1 - learn[:a]) * weighted_unknown + learn[:a] * weighted_known
+            beta[cur, 1] = weighted_known
+            xi[cur] = alpha[cur, 0] * learn[:a] * weighted_known
+
+        gamma = alpha * beta
+        has_next = np.zeros(total, dtype=bool)
+        for t in range(steps - 1):
+            has_next[offsets[t]:offsets[t] + active[t + 1]] = True
+
+        n = len(self.fitted)
+        flat_skill = row_skill[flat_row]
+        first = slice(0, offsets[1])
+        counts = {
+            'sequences': np.bincount(row_skill, minlength=n),
+            'init_known': np.bincount(row_skill, weights=gamma[first, 1], minlength=n),
+            'learned': np.bincount(flat_skill, weights=xi, minlength=n),
+            'could_learn': np.bincount(flat_skill[has_next], weights=gamma[has_next, 0], minlength=n),
+            'unknown': np.bincount(flat_skill, weights=gamma[:, 0], minlength=n),
+            'guessed': np.bincount(flat_skill, weights=gamma[:, 0] * obs, minlength=n),
+            'known': np.bincount(flat_skill, weights=gamma[:, 1], minlength=n),
+            'slipped': np.bincount(flat_skill, weights=gamma[:, 1] * ~obs, minlength=n)
+        }
+        return counts, float(np.log(scale).sum())
+
+    def _m_step(self, counts: Dict[str, np.ndarray], pseudo: float):
+        """Re-estimate parameters, shrunk toward the defaults by `pseudo` observations"""
+        skills = counts['sequences'] > 0
+        d = self.defaults
+
+        def ratio(num, den, default):
+            return (num[skills] + pseudo * default) / (den[skills] + pseudo)
+
+        p = self.params
+        p['p_init'][skills] = ratio(counts['init_known'], counts['sequences'], d['p_init'])
+        p['p_learn'][skills] = ratio(counts['learned'], counts['could_learn'], d['p_learn'])
+        p['p_guess'][skills] = np.minimum(self.max_guess, ratio(counts['guessed'], counts['unknown'], d['p_guess']))
+        p['p_slip'][skills] = np.minimum(self.max_slip, ratio(counts['slipped'], counts['known'], d['p_slip']))
+        for name in PARAM_NAMES:
+            np.clip(p[name], 1e-4, 1 - 1e-4, out=p[name])
+        self.fitted |= skills
+
+    def fit(self, interactions: Iterable[Dict], max_iter: int = 100, tol: float = 1e-5,
+            pseudo_observations: float = 1.0, verbose: bool = False) -> Dict[str, Any]:
+        """
+        Estimate per-skill parameters from historical interaction logs with EM
+
+        Args:
+            interactions: Dicts with 'userId', 'skills' (or 'contentId') and
+                'performance.score', in chronological order per user
+            max_iter: Maximum EM iterations
+            tol: Stop when the log-likelihood per observation improves by less
+            pseudo_observations: Strength of the pull toward the default
+                parameters (keeps rarely practiced skills sensible)
+            verbose: Print the log-likelihood of each iteration
+
+        Returns:
+            Fitting summary
+        """
+        begin = time.perf_counter()
+        seq = self._sequences(interactions)
+        if seq is None:
+            return {'skills': 0, 'sequences': 0, 'observations': 0, 'iterations': 0}
+
+        previous = -np.inf
+        for iteration in range(1, max_iter + 1):
+            counts, log_likelihood = self._e_step(seq)
+            self._m_step(counts, pseudo_observations)
+            per_observation = log_likelihood / len(seq['obs'])
+            if verbose:
+                print(f"  iteration {iteration:>3}: log-likelihood {per_observation:.6f} per observation")
+            if per_observation - previous < tol:
+                break
+            previous = per_observation
+
+        return {
+            'skills': int((counts['sequences'] > 0).sum()),
+            'sequences': int(seq['active'][0]),
+            'observations': len(seq['obs']),
+            'iterations': iteration,
+            'logLikelihood': round(log_likelihood, 4),
+            'seconds': round(time.perf_counter() - begin, 3)
+        }
+
+    # Persistence
+
+    def save(self, path: str):
+        """Write fitted parameters (skill names + float arrays) to an .npz file"""
+        fitted = np.flatnonzero(self.fitted[:len(self.index)])
+        np.savez_compressed(
+            path,
+            skills=np.array([self.index.names[i] for i in fitted], dtype=str),
+            **{name: self.params[name][fitted] for name in PARAM_NAMES}
+        )
+
+    @classmethod
+    def load(cls, path: str, index: Optional[SkillIndex] = None, **kwargs) -> 'BayesianKnowledgeTracer':
+        tracer = cls(index, **kwargs)
+        with np.load(path) as data:
+            ids = tracer.index.intern_many(data['skills'].tolist())
+            tracer._ensure_capacity(len(tracer.index))
+            for name in PARAM_NAMES:
+                tracer.params[name][ids] = data[name]
+            tracer.fitted[ids] = True
+        return tracer
+
+
+def main(argv: List[str]):
+    """Fit BKT parameters from an interactions JSON file"""
+    import json
+
+    if len(argv) != 2:
+        print("Usage: python -m src.knowledge_tracing <interactions.json> <output.npz>")
+        return 1
+    with open(argv[0], 'r') as f:
+        interactions = json.load(f)
+
+    tracer = BayesianKnowledgeTracer(SkillIndex())
+    summary = tracer.fit(interactions, verbose=True)
+    tracer.save(argv[1])
+    print(f"✓ Fitted {summary['skills']} skills from {summary['observations']:,} observations "
+          f"in {summary['iterations']} iterations ({summary['seconds']}s) -> {argv[1]}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,522 @@
+"""
+NeuroLearn Learning Path Store
+Materialized /api/ml/recommend results with O(1) lookup
+
+A user's recommendations (difficulty, format, study habit), the features
+they were derived from and their learning path (generate_learning_path)
+change only when a new interaction arrives or the profile changes. An
+offline job computes them for every user from an interactions export and
+writes one fixed-size row per user (PATH_DTYPE, 57 bytes); the API then
+answers with a dictionary lookup and a row decode. The same materialize()
+code serves the live path, so both give identical results.
+
+Store directory layout:
+
+- current.json: the published generation
+- paths-<generation>.npy: the rows, opened as a read-only memory map
+- users-<generation>.json: user ids, in row order
+- dirty.log: ids of users with interactions appended since the rows were
+  built, one per line. The job renames it to a .claimed file when it
+  starts and deletes that once the new generation is published, so marks
+  made during a run stay pending. Every mark is appended, even for a user
+  already marked, and every process reads what was appended to the log
+  since its last lookup, so marks made by other server workers are
+  honoured immediately.
+
+Each row records a checksum of the profile fields it used (profile_key);
+a request with a different learningStyle or neurodiversityType misses.
+
+    python -m src.learning_paths interactions.jsonl models/learning_paths --profiles users.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .cohort_scan import load_columns
+from .interaction_batch import InteractionBatch
+from .recommender import CONTENT_FORMATS, DIFFICULTY_LEVELS, ContentRecommender
+from .timestamps import MISSING, US_PER_DAY
+from .wire_format import json_loads
+
+PATH_WINDOW = 50  # most recent interactions per user, as the backend's recommendations route sends
+
+# /api/ml/recommend: average score needed for intermediate and advanced
+RECOMMEND_DIFFICULTY_SCORES = (60, 80)
+# Learning style -> recommended format (unknown styles get 'mixed')
+STYLE_FORMATS = {
+    'visual': 'video',
+    'auditory': 'audio',
+    'kinesthetic': 'interactive',
+    'reading': 'text',
+    'mixed': 'mixed'
+}
+RECOMMEND_FORMATS = ('video', 'audio', 'interactive', 'text', 'mixed')
+# Advice for average sessions over 45 minutes, under 20 minutes, and otherwise
+STUDY_HABITS = (
+    'Consider taking a 5-minute break every 45 minutes',
+    'Try extending sessions to 20-25 minutes for better retention',
+    'Your session length is optimal!'
+)
+
+MAX_PATH_FORMATS = 3
+PATH_DTYPE = np.dtype([
+    ('profile', np.uint32),  # profile_key of the profile used
+    ('interactions', np.int32),
+    ('avg_session_duration', np.float64),
+    ('completion_rate', np.float64),
+    ('avg_score', np.float64),
+    ('focus_level', np.float64),
+    ('difficulty', np.int8),  # DIFFICULTY_LEVELS
+    ('format', np.int8),  # RECOMMEND_FORMATS
+    ('study_habit', np.int8),  # STUDY_HABITS
+    ('path_difficulty', np.int8),  # DIFFICULTY_LEVELS
+    ('path_formats', np.int8, (MAX_PATH_FORMATS,)),  # CONTENT_FORMATS, -1 padded
+    ('break_minutes', np.uint8),
+    ('daily_minutes', np.uint8),
+    ('engagement', np.float64)
+])
+
+# Columns read from an interactions export
+PATH_COLUMNS = ('session_duration', 'completed', 'score', 'focus_level', 'completion_rate',
+                'emotion_score', 'epoch_us')
+
+_recommender = ContentRecommender()
+
+
+def profile_key(profile: Optional[Dict]) -> int:
+    """Checksum of the profile fields recommendations depend on"""
+    profile = profile or {}
+    styles = profile.get('neurodiversityType', [])
+    if isinstance(styles, str):
+        styles = [styles]
+    key = f"{profile.get('learningStyle', 'mixed')}|{','.join(sorted(map(str, styles or ())))}"
+    return zlib.crc32(key.encode())
+
+
+def session_frequency(batch: InteractionBatch) -> np.ndarray:
+    """Per-user DataPreprocessor session frequency (sessions per week, at most 10)"""
+    n = batch.n_users
+    timed = batch.epoch_us != MISSING
+    owner = batch.owner[timed]
+    epochs = batch.epoch_us[timed]
+    counts = np.bincount(owner, minlength=n)
+
+    first = np.full(n, np.iinfo(np.int64).max)
+    last = np.full(n, np.iinfo(np.int64).min)
+    np.minimum.at(first, owner, epochs)
+    np.maximum.at(last, owner, epochs)
+    first[counts == 0] = last[counts == 0] = 0
+
+    days = np.unique(np.stack([owner, epochs // US_PER_DAY]), axis=1)
+    active_days = np.bincount(days[0], minlength=n)
+    date_range = (last - first) // US_PER_DAY
+    date_range[date_range == 0] = 1
+    frequency = np.minimum(active_days / date_range * 7, 10)
+    frequency = np.where((batch.lengths >= 2) & (counts >= 2), frequency, 1.0)
+    return np.where(batch.lengths > 0, frequency, 0.0)
+
+
+def materialize(batch: InteractionBatch, profiles: List[Optional[Dict]],
+                recommender: Optional[ContentRecommender] = None) -> np.ndarray:
+    """
+    Path rows for every user of a batch
+
+    Args:
+        batch: Interaction histories, one group per user
+        profiles: User profile per group (learningStyle, neurodiversityType)
+        recommender: ContentRecommender building the learning paths
+
+    Returns:
+        PATH_DTYPE array, one row per user
+    """
+    recommender = recommender or _recommender
+    n = batch.n_users
+    active = batch.lengths > 0
+    rows = np.zeros(n, dtype=PATH_DTYPE)
+    if not n:
+        return rows
+
+    # /api/ml/recommend features and recommendations
+    score = batch.group_mean(batch.score)
+    duration = batch.group_mean(batch.session_duration)
+    rows['profile'] = [profile_key(profile) for profile in profiles]
+    rows['interactions'] = batch.lengths
+    rows['avg_session_duration'] = duration
+    rows['completion_rate'] = batch.group_mean(batch.completed)
+    rows['avg_score'] = score
+    rows['focus_level'] = np.where(active, batch.group_mean(batch.focus_level) / 10, 0.5)
+    rows['difficulty'] = np.searchsorted(RECOMMEND_DIFFICULTY_SCORES, score, side='right')
+    formats = [STYLE_FORMATS.get((profile or {}).get('learningStyle', 'mixed'), 'mixed') for profile in profiles]
+    rows['format'] = [RECOMMEND_FORMATS.index(name) for name in formats]
+    rows['study_habit'] = np.where(duration > 45, 0, np.where(duration < 20, 1, 2))
+
+    # DataPreprocessor features read by generate_learning_path
+    focus = batch.group_mean(batch.focus_level)
+    completion = batch.group_mean(batch.completion_rate)
+    frequency = session_frequency(batch)
+    stability = np.where(active, 1.0 - batch.group_std(batch.emotion_score), 0.0)
+
+    format_codes = {name: code for code, name in enumerate(CONTENT_FORMATS)}
+    for k, profile in enumerate(profiles):
+        features = {
+            'performance_score': score[k],
+            'avg_focus_level': focus[k],
+            'avg_completion_rate': completion[k],
+            'session_frequency': frequency[k],
+            'emotional_stability': stability[k]
+        }
+        path = recommender.generate_learning_path(features, profile or {})
+        formats = [format_codes[name] for name in path['preferred_formats']][:MAX_PATH_FORMATS]
+        row = rows[k]
+        row['path_difficulty'] = DIFFICULTY_LEVELS.index(path['recommended_difficulty'])
+        row['path_formats'] = formats + [-1] * (MAX_PATH_FORMATS - len(formats))
+        row['break_minutes'] = path['break_frequency_minutes']
+        row['daily_minutes'] = path['daily_learning_time_minutes']
+        row['engagement'] = recommender.calculate_engagement_score(features)  # unrounded, for the message
+    return rows
+
+
+def decode(row: np.void) -> Dict[str, Any]:
+    """A path row as /api/ml/recommend fields (recommendations, features, learningPath)"""
+    (_, interactions, duration, completion, score, focus, difficulty, style_format, habit,
+     path_difficulty, path_formats, break_minutes, daily_minutes, engagement) = row.item()
+    return {
+        'recommendations': [
+            {'type': 'difficulty', 'value': DIFFICULTY_LEVELS[difficulty], 'confidence': 0.8},
+            {'type': 'format', 'value': RECOMMEND_FORMATS[style_format], 'confidence': 0.7},
+            {'type': 'study_habit', 'value': STUDY_HABITS[habit], 'confidence': 0.75}
+        ],
+        'features': {
+            'avg_session_duration': duration,
+            'completion_rate': completion,
+            'avg_score': score,
+            'interaction_count': interactions,
+            'focus_level': focus
+        },
+        'learningPath': {
+            'recommended_difficulty': DIFFICULTY_LEVELS[path_difficulty],
+            'preferred_formats': [CONTENT_FORMATS[code] for code in path_formats.tolist() if code >= 0],
+            'break_frequency_minutes': break_minutes,
+            'engagement_score': round(engagement, 2),
+            'daily_learning_time_minutes': daily_minutes,
+            'motivational_message': _recommender._get_motivational_message(engagement)
+        }
+    }
+
+
+def recommend(interactions: Any, profile: Optional[Dict]) -> Dict[str, Any]:
+    """Live /api/ml/recommend fields for one user (an InteractionBatch or interaction list)"""
+    return decode(materialize(InteractionBatch.coerce(interactions), [profile])[0])
+
+
+class LearningPathStore:
+    """Materialized paths by user id, reloaded when the job publishes a new generation"""
+
+    def __init__(self, path: str, reload_interval: float = 5.0):
+        """
+        Args:
+            path: Store directory (created if missing)
+            reload_interval: Seconds between checks for a new generation
+        """
+        self.path = path
+        self.reload_interval = reload_interval
+        self.generation = 0
+        self.built = None
+        self._current: Tuple[np.ndarray, Dict[str, int]] = (np.zeros(0, dtype=PATH_DTYPE), {})
+        self._dirty: Set[str] = set()
+        self._dirty_log = (None, 0)  # (inode, bytes read) of dirty.log
+        self._lock = threading.Lock()
+        self._checked = time.monotonic()
+        self.hits = self.misses = 0
+        os.makedirs(path, exist_ok=True)
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._current[1])
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._current[1]
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _read_current(self) -> Dict[str, Any]:
+        try:
+            with open(self._file('current.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'generation': 0}
+
+    def _read_log(self, users: Set[str], offset: int = 0):
+        """Add the complete lines of dirty.log from `offset` on; records how far it read"""
+        try:
+            with open(self._file('dirty.log'), 'rb') as f:
+                inode = os.fstat(f.fileno()).st_ino
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            self._dirty_log = (None, 0)
+            return
+        data = data[:data.rfind(b'\n') + 1]  # a partly written line is read next time
+        users.update(line for line in data.decode().split('\n') if line.strip())
+        self._dirty_log = (inode, offset + len(data))
+
+    def _read_dirty(self) -> Set[str]:
+        users = set()
+        for name in sorted(glob.glob(self._file('dirty-*.claimed'))):
+            try:
+                with open(name) as f:
+                    users.update(line.rstrip('\n') for line in f if line.strip())
+            except FileNotFoundError:
+                pass
+        self._read_log(users)
+        return users
+
+    def _load(self):
+        """Open the published generation and the pending dirty marks"""
+        current = self._read_current()
+        generation = current['generation']
+        if generation:
+            rows = np.lib.format.open_memmap(self._file(f"paths-{generation}.npy"), mode='r')
+            with open(self._file(f"users-{generation}.json")) as f:
+                users = json.load(f)
+            if rows.dtype != PATH_DTYPE or len(rows) != len(users):
+                raise ValueError(f"{self.path} does not hold learning paths in the current format")
+        else:
+            rows, users = np.zeros(0, dtype=PATH_DTYPE), []
+        with self._lock:
+            self._current = (rows, {user: k for k, user in enumerate(users)})
+            self._dirty = self._read_dirty()
+            self.generation = generation
+            self.built = current.get('built')
+
+    def _refresh_dirty(self):
+        """Pick up marks appended to dirty.log since the last read (by any process)"""
+        inode, offset = self._dirty_log
+        try:
+            stat = os.stat(self._file('dirty.log'))
+        except FileNotFoundError:
+            stat = None
+        if stat is not None and stat.st_ino == inode and stat.st_size == offset:
+            return
+        with self._lock:
+            if stat is not None and stat.st_ino == inode and stat.st_size > offset:
+                self._read_log(self._dirty, offset)
+            elif stat is not None or inode is not None:
+                # A new log (the job claimed the old one): claimed marks still count until published
+                self._dirty = self._read_dirty()
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload if the job published a new generation. Returns True if it did."""
+        self._refresh_dirty()
+        now = time.monotonic()
+        if not force and now - self._checked < self.reload_interval:
+            return False
+        self._checked = now
+        if self._read_current()['generation'] == self.generation:
+            return False
+        self._load()
+        return True
+
+    def row(self, user_id: str) -> Optional[np.void]:
+        """A user's row, or None if not materialized"""
+        rows, index = self._current
+        k = index.get(user_id)
+        return rows[k] if k is not None else None
+
+    def get(self, user_id: str, profile: Optional[Dict] = None) -> Optional[Dict[str, Any]]:
+        """
+        A user's materialized recommendations
+
+        Args:
+            user_id: User identifier
+            profile: Profile of the request; a row built for a different
+                learningStyle or neurodiversityType is not used
+
+        Returns:
+            decode() of the row, or None if the user is not materialized,
+            marked dirty or had another profile
+        """
+        self.refresh()
+        row = None if user_id in self._dirty else self.row(user_id)
+        if row is None or (profile is not None and row['profile'] != profile_key(profile)):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return decode(row)
+
+    def is_dirty(self, user_id: str) -> bool:
+        return user_id in self._dirty
+
+    def mark_dirty(self, user_ids: List[str]) -> int:
+        """
+        Record users whose interactions changed since the last run
+
+        Marks are always appended: a user already marked may have had that
+        mark claimed by a job run that will not see this interaction.
+
+        Returns:
+            Number of users marked
+        """
+        users = list(dict.fromkeys(map(str, user_ids)))
+        if not users:
+            return 0
+        with self._lock:
+            with open(self._file('dirty.log'), 'a') as f:
+                f.write(''.join(f"{user}\n" for user in users))
+            self._dirty.update(users)
+        return len(users)
+
+    def claim_dirty(self) -> Tuple[Set[str], List[str]]:
+        """
+        Take the pending dirty marks for a job run
+
+        dirty.log is renamed so marks made during the run start a new log.
+
+        Returns:
+            (user ids, claimed files to delete once the run is published)
+        """
+        log = self._file('dirty.log')
+        if os.path.exists(log):
+            os.replace(log, self._file(f"dirty-{time.time_ns()}.claimed"))
+        claimed = sorted(glob.glob(self._file('dirty-*.claimed')))
+        users = set()
+        for name in claimed:
+            with open(name) as f:
+                users.update(line.rstrip('\n') for line in f if line.strip())
+        return users, claimed
+
+    def publish(self, user_ids: List[str], rows: np.ndarray, claimed: Optional[List[str]] = None) -> int:
+        """
+        Write and publish a new generation
+
+        Args:
+            user_ids: One id per row
+            rows: PATH_DTYPE rows
+            claimed: Dirty logs the rows account for (deleted afterwards)
+
+        Returns:
+            The new generation number
+        """
+        previous = self._read_current()['generation']
+        generation = previous + 1
+        paths_file = self._file(f"paths-{generation}.npy")
+        users_file = self._file(f"users-{generation}.json")
+        np.save(paths_file + '.tmp.npy', np.asarray(rows, dtype=PATH_DTYPE))
+        os.replace(paths_file + '.tmp.npy', paths_file)
+        with open(users_file + '.tmp', 'w') as f:
+            json.dump(list(user_ids), f)
+        os.replace(users_file + '.tmp', users_file)
+
+        with open(self._file('current.json.tmp'), 'w') as f:
+            json.dump({'generation': generation, 'users': len(user_ids),
+                       'built': datetime.now().isoformat()}, f)
+        os.replace(self._file('current.json.tmp'), self._file('current.json'))
+
+        for name in (claimed or []) + [self._file(f"paths-{previous}.npy"), self._file(f"users-{previous}.json")]:
+            if os.path.exists(name):
+                os.remove(name)
+        self._load()
+        return generation
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'users': len(self),
+            'dirty': len(self._dirty),
+            'generation': self.generation,
+            'built': self.built,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+def load_profiles(path: str) -> Dict[str, Dict]:
+    """User profiles by id from a users export (.json array or .jsonl)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if path.endswith(('.jsonl', '.ndjson')):
+        users = [json_loads(line) for line in data.splitlines() if line.strip()]
+    else:
+        users = json_loads(data)
+    return {str(user.get('_id', user.get('userId', user.get('id')))): user for user in users}
+
+
+def run(store: LearningPathStore, interactions_path: str, profiles: Optional[Dict[str, Dict]] = None,
+        full: bool = False, window: int = PATH_WINDOW, workers: Optional[int] = None) -> Dict[str, int]:
+    """
+    Materialize paths into a store
+
+    Users new to the store, marked dirty or whose profile changed are
+    computed from their `window` most recent interactions; the rest keep
+    their rows. With full=True everyone in the export is recomputed and
+    users no longer in it are dropped.
+
+    Returns:
+        Counts of users computed, kept and in all, and the generation
+    """
+    profiles = profiles or {}
+    dirty, claimed = store.claim_dirty()
+    user_ids, columns = load_columns(interactions_path, workers, columns=PATH_COLUMNS)
+    users, owner = np.unique(user_ids, return_inverse=True)
+
+    old_rows, old_index = store._current
+    if full:
+        stale = np.ones(len(users), dtype=bool)
+    else:
+        stale = np.array([user not in old_index or user in dirty
+                          or old_rows[old_index[user]]['profile'] != profile_key(profiles.get(user))
+                          for user in users.tolist()], dtype=bool)
+    computed = users[stale]
+    # Dirty users missing from the export are dropped rather than served stale
+    recomputed = set(computed.tolist())
+    kept = [] if full else [user for user in old_index if user not in recomputed and user not in dirty]
+
+    # Each stale user's most recent interactions, grouped by user
+    selected = np.flatnonzero(stale[owner])
+    order = selected[np.lexsort((~columns['epoch_us'][selected], owner[selected]))]
+    groups = owner[order]
+    starts = np.searchsorted(groups, groups, side='left')
+    order = order[np.arange(len(order)) - starts < window]
+    lengths = np.bincount((np.cumsum(stale) - 1)[owner[order]], minlength=len(computed))
+    batch = InteractionBatch.from_columns({name: values[order] for name, values in columns.items()}, lengths)
+    rows = materialize(batch, [profiles.get(user) for user in computed.tolist()])
+
+    all_users = kept + computed.tolist()
+    all_rows = np.concatenate([old_rows[[old_index[user] for user in kept]], rows]) if kept else rows
+    generation = store.publish(all_users, all_rows, claimed)
+    return {'computed': len(computed), 'kept': len(kept), 'users': len(all_users), 'generation': generation}
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description='Materialize learning paths for every user')
+    parser.add_argument('interactions', help='interactions export (.json array or .jsonl)')
+    parser.add_argument('store', help='store directory (ML_LEARNING_PATHS)')
+    parser.add_argument('--profiles', help='users export with learningStyle and neurodiversityType '
+                                           '(without it rows only match requests without those fields)')
+    parser.add_argument('--full', action='store_true', help='recompute every user, not only dirty and new ones')
+    parser.add_argument('--window', type=int, default=PATH_WINDOW,
+                        help=f"recent interactions per user (default {PATH_WINDOW})")
+    parser.add_argument('--workers', type=int, help='worker processes for loading (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    begin = time.perf_counter()
+    store = LearningPathStore(args.store)
+    profiles = load_profiles(args.profiles) if args.profiles else {}
+    result = run(store, args.interactions, profiles, args.full, args.window, args.workers)
+    print(f"✓ Generation {result['generation']}: {result['users']:,} users, {result['computed']:,} computed, "
+          f"{result['kept']:,} kept in {time.perf_counter() - begin:.1f}s -> {args.store}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,221 @@
+"""
+NeuroLearn Metrics
+Per-route request counters and per-stage latency histograms
+
+Stages (JSON parse, feature extraction, inference, serialization) are
+timed with a thread-local stack so nested stages are counted exclusively:
+time spent in a child stage is not also charged to its parent. Whatever is
+left of a request after its stages is reported as the 'handler' stage.
+
+Recording costs two perf_counter() calls per stage plus one short locked
+update per request, so it can stay on under production load.
+
+Model failures (a trained model that raised or timed out while the
+request was answered without it) are counted per model.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+# Histogram bucket upper bounds in seconds (last bucket is +Inf)
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+_local = threading.local()
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram"""
+
+    __slots__ = ('counts', 'count', 'total')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket containing the q-th quantile"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for bound, n in zip(LATENCY_BUCKETS + (float('inf'),), self.counts):
+            cumulative += n
+            if cumulative >= rank:
+                return bound
+        return float('inf')
+
+    def summary(self) -> Dict[str, Any]:
+        def ms(value):
+            return None if value is None else (round(value * 1000, 3) if value != float('inf') else 'inf')
+        return {
+            'count': self.count,
+            'meanMs': round(self.total / self.count * 1000, 3) if self.count else None,
+            'p50Ms': ms(self.quantile(0.5)),
+            'p95Ms': ms(self.quantile(0.95)),
+            'p99Ms': ms(self.quantile(0.99))
+        }
+
+
+class RouteMetrics:
+    """Counters and histograms for one route"""
+
+    __slots__ = ('requests', 'errors', 'latency', 'stages')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+        self.stages = {}
+
+
+class MetricsRegistry:
+    """Collects request and stage timings for every route"""
+
+    def __init__(self):
+        self._routes = {}
+        self._model_failures = {}
+        self._lock = threading.Lock()
+
+    def begin_request(self):
+        """Start collecting stage timings for the current thread's request"""
+        _local.stages = {}
+        _local.stack = []
+        _local.started = time.perf_counter()
+
+    def end_request(self, route: str, status_code: int):
+        """Record the current request's total latency, status and stages"""
+        started = getattr(_local, 'started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        stages = _local.stages
+        _local.started = None
+
+        handler = elapsed - sum(stages.values())
+        with self._lock:
+            metrics = self._routes.get(route)
+            if metrics is None:
+                metrics = self._routes[route] = RouteMetrics()
+            metrics.requests += 1
+            if status_code >= 400:
+                metrics.errors += 1
+            metrics.latency.observe(elapsed)
+            for name, seconds in stages.items():
+                self._stage(metrics, name).observe(seconds)
+            self._stage(metrics, 'handler').observe(max(handler, 0.0))
+
+    def record_model_failure(self, model: str):
+        """Count a model prediction that failed and was left out of a response"""
+        with self._lock:
+            self._model_failures[model] = self._model_failures.get(model, 0) + 1
+
+    def model_failures(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._model_failures)
+
+    @staticmethod
+    def _stage(metrics: RouteMetrics, name: str) -> LatencyHistogram:
+        histogram = metrics.stages.get(name)
+        if histogram is None:
+            histogram = metrics.stages[name] = LatencyHistogram()
+        return histogram
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly summary of every route"""
+        with self._lock:
+            return {
+                route: {
+                    'requests': m.requests,
+                    'errors': m.errors,
+                    'latency': m.latency.summary(),
+                    'stages': {name: h.summary() for name, h in m.stages.items()}
+                }
+                for route, m in self._routes.items()
+            }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines = [
+            '# HELP ml_api_requests_total Requests handled per route',
+            '# TYPE ml_api_requests_total counter',
+            '# HELP ml_api_request_errors_total Requests per route that returned status >= 400',
+            '# TYPE ml_api_request_errors_total counter',
+            '# HELP ml_api_request_duration_seconds End-to-end request latency',
+            '# TYPE ml_api_request_duration_seconds histogram',
+            '# HELP ml_api_stage_duration_seconds Exclusive time per request stage',
+            '# TYPE ml_api_stage_duration_seconds histogram',
+            '# HELP ml_api_model_failures_total Model predictions that failed and were left out of a response',
+            '# TYPE ml_api_model_failures_total counter'
+        ]
+        with self._lock:
+            for model, count in self._model_failures.items():
+                lines.append(f'ml_api_model_failures_total{{model="{model}"}} {count}')
+            for route, m in self._routes.items():
+                labels = f'route="{route}"'
+                lines.append(f'ml_api_requests_total{{{labels}}} {m.requests}')
+                lines.append(f'ml_api_request_errors_total{{{labels}}} {m.errors}')
+                lines.extend(_histogram_lines('ml_api_request_duration_seconds', labels, m.latency))
+                for name, histogram in m.stages.items():
+                    stage_labels = f'{labels},stage="{name}"'
+                    lines.extend(_histogram_lines('ml_api_stage_duration_seconds', stage_labels, histogram))
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(metric: str, labels: str, histogram: LatencyHistogram) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, n in zip(LATENCY_BUCKETS, histogram.counts):
+        cumulative += n
+        lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f'{metric}_sum{{{labels}}} {histogram.total:.6f}')
+    lines.append(f'{metric}_count{{{labels}}} {histogram.count}')
+    return lines
+
+
+@contextmanager
+def stage(name: str):
+    """Time the enclosed block as a named stage of the current request"""
+    stages = getattr(_local, 'stages', None)
+    if stages is None or getattr(_local, 'started', None) is None:
+        yield
+        return
+
+    stack = _local.stack
+    stack.append(0.0)  # time spent in child stages
+    begin = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - begin
+        child_time = stack.pop()
+        stages[name] = stages.get(name, 0.0) + elapsed - child_time
+        if stack:
+            stack[-1] += elapsed
+
+
+def timed_stage(name: str) -> Callable:
+    """Decorator form of stage()"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,231 @@
+"""
+NeuroLearn Model Server
+Serves the trained scikit-learn models with micro-batched inference
+
+Concurrent requests each contribute one feature row; a background thread
+collects rows for a short time/size window and runs a single predict call
+over the stacked matrix, since sklearn's per-call overhead dominates the
+cost of scoring one row.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+from .interaction_batch import InteractionBatch
+from .metrics import timed_stage
+
+
+# Same order and scaling as train_with_kaggle.extract_features
+MODEL_FEATURE_NAMES = [
+    'duration', 'completion_rate', 'focus_level',
+    'session_freq', 'content_variety', 'performance',
+    'emotional_stability', 'learning_pace', 'interaction_count',
+    'pause_freq', 'revisit_rate', 'hint_usage'
+]
+
+
+def model_feature_vector(interaction: Dict) -> List[float]:
+    """Build the 12-feature vector the models were trained on for one interaction"""
+    performance = interaction.get('performance', {})
+    features = interaction.get('features', {})
+    return [
+        interaction.get('duration', 0) / 3600,  # Convert to hours
+        interaction.get('completionRate', 0) / 100,
+        interaction.get('focusLevel', 5) / 10,
+        1.0,  # session_frequency (normalized)
+        1.0,  # content_variety (normalized)
+        performance.get('score', 0) / 100,
+        0.8,  # emotional_stability (estimated)
+        1.0,  # learning_pace (normalized)
+        1.0,  # interaction_count (normalized)
+        features.get('pauseFrequency', 0) / 20,
+        features.get('revisitCount', 0) / 10,
+        performance.get('hints', 0) / 20
+    ]
+
+
+@timed_stage('features')
+def history_feature_matrix(batch: InteractionBatch) -> np.ndarray:
+    """model_feature_vector for every row of an InteractionBatch, as a matrix"""
+    n = len(batch)
+    ones = np.ones(n)
+    return np.column_stack([
+        batch.duration / 3600,
+        batch.completion_rate / 100,
+        batch.focus_level / 10,
+        ones,
+        ones,
+        batch.score / 100,
+        np.full(n, 0.8),
+        ones,
+        ones,
+        batch.pause_frequency / 20,
+        batch.revisit_count / 10,
+        batch.hints / 20
+    ])
+
+
+def history_feature_vector(interaction_history: Union[InteractionBatch, List[Dict]]) -> np.ndarray:
+    """Average per-interaction feature vectors into one row for the user"""
+    return history_feature_matrix(InteractionBatch.coerce(interaction_history)).mean(axis=0)
+
+
+class MicroBatcher:
+    """Collects single-row requests from many threads into batched calls"""
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], Any],
+                 max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._pid = None
+        self.batches = 0
+        self.rows = 0
+
+    def _ensure_worker(self):
+        """Start the collector thread lazily (and again after a fork)"""
+        if self._worker is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is not None and self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name='model-microbatcher', daemon=True)
+            self._worker.start()
+
+    def submit(self, row: np.ndarray) -> Future:
+        """Queue one feature row; the future resolves to that row's prediction"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((row, future))
+        return future
+
+    def predict(self, row: np.ndarray, timeout: Optional[float] = 5.0) -> Any:
+        """Submit one row and wait for its prediction"""
+        return self.submit(row).result(timeout=timeout)
+
+    def _run(self):
+        q = self._queue
+        while True:
+            pending = [q.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            accepted = [(r, f) for r, f in pending if f.set_running_or_notify_cancel()]
+            if not accepted:
+                continue
+            rows = np.vstack([r for r, _ in accepted])
+            futures = [f for _, f in accepted]
+            try:
+                outputs = self.predict_fn(rows)
+            except Exception as e:
+                for f in futures:
+                    f.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.rows += len(futures)
+            for f, output in zip(futures, outputs):
+                f.set_result(output)
+
+    def stats(self) -> Dict[str, float]:
+        """Batching effectiveness counters"""
+        return {
+            'batches': self.batches,
+            'rows': self.rows,
+            'averageBatchSize': round(self.rows / self.batches, 2) if self.batches else 0.0
+        }
+
+
+class ModelServer:
+    """Micro-batched inference over the trained neurodiversity and performance models"""
+
+    def __init__(self, neurodiversity_model=None, performance_model=None,
+                 max_batch_size: int = 32, max_wait_ms: float = 2.0,
+                 n_jobs: Optional[int] = None):
+        self.neurodiversity_model = neurodiversity_model
+        self.performance_model = performance_model
+        self._neurodiversity_batcher = None
+        self._performance_batcher = None
+
+        # Models are trained with n_jobs=-1; override when several worker
+        # processes already share the cores
+        if n_jobs is not None:
+            for model in (neurodiversity_model, performance_model):
+                if model is not None and hasattr(model, 'n_jobs'):
+                    model.n_jobs = n_jobs
+
+        if neurodiversity_model is not None:
+            self._neurodiversity_batcher = MicroBatcher(
+                neurodiversity_model.predict_proba, max_batch_size, max_wait_ms
+            )
+        if performance_model is not None:
+            self._performance_batcher = MicroBatcher(
+                performance_model.predict, max_batch_size, max_wait_ms
+            )
+
+    @timed_stage('inference')
+    def classify_neurodiversity(self, interaction_history: Union[InteractionBatch, List[Dict]]) -> Optional[Dict[str, Any]]:
+        """
+        Classify a user's neurodiversity profile with the trained classifier
+
+        Args:
+            interaction_history: User's interaction history
+
+        Returns:
+            Dict with predicted label and class probabilities, or None if
+            the model is unavailable or the history is empty
+        """
+        if self._neurodiversity_batcher is None or not len(interaction_history):
+            return None
+
+        proba = self._neurodiversity_batcher.predict(history_feature_vector(interaction_history))
+        classes = self.neurodiversity_model.classes_
+        best = int(np.argmax(proba))
+        return {
+            'label': str(classes[best]),
+            'confidence': round(float(proba[best]), 3),
+            'probabilities': {str(c): round(float(p), 3) for c, p in zip(classes, proba)}
+        }
+
+    @timed_stage('inference')
+    def predict_score(self, interaction_history: Union[InteractionBatch, List[Dict]]) -> Optional[Dict[str, Any]]:
+        """
+        Predict a user's performance level with the trained regressor
+
+        Returns:
+            Dict with predicted score, or None if unavailable
+        """
+        if self._performance_batcher is None or not len(interaction_history):
+            return None
+
+        score = self._performance_batcher.predict(history_feature_vector(interaction_history))
+        return {
+            'predictedScore': round(float(score), 1)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Micro-batching counters per model"""
+        return {
+            name: batcher.stats()
+            for name, batcher in (('neurodiversity', self._neurodiversity_batcher),
+                                  ('performance', self._performance_batcher))
+            if batcher is not None
+        }
@@ -0,0 +1,183 @@
+"""
+NeuroLearn Online Performance State
+Constant-time running statistics for performance prediction
+
+PerformancePredictor.predict_performance rescans the whole history on
+every call. OnlinePerformanceState keeps the statistics it needs and
+updates them in O(1) per interaction:
+
+- score mean and variance (Welford)
+- focus level and completion rate sums
+- a ring buffer of the most recent scores
+- the exponentially decayed weighted mean of scores
+- the score trend line (performance_trend.LinearTrend)
+
+With a window, the oldest interaction is removed as each new one arrives
+beyond it, matching the state store's bounded history.
+
+The batch weights are exp(-age / (n - 1)), so the decay rate depends on
+the history length and a fixed-rate EMA cannot reproduce them. Instead
+the state keeps age moments sum(score * age^j) for j = 0..degree, which
+shift with a fixed binomial matrix when every age grows by one, and
+evaluates exp() through its Taylor series. With the default degree of 12
+the truncation error is below 1/13! (about 2e-10) per weight. Removing
+interactions leaves rounding residue in the moments that the shift would
+amplify as it ages, so a windowed state rebuilds its moments from the
+window once every `window` removals (amortized O(degree) per update).
+
+Tolerance: raw statistics match the batch computation to within 1e-6.
+Rounded outputs agree except when a value lies within float error of a
+rounding boundary.
+"""
+
+from collections import deque
+from math import comb, factorial
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from .performance_trend import LinearTrend, trend_sums
+
+
+class OnlinePerformanceState:
+    """Incrementally updated performance statistics for one user's history"""
+
+    def __init__(self, window: Optional[int] = None, recent_window: int = 3, degree: int = 12):
+        """
+        Args:
+            window: Keep only the newest `window` interactions (None = all)
+            recent_window: Size of the recent-score ring buffer (the batch predictor uses 3)
+            degree: Taylor degree for the decay weights
+        """
+        self.window = window
+        self.recent_window = recent_window
+        self.degree = degree
+
+        # shift[j, m] = C(j, m): moments after every age increases by one
+        self._shift = np.array([[comb(j, m) for m in range(degree + 1)]
+                                for j in range(degree + 1)], dtype=float)
+        # Taylor coefficients of exp(-x)
+        self._taylor = np.array([(-1) ** j / factorial(j) for j in range(degree + 1)])
+        self._exponents = np.arange(degree + 1)
+        self.reset()
+
+    def reset(self):
+        """Forget all interactions"""
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.focus_sum = 0.0
+        self.completion_sum = 0.0
+        self.recent = deque(maxlen=self.recent_window)
+        self._values = deque()  # (score, focus, completion) per interaction, windowed states only
+        self._removals = 0
+        self._score_moments = np.zeros(self.degree + 1)
+        self._age_moments = np.zeros(self.degree + 1)
+        self.trend = LinearTrend()
+
+    @classmethod
+    def from_history(cls, interactions: Iterable[Dict], **kwargs) -> 'OnlinePerformanceState':
+        state = cls(**kwargs)
+        for interaction in interactions:
+            state.push(interaction)
+        return state
+
+    @staticmethod
+    def _extract(interaction: Dict) -> Tuple[float, float, float]:
+        score = (interaction.get('performance') or {}).get('score', 0)
+        focus = interaction.get('focusLevel', 5)
+        completion = interaction.get('completionRate', 0)
+        return (float(score if score is not None else 0),
+                float(focus if focus is not None else 5),
+                float(completion if completion is not None else 0))
+
+    def push(self, interaction: Dict):
+        """Add the newest interaction (evicting the oldest if the window is full)"""
+        if self.window is not None and self.n >= self.window:
+            self._pop_oldest()
+
+        score, focus, completion = values = self._extract(interaction)
+        if self.window is not None:
+            self._values.append(values)
+
+        self.n += 1
+        delta = score - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (score - self.mean)
+
+        self.focus_sum += focus
+        self.completion_sum += completion
+        self.recent.append(score)
+        self.trend.add(score)
+
+        # Existing interactions age by one; the new one has age 0
+        self._score_moments = self._shift @ self._score_moments
+        self._age_moments = self._shift @ self._age_moments
+        self._score_moments[0] += score
+        self._age_moments[0] += 1.0
+
+    def _pop_oldest(self):
+        score, focus, completion = self._values.popleft()
+        if self.n <= 1:
+            self.reset()
+            return
+
+        powers = float(self.n - 1) ** self._exponents  # the oldest has the largest age
+        self._score_moments -= score * powers
+        self._age_moments -= powers
+        self.trend.remove_oldest(score)
+        if self.n <= self.recent_window:
+            self.recent.popleft()
+
+        self.focus_sum -= focus
+        self.completion_sum -= completion
+
+        mean_without = self.mean - (score - self.mean) / (self.n - 1)
+        self.m2 = max(0.0, self.m2 - (score - mean_without) * (score - self.mean))
+        self.mean = mean_without
+        self.n -= 1
+
+        self._removals += 1
+        if self._removals >= self.window:
+            self._rebuild()
+
+    def _rebuild(self):
+        """Recompute every statistic from the stored window"""
+        values = np.array(self._values, dtype=float).reshape(-1, 3)
+        scores = values[:, 0]
+        ages = np.arange(len(scores) - 1, -1, -1, dtype=float)
+        powers = ages[:, None] ** self._exponents
+
+        self._score_moments = scores @ powers
+        self._age_moments = powers.sum(axis=0)
+        self.mean = float(scores.mean()) if len(scores) else 0.0
+        self.m2 = float(((scores - self.mean) ** 2).sum())
+        self.focus_sum = float(values[:, 1].sum())
+        self.completion_sum = float(values[:, 2].sum())
+        for name, value in trend_sums(scores, np.zeros(len(scores), dtype=np.int64), ages, 1,
+                                      self.trend.forget).items():
+            setattr(self.trend, name, float(value[0]))
+        self._removals = 0
+
+    def weighted_mean(self) -> float:
+        """Score mean weighted by exp(-age / (n - 1)), as in the batch predictor"""
+        if self.n <= 1:
+            return self.mean
+        scale = (self.n - 1.0) ** -self._exponents
+        coefficients = self._taylor * scale
+        return float(coefficients @ self._score_moments / (coefficients @ self._age_moments))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Statistics in the form PerformancePredictor._performance_result takes"""
+        # With no more than recent_window interactions the recent average is the mean
+        recent_avg = sum(self.recent) / len(self.recent) if self.n > self.recent_window else self.mean
+        return {
+            'n': self.n,
+            'weighted_score': self.weighted_mean(),
+            'recent_avg': recent_avg,
+            'overall_avg': self.mean,
+            'variance': self.m2 / self.n if self.n else 0.0,
+            'avg_focus': self.focus_sum / self.n if self.n else 5.0,
+            'avg_completion': self.completion_sum / self.n if self.n else 0.0,
+            'trajectory': self.trend.estimate()
+        }
@@ -0,0 +1,232 @@
+"""
+NeuroLearn Performance Trend
+Incremental least-squares trend estimation for score trajectories
+
+A user's scores (0-100, oldest first) are fitted with a straight line by
+exponentially weighted least squares. The score `age` lessons ago gets
+weight forget^age, so the fit follows recent progress, and the line is
+parameterized at the newest lesson:
+
+    score ~ level - slope * age
+
+level is the fitted current score and slope is in points per lesson.
+The fit only needs six weighted sums (of 1, age, age^2, y, age * y and
+y^2). When a new score arrives every age grows by one, which rewrites
+the sums in closed form:
+
+    S0' = f S0 + 1            Sy'  = f Sy + y
+    S1' = f (S1 + S0)         S1y' = f (S1y + Sy)
+    S2' = f (S2 + 2 S1 + S0)  Syy' = f Syy + y^2
+
+(f = forget), so each update is O(1), as in recursive least squares.
+The oldest score of a windowed history can be subtracted back out just
+as cheaply.
+
+Forecasts h lessons ahead are level + h * slope. Their intervals use the
+weighted residual variance, shrunk toward PRIOR_VARIANCE by one
+pseudo-observation so short histories get wide but finite intervals,
+times the usual regression factor 1 + x' (X'WX)^-1 x at age -h.
+
+The trend is 'improving' or 'declining' only when the slope is both
+larger than STABLE_SLOPE and clear of its standard error (|t| > 1.5).
+
+LinearTrend updates one user's state per score (streaming). trend_batch
+computes the same sums for many users at once from their flat score
+arrays with grouped reductions, without a loop over time; only the O(1)
+per-user fit and response formatting remain per user.
+"""
+
+import math
+from typing import Any, Dict, List
+
+import numpy as np
+
+DEFAULT_FORGET = 0.95  # weight of a score one lesson older (~20-lesson memory)
+PRIOR_VARIANCE = 225.0  # (15 points)^2, one pseudo-observation
+STABLE_SLOPE = 0.5  # points per lesson; smaller slopes are 'stable'
+MIN_T_STAT = 1.5  # slope / standard error; (X'WX)^-1 overstates the error under forgetting
+MIN_TREND_POINTS = 3
+INTERVAL_Z = 1.2816  # 80% forecast interval
+FORECAST_LESSONS = 3
+
+_SUMS = ('s0', 's1', 's2', 'sy', 's1y', 'syy', 'w2')
+
+
+def fit(s0: float, s1: float, s2: float, sy: float, s1y: float, syy: float,
+        w2: float) -> Dict[str, float]:
+    """
+    Weighted least-squares line from one user's running sums
+
+    Returns:
+        level, slope, sigma (residual standard deviation), slope_se and
+        p00, p01, p11, the entries of (X'WX)^-1 used for forecast intervals
+    """
+    det = s0 * s2 - s1 * s1
+    if det > 1e-9 * s0 * s2 and det > 0:
+        beta = (s0 * s1y - s1 * sy) / det  # d score / d age
+        p00, p01, p11 = s2 / det, -s1 / det, s0 / det
+    else:  # fewer than two distinct ages: a flat line
+        beta = 0.0
+        p00, p01, p11 = 1 / s0 if s0 > 0 else 1.0, 0.0, 0.0
+    level = (sy - beta * s1) / s0 if s0 > 0 else 0.0
+    sse = max(0.0, syy - level * sy - beta * s1y)
+
+    # Residual degrees of freedom from the effective sample size (s0^2 / sum w^2)
+    dof = max(0.0, s0 - 2 * w2 / s0) if s0 > 0 else 0.0
+    variance = (sse + PRIOR_VARIANCE) / (dof + 1)
+    return {
+        'level': level,
+        'slope': 0.0 - beta,  # not -0.0 for flat lines
+        'sigma': math.sqrt(variance),
+        'slope_se': math.sqrt(variance * p11) if p11 > 0 else math.inf,
+        'p00': p00,
+        'p01': p01,
+        'p11': p11
+    }
+
+
+def trend_label(line: Dict[str, float], n: int) -> str:
+    """'improving', 'declining' or 'stable' from a fitted line"""
+    slope = line['slope']
+    if n < MIN_TREND_POINTS or abs(slope) <= STABLE_SLOPE or abs(slope) <= MIN_T_STAT * line['slope_se']:
+        return 'stable'
+    return 'improving' if slope > 0 else 'declining'
+
+
+def estimate(line: Dict[str, float], n: int, k: int = FORECAST_LESSONS) -> Dict[str, Any]:
+    """Level, slope, direction and the next k forecasts with 80% intervals (clipped to 0-100)"""
+    level, slope, sigma = line['level'], line['slope'], line['sigma']
+    p00, p01, p11 = line['p00'], line['p01'], line['p11']
+    points, interval = [], []
+    for h in range(1, k + 1):
+        point = level + h * slope
+        spread = INTERVAL_Z * sigma * math.sqrt(1 + p00 - 2 * h * p01 + h * h * p11)  # at age -h
+        points.append(round(min(100.0, max(0.0, point)), 1))
+        interval.append([round(min(100.0, max(0.0, point - spread)), 1),
+                         round(min(100.0, max(0.0, point + spread)), 1)])
+    return {
+        'level': round(level, 1),
+        'slope': round(slope, 2),
+        'direction': trend_label(line, n),
+        'forecast': points,
+        'interval': interval,
+        'sigma': round(sigma, 1),
+        'dataPoints': n
+    }
+
+
+class LinearTrend:
+    """Streaming exponentially weighted trend line for one user's scores"""
+
+    __slots__ = ('forget', 'n') + _SUMS
+
+    def __init__(self, forget: float = DEFAULT_FORGET):
+        self.forget = forget
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self.s0 = self.s1 = self.s2 = 0.0
+        self.sy = self.s1y = self.syy = 0.0
+        self.w2 = 0.0
+
+    @classmethod
+    def from_scores(cls, scores, **kwargs) -> 'LinearTrend':
+        trend = cls(**kwargs)
+        for score in np.asarray(scores, dtype=float).tolist():
+            trend.add(score)
+        return trend
+
+    def add(self, score: float):
+        """Update with the newest score: every earlier score ages by one lesson"""
+        f = self.forget
+        self.n += 1
+        self.s2 = f * (self.s2 + 2 * self.s1 + self.s0)
+        self.s1 = f * (self.s1 + self.s0)
+        self.s0 = f * self.s0 + 1.0
+        self.s1y = f * (self.s1y + self.sy)
+        self.sy = f * self.sy + score
+        self.syy = f * self.syy + score * score
+        self.w2 = f * f * self.w2 + 1.0
+
+    def remove_oldest(self, score: float):
+        """Take the oldest score (age n - 1) back out, for windowed histories"""
+        if self.n <= 1:
+            self.reset()
+            return
+        age = self.n - 1
+        weight = self.forget ** age
+        self.n -= 1
+        self.s0 -= weight
+        self.s1 -= weight * age
+        self.s2 -= weight * age * age
+        self.sy -= weight * score
+        self.s1y -= weight * age * score
+        self.syy -= weight * score * score
+        self.w2 -= weight * weight
+
+    def push(self, interaction: Dict):
+        """State-store tracker interface: add the interaction's score"""
+        score = (interaction.get('performance') or {}).get('score', 0)
+        self.add(float(score if score is not None else 0))
+
+    def line(self) -> Dict[str, float]:
+        return fit(self.s0, self.s1, self.s2, self.sy, self.s1y, self.syy, self.w2)
+
+    @property
+    def direction(self) -> str:
+        return trend_label(self.line(), self.n)
+
+    def estimate(self, k: int = FORECAST_LESSONS) -> Dict[str, Any]:
+        """Level, slope, direction and the next k forecasts with 80% intervals"""
+        return estimate(self.line(), self.n, k)
+
+
+def trend_sums(scores: np.ndarray, owner: np.ndarray, age: np.ndarray, n_users: int,
+               forget: float = DEFAULT_FORGET) -> Dict[str, np.ndarray]:
+    """
+    The LinearTrend sums of many users at once
+
+    Args:
+        scores: All users' scores
+        owner: User index of each score
+        age: Lessons since each score (0 for a user's newest)
+        n_users: Number of users
+    """
+    weights = forget ** np.asarray(age, dtype=float)
+    scores = np.asarray(scores, dtype=float)
+
+    def total(values):
+        return np.bincount(owner, weights=values, minlength=n_users)
+
+    return {
+        's0': total(weights),
+        's1': total(weights * age),
+        's2': total(weights * age * age),
+        'sy': total(weights * scores),
+        's1y': total(weights * age * scores),
+        'syy': total(weights * scores * scores),
+        'w2': total(weights * weights)
+    }
+
+
+def trend_batch(scores: np.ndarray, lengths: np.ndarray, k: int = FORECAST_LESSONS,
+                forget: float = DEFAULT_FORGET) -> List[Dict[str, Any]]:
+    """
+    LinearTrend.estimate for many users' score sequences at once
+
+    Args:
+        scores: All users' scores back to back, each user's oldest first
+        lengths: Scores per user
+        k: Lessons to forecast
+
+    Returns:
+        One estimate dict per user
+    """
+    lengths = np.asarray(lengths, dtype=np.int64)
+    owner = np.repeat(np.arange(len(lengths)), lengths)
+    ends = np.cumsum(lengths)
+    age = ends[owner] - 1 - np.arange(len(owner))
+    sums = trend_sums(scores, owner, age, len(lengths), forget)
+    columns = [sums[name].tolist() for name in _SUMS]
+    return [estimate(fit(*values), n, k) for values, n in zip(zip(*columns), lengths.tolist())]
@@ -10,10 +10,38 @@ Handles:
 """
 
 import numpy as np
-from typing import List, Dict, Any, Tuple
-from datetime import datetime, timedelta
-import joblib
-import os
+from typing import List, Dict, Any, Union
+
+from .interaction_batch import InteractionBatch
+from .online_performance import OnlinePerformanceState
+from .performance_trend import trend_batch
+from .session_fatigue import SessionFatigue
+from .skill_mastery import SkillIndex, SkillMasteryArrays
+from .knowledge_tracing import BayesianKnowledgeTracer
+from .metrics import timed_stage
+
+
+STRUGGLE_INTERVENTIONS = {
+    'high': [
+        'Suggest switching to easier content',
+        'Recommend taking a break',
+        'Offer video tutorial instead of text',
+        'Provide step-by-step guide'
+    ],
+    'moderate': [
+        'Suggest viewing additional examples',
+        'Recommend reviewing prerequisites',
+        'Offer hints for current challenge'
+    ],
+    'low': []
+}
+
+
+def _as_user_batch(histories: Union[InteractionBatch, List[List[Dict]]]) -> InteractionBatch:
+    """Multi-user InteractionBatch from per-user histories (or pass one through)"""
+    if isinstance(histories, InteractionBatch):
+        return histories
+    return InteractionBatch.from_histories(histories)
 
 
 class PerformancePredictor:
@@ -23,17 +51,19 @@ class PerformancePredictor:
         self.struggle_threshold = 0.6
         self.fatigue_threshold = 0.7
         
-    def predict_performance(self, interaction_history: List[Dict]) -> Dict[str, Any]:
+    @timed_stage('inference')
+    def predict_performance(self, interaction_history: Union[InteractionBatch, List[Dict]]) -> Dict[str, Any]:
         """
         Predict next performance score based on interaction history
         
         Args:
-            interaction_history: List of recent interactions with metrics
+            interaction_history: Recent interactions (list or InteractionBatch)
             
         Returns:
             Dict with predicted score, confidence, and recommendations
         """
-        if not interaction_history:
+        batch = InteractionBatch.coerce(interaction_history)
+        if not len(batch):
             return {
                 'predictedScore': 70,
                 'confidence': 0.3,
@@ -42,38 +72,64 @@ class PerformancePredictor:
             }
         
         # Extract performance metrics
-        scores = [i.get('performance', {}).get('score', 0) for i in interaction_history]
-        completion_rates = [i.get('completionRate', 0) for i in interaction_history]
-        focus_levels = [i.get('focusLevel', 5) for i in interaction_history]
-        
-        # Calculate trends
-        if len(scores) >= 3:
-            recent_avg = np.mean(scores[-3:])
-            overall_avg = np.mean(scores)
-            trend_direction = 'improving' if recent_avg > overall_avg else 'declining'
+        scores = batch.score
+        recent_avg = np.mean(scores[-3:]) if len(scores) >= 3 else batch.mean_score
+        
+        # Predict next score using weighted average
+        weights = np.exp(np.linspace(-1, 0, len(scores)))  # More weight to recent
+        weighted_scores = np.average(scores, weights=weights)
+        
+        return self._performance_result(
+            n=len(scores),
+            weighted_score=weighted_scores,
+            recent_avg=recent_avg,
+            overall_avg=batch.mean_score,
+            variance=np.var(scores),
+            avg_focus=np.mean(batch.focus_level),
+            avg_completion=np.mean(batch.completion_rate),
+            trajectory=trend_batch(scores, [len(scores)])[0]
+        )
+    
+    @timed_stage('inference')
+    def predict_performance_online(self, state: OnlinePerformanceState) -> Dict[str, Any]:
+        """
+        Predict next performance score from incrementally maintained statistics
+        
+        Same result as predict_performance on the history the state was
+        built from (see OnlinePerformanceState for the tolerance), in
+        constant time regardless of history length.
+        
+        Args:
+            state: Running statistics for one user's history
+            
+        Returns:
+            Dict with predicted score, confidence, and recommendations
+        """
+        if not state.n:
+            return self.predict_performance([])
+        return self._performance_result(**state.snapshot())
+    
+    def _performance_result(self, n: int, weighted_score: float, recent_avg: float,
+                            overall_avg: float, variance: float, avg_focus: float,
+                            avg_completion: float, trajectory: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn history statistics and the score trend line into a performance prediction"""
+        # Trend direction from the fitted slope (see performance_trend)
+        if n >= 3:
+            trend_direction = trajectory['direction']
             improvement_rate = ((recent_avg - overall_avg) / overall_avg * 100) if overall_avg > 0 else 0
         else:
-            recent_avg = np.mean(scores) if scores else 70
             trend_direction = 'stable'
             improvement_rate = 0
         
-        # Predict next score using weighted average
-        weights = np.exp(np.linspace(-1, 0, len(scores)))  # More weight to recent
-        weighted_scores = np.average(scores, weights=weights) if scores else 70
-        
         # Adjust based on focus and completion
-        avg_focus = np.mean(focus_levels) if focus_levels else 5
-        avg_completion = np.mean(completion_rates) if completion_rates else 50
-        
         focus_adjustment = (avg_focus - 5) * 2  # -10 to +10
         completion_adjustment = (avg_completion - 50) / 5  # Normalize
         
-        predicted_score = min(100, max(0, weighted_scores + focus_adjustment + completion_adjustment))
+        predicted_score = min(100, max(0, weighted_score + focus_adjustment + completion_adjustment))
         
         # Calculate confidence based on data quantity and consistency
-        confidence = min(0.95, (len(scores) / 20) * 0.5 + 0.3)  # 0.3 to 0.95
-        if len(scores) > 1:
-            variance = np.var(scores)
+        confidence = min(0.95, (n / 20) * 0.5 + 0.3)  # 0.3 to 0.95
+        if n > 1:
             confidence *= (1 - min(variance / 1000, 0.5))  # Reduce confidence for high variance
         
         # Generate recommendations
@@ -86,18 +142,21 @@ class PerformancePredictor:
             'confidence': round(confidence, 2),
             'trend': trend_direction,
             'improvementRate': round(improvement_rate, 1),
-            'currentAverage': round(np.mean(scores), 1) if scores else 0,
+            'currentAverage': round(overall_avg, 1),
             'recommendations': recommendations,
-            'dataPoints': len(scores)
+            'dataPoints': n,
+            'trajectory': trajectory
         }
     
-    def detect_struggle(self, current_session: Dict, interaction_history: List[Dict]) -> Dict[str, Any]:
+    @timed_stage('inference')
+    def detect_struggle(self, current_session: Dict,
+                        interaction_history: Union[InteractionBatch, List[Dict]]) -> Dict[str, Any]:
         """
         Detect if student is struggling in real-time
         
         Args:
             current_session: Current interaction metrics
-            interaction_history: Past interaction data
+            interaction_history: Past interaction data (list or InteractionBatch)
             
         Returns:
             Dict with struggle detection and intervention suggestions
@@ -141,8 +200,9 @@ class PerformancePredictor:
             struggle_score += 0.15
         
         # Compare with historical performance
-        if interaction_history:
-            avg_past_score = np.mean([i.get('performance', {}).get('score', 0) for i in interaction_history])
+        history = InteractionBatch.coerce(interaction_history)
+        if len(history):
+            avg_past_score = history.mean_score
             current_score = current_session.get('performance', {}).get('score', 0)
             if current_score < avg_past_score * 0.7:
                 struggle_indicators.append('below_average_performance')
@@ -153,22 +213,11 @@ class PerformancePredictor:
         
         if struggle_score >= 0.7:
             level = 'high'
-            interventions = [
-                'Suggest switching to easier content',
-                'Recommend taking a break',
-                'Offer video tutorial instead of text',
-                'Provide step-by-step guide'
-            ]
         elif struggle_score >= 0.4:
             level = 'moderate'
-            interventions = [
-                'Suggest viewing additional examples',
-                'Recommend reviewing prerequisites',
-                'Offer hints for current challenge'
-            ]
         else:
             level = 'low'
-            interventions = []
+        interventions = list(STRUGGLE_INTERVENTIONS[level])
         
         return {
             'isStruggling': struggle_score >= self.struggle_threshold,
@@ -179,6 +228,7 @@ class PerformancePredictor:
             'confidence': 0.8 if len(struggle_indicators) > 2 else 0.5
         }
     
+    @timed_stage('inference')
     def calculate_optimal_break_time(self, session_data: Dict, user_rhythm: Dict) -> Dict[str, Any]:
         """
         Calculate when user should take a break based on fatigue patterns
@@ -191,11 +241,53 @@ class PerformancePredictor:
             Dict with break recommendations
         """
         session_duration = session_data.get('duration', 0) / 60  # Convert to minutes
-        avg_attention_span = user_rhythm.get('averageAttentionSpan', 20)
-        preferred_break_interval = user_rhythm.get('preferredBreakInterval', 25)
         
         # Get focus level timeline
         focus_timeline = session_data.get('attentionMetrics', {}).get('focusLevelTimeline', [])
+        initial_focus = recent_focus = None
+        if len(focus_timeline) >= 2:
+            recent_focus = np.mean([f['level'] for f in focus_timeline[-3:]])
+            initial_focus = np.mean([f['level'] for f in focus_timeline[:3]])
+        
+        return self._break_result(
+            session_duration,
+            initial_focus,
+            recent_focus,
+            session_data.get('behaviorMetrics', {}).get('idleTime', 0),
+            session_data.get('sessionMetrics', {}).get('errorCount', 0),
+            user_rhythm
+        )
+    
+    @timed_stage('inference')
+    def calculate_optimal_break_time_online(self, state: SessionFatigue, user_rhythm: Dict) -> Dict[str, Any]:
+        """
+        Break recommendation from a live session's incremental fatigue state
+        
+        Same scoring as calculate_optimal_break_time, in constant time
+        however long the session's focus timeline has grown.
+        
+        Args:
+            state: The session's SessionFatigue (from FatigueTracker)
+            user_rhythm: User's learning rhythm data
+            
+        Returns:
+            Dict with break recommendations
+        """
+        has_trend = state.samples >= 2
+        return self._break_result(
+            state.session_seconds() / 60,
+            state.initial_focus if has_trend else None,
+            state.recent_focus if has_trend else None,
+            state.idle_seconds,
+            state.error_count,
+            user_rhythm
+        )
+    
+    def _break_result(self, session_duration: float, initial_focus, recent_focus,
+                      idle_time: float, error_count: int, user_rhythm: Dict) -> Dict[str, Any]:
+        """Fatigue score and break recommendation from session statistics (duration in minutes)"""
+        avg_attention_span = user_rhythm.get('averageAttentionSpan', 20)
+        preferred_break_interval = user_rhythm.get('preferredBreakInterval', 25)
         
         # Calculate fatigue score
         fatigue_score = 0.0
@@ -205,19 +297,15 @@ class PerformancePredictor:
             fatigue_score += min(0.4, (session_duration - avg_attention_span) / avg_attention_span)
         
         # Factor 2: Focus level decline
-        if len(focus_timeline) >= 2:
-            recent_focus = np.mean([f['level'] for f in focus_timeline[-3:]])
-            initial_focus = np.mean([f['level'] for f in focus_timeline[:3]])
+        if initial_focus is not None and recent_focus is not None:
             focus_decline = (initial_focus - recent_focus) / 10
             fatigue_score += max(0, focus_decline * 0.3)
         
         # Factor 3: Idle time
-        idle_time = session_data.get('behaviorMetrics', {}).get('idleTime', 0)
         if idle_time > 60:  # More than 1 min idle
             fatigue_score += 0.2
         
         # Factor 4: Error rate increase
-        error_count = session_data.get('sessionMetrics', {}).get('errorCount', 0)
         if error_count > 2:
             fatigue_score += 0.15
         
@@ -246,17 +334,44 @@ class PerformancePredictor:
             'currentSessionDuration': int(session_duration)
         }
     
-    def detect_neurodiversity_patterns(self, interaction_history: List[Dict]) -> Dict[str, Any]:
+    @staticmethod
+    def fatigue_scores(session_duration, focus_decline, idle_time, error_count,
+                       attention_span=20) -> np.ndarray:
+        """
+        The _break_result fatigue score for many sessions at once
+        
+        Args:
+            session_duration: Session lengths in minutes
+            focus_decline: initial_focus - recent_focus (0 where unknown)
+            idle_time: Idle seconds
+            error_count: Errors this session
+            attention_span: averageAttentionSpan in minutes
+        
+        Returns:
+            Fatigue scores (0-1); a break is due at fatigue_threshold and above
+        """
+        session_duration = np.asarray(session_duration, dtype=float)
+        overtime = (session_duration - attention_span) / attention_span
+        fatigue_score = np.where(session_duration > attention_span, np.minimum(0.4, overtime), 0.0)
+        fatigue_score += np.maximum(0, np.asarray(focus_decline) / 10 * 0.3)
+        fatigue_score += np.where(np.asarray(idle_time) > 60, 0.2, 0.0)
+        fatigue_score += np.where(np.asarray(error_count) > 2, 0.15, 0.0)
+        return np.minimum(1.0, fatigue_score)
+    
+    @timed_stage('inference')
+    def detect_neurodiversity_patterns(self, interaction_history: Union[InteractionBatch, List[Dict]]) -> Dict[str, Any]:
         """
         Detect neurodiversity patterns from behavior (Feature #7)
         
         Args:
-            interaction_history: User's interaction history
+            interaction_history: User's interaction history (list or InteractionBatch)
             
         Returns:
             Dict with detected patterns and confidence scores
         """
-        if len(interaction_history) < 5:
+        batch = InteractionBatch.coerce(interaction_history)
+        n = len(batch)
+        if n < 5:
             return {
                 'detectedPatterns': [],
                 'confidence': 0.0,
@@ -266,9 +381,9 @@ class PerformancePredictor:
         patterns = {}
         
         # ADHD Pattern Detection
-        avg_tab_switches = np.mean([i.get('behaviorMetrics', {}).get('tabSwitches', 0) for i in interaction_history])
-        avg_focus = np.mean([i.get('focusLevel', 5) for i in interaction_history])
-        avg_completion = np.mean([i.get('completionRate', 0) for i in interaction_history])
+        avg_tab_switches = np.mean(batch.tab_switches)
+        avg_focus = np.mean(batch.focus_level)
+        avg_completion = np.mean(batch.completion_rate)
         
         adhd_score = 0.0
         if avg_tab_switches > 3:
@@ -278,17 +393,15 @@ class PerformancePredictor:
         if avg_completion < 60:
             adhd_score += 0.2
         
-        short_attention_sessions = sum(1 for i in interaction_history 
-                                      if i.get('attentionMetrics', {}).get('attentionSpan', 20) < 15)
-        if short_attention_sessions / len(interaction_history) > 0.6:
+        short_attention_sessions = np.count_nonzero(batch.attention_span < 15)
+        if short_attention_sessions / n > 0.6:
             adhd_score += 0.2
         
         patterns['adhd'] = min(1.0, adhd_score)
         
         # Dyslexia Pattern Detection
-        avg_rewinds = np.mean([i.get('mediaMetrics', {}).get('rewindCount', 0) for i in interaction_history])
-        avg_playback_speed = np.mean([i.get('mediaMetrics', {}).get('averagePlaybackSpeed', 1.0) 
-                                     for i in interaction_history])
+        avg_rewinds = np.mean(batch.rewinds)
+        avg_playback_speed = np.mean(batch.playback_speed)
         
         dyslexia_score = 0.0
         if avg_rewinds > 4:
@@ -297,22 +410,20 @@ class PerformancePredictor:
             dyslexia_score += 0.3
         
         # Check for text content struggle
-        text_struggles = sum(1 for i in interaction_history 
-                           if 'text' in str(i.get('contentType', '')) 
-                           and i.get('completionRate', 0) < 50)
-        if len(interaction_history) > 0 and text_struggles / len(interaction_history) > 0.5:
+        text_struggles = np.count_nonzero(batch.is_text & (batch.completion_rate < 50))
+        if text_struggles / n > 0.5:
             dyslexia_score += 0.4
         
         patterns['dyslexia'] = min(1.0, dyslexia_score)
         
         # Autism Pattern Detection
-        avg_routine_adherence = np.std([i.get('timestamp', datetime.now()).hour for i in interaction_history])
-        repetition_count = sum(1 for i in interaction_history if i.get('features', {}).get('revisitCount', 0) > 2)
+        avg_routine_adherence = np.std(batch.hours)
+        repetition_count = np.count_nonzero(batch.revisit_count > 2)
         
         autism_score = 0.0
         if avg_routine_adherence < 2:  # Very consistent timing
             autism_score += 0.3
-        if repetition_count / len(interaction_history) > 0.4:
+        if repetition_count / n > 0.4:
             autism_score += 0.3
         
         patterns['autism'] = min(1.0, autism_score)
@@ -328,10 +439,242 @@ class PerformancePredictor:
             'detectedPatterns': detected,
             'patternScores': {k: round(v, 2) for k, v in patterns.items()},
             'confidence': round(overall_confidence, 2),
-            'needsMoreData': len(interaction_history) < 10,
+            'needsMoreData': n < 10,
             'adaptiveRecommendations': recommendations
         }
     
+    @timed_stage('inference')
+    def predict_performance_batch(self, histories: Union[InteractionBatch, List[List[Dict]]]) -> List[Dict[str, Any]]:
+        """
+        Predict next performance score for many users at once
+
+        Same rules as predict_performance, but the weighted averages,
+        variances and trend checks run as grouped NumPy reductions over
+        the whole batch instead of one pass per user.
+
+        Args:
+            histories: One interaction history per user, or an InteractionBatch
+                built with InteractionBatch.from_histories
+
+        Returns:
+            List of prediction dicts in the same order as histories
+        """
+        batch = _as_user_batch(histories)
+        n_users = batch.n_users
+        if n_users == 0:
+            return []
+        
+        lengths, owner, position = batch.lengths, batch.owner, batch.position
+        scores = batch.score
+        group_sum = batch.group_sum
+        
+        overall_avg = batch.group_mean(scores)
+        avg_focus = batch.group_mean(batch.focus_level)
+        avg_completion = batch.group_mean(batch.completion_rate)
+        
+        # Trend direction from each user's fitted score line; rate from last-3 mean vs overall mean
+        trajectories = trend_batch(scores, lengths)
+        recent_mask = position >= lengths[owner] - 3
+        recent_avg = group_sum(scores * recent_mask) / np.maximum(np.minimum(lengths, 3), 1)
+        has_trend = lengths >= 3
+        positive_avg = overall_avg > 0
+        improvement_rate = np.where(
+            has_trend & positive_avg,
+            (recent_avg - overall_avg) / np.where(positive_avg, overall_avg, 1) * 100,
+            0.0
+        )
+        
+        # Weighted average with exp(linspace(-1, 0, n)) weights per user
+        weights = np.exp(-1.0 + position / np.maximum(lengths - 1, 1)[owner])
+        weighted_scores = group_sum(weights * scores) / np.maximum(group_sum(weights), 1e-12)
+        
+        predicted = np.clip(
+            weighted_scores + (avg_focus - 5) * 2 + (avg_completion - 50) / 5, 0, 100
+        )
+        
+        confidence = np.minimum(0.95, (lengths / 20) * 0.5 + 0.3)
+        variance = batch.group_mean((scores - overall_avg[owner]) ** 2)
+        confidence = np.where(
+            lengths > 1, confidence * (1 - np.minimum(variance / 1000, 0.5)), confidence
+        )
+        
+        results = []
+        for u in range(n_users):
+            if lengths[u] == 0:
+                results.append(self.predict_performance([]))
+                continue
+            
+            trend_direction = trajectories[u]['direction'] if has_trend[u] else 'stable'
+            
+            results.append({
+                'predictedScore': round(float(predicted[u]), 1),
+                'confidence': round(float(confidence[u]), 2),
+                'trend': trend_direction,
+                'improvementRate': round(float(improvement_rate[u]), 1),
+                'currentAverage': round(float(overall_avg[u]), 1),
+                'recommendations': self._generate_recommendations(
+                    predicted[u], trend_direction, avg_focus[u], avg_completion[u], improvement_rate[u]
+                ),
+                'dataPoints': int(lengths[u]),
+                'trajectory': trajectories[u]
+            })
+        
+        return results
+    
+    @timed_stage('inference')
+    def detect_struggle_batch(self, sessions: List[Dict],
+                              histories: Union[InteractionBatch, List[List[Dict]]]) -> List[Dict[str, Any]]:
+        """
+        Detect struggle for many live sessions at once
+
+        Args:
+            sessions: Current session metrics, one per user
+            histories: Past interaction data, one list per user (or an InteractionBatch)
+
+        Returns:
+            List of struggle dicts in the same order as sessions
+        """
+        n_users = len(sessions)
+        if n_users == 0:
+            return []
+        
+        def column(getter, default):
+            return np.array([getter(s) if s else default for s in sessions], dtype=float)
+        
+        pause_frequency = column(lambda s: s.get('behaviorMetrics', {}).get('pauseFrequency', 0), 0)
+        rewind_count = column(lambda s: s.get('mediaMetrics', {}).get('rewindCount', 0), 0)
+        help_requests = column(lambda s: s.get('sessionMetrics', {}).get('helpRequestCount', 0), 0)
+        error_count = column(lambda s: s.get('sessionMetrics', {}).get('errorCount', 0), 0)
+        focus_level = column(lambda s: s.get('focusLevel', 5), 5)
+        time_spent = column(lambda s: s.get('duration', 0), 0)
+        expected_time = column(lambda s: s.get('expectedDuration', 600), 600)
+        current_score = column(lambda s: s.get('performance', {}).get('score', 0), 0)
+        
+        history = _as_user_batch(histories)
+        lengths = history.lengths
+        avg_past_score = history.group_mean(history.score)
+        
+        # Rules in the same order (and summation order) as detect_struggle
+        rules = [
+            ('high_pause_frequency', pause_frequency > 5, 0.2),
+            ('multiple_rewinds', rewind_count > 3, 0.2),
+            ('frequent_help_requests', help_requests > 2, 0.25),
+            ('high_error_rate', error_count > 3, 0.25),
+            ('low_focus', focus_level < 4, 0.15),
+            ('excessive_time', time_spent > expected_time * 1.5, 0.15),
+            ('below_average_performance', (lengths > 0) & (current_score < avg_past_score * 0.7), 0.2)
+        ]
+        
+        struggle_score = np.zeros(n_users)
+        for _, fired, weight in rules:
+            struggle_score += np.where(fired, weight, 0.0)
+        struggle_score = np.minimum(1.0, struggle_score)
+        
+        fired_matrix = np.column_stack([fired for _, fired, _ in rules])
+        indicator_counts = fired_matrix.sum(axis=1)
+        levels = np.select([struggle_score >= 0.7, struggle_score >= 0.4], ['high', 'moderate'], 'low')
+        
+        results = []
+        for u in range(n_users):
+            level = str(levels[u])
+            results.append({
+                'isStruggling': bool(struggle_score[u] >= self.struggle_threshold),
+                'struggleLevel': level,
+                'struggleScore': round(float(struggle_score[u]), 2),
+                'indicators': [rules[r][0] for r in np.flatnonzero(fired_matrix[u])],
+                'suggestedInterventions': list(STRUGGLE_INTERVENTIONS[level]),
+                'confidence': 0.8 if indicator_counts[u] > 2 else 0.5
+            })
+        
+        return results
+    
+    @timed_stage('inference')
+    def detect_neurodiversity_patterns_batch(self, histories: Union[InteractionBatch, List[List[Dict]]]) -> List[Dict[str, Any]]:
+        """
+        Detect neurodiversity patterns for many users at once
+
+        Args:
+            histories: One interaction history per user, or an InteractionBatch
+
+        Returns:
+            List of pattern dicts in the same order as histories
+        """
+        batch = _as_user_batch(histories)
+        n_users = batch.n_users
+        if n_users == 0:
+            return []
+        
+        lengths = batch.lengths
+        scores = self.neurodiversity_scores(batch)
+        adhd, dyslexia, autism = scores['adhd'], scores['dyslexia'], scores['autism']
+        
+        overall_confidence = (adhd + dyslexia + autism) / 3
+        
+        results = []
+        for u in range(n_users):
+            if lengths[u] < 5:
+                results.append({
+                    'detectedPatterns': [],
+                    'confidence': 0.0,
+                    'needsMoreData': True
+                })
+                continue
+            
+            patterns = {
+                'adhd': float(adhd[u]),
+                'dyslexia': float(dyslexia[u]),
+                'autism': float(autism[u])
+            }
+            results.append({
+                'detectedPatterns': [p for p, score in patterns.items() if score >= 0.5],
+                'patternScores': {k: round(v, 2) for k, v in patterns.items()},
+                'confidence': round(float(overall_confidence[u]), 2),
+                'needsMoreData': bool(lengths[u] < 10),
+                'adaptiveRecommendations': self._generate_neurodiversity_adaptations(patterns)
+            })
+        
+        return results
+    
+    def neurodiversity_scores(self, batch: InteractionBatch) -> Dict[str, np.ndarray]:
+        """
+        ADHD, dyslexia and autism pattern scores for every user in a batch
+        
+        Grouped reductions (per-user means, stds and threshold fractions)
+        with the same rules as detect_neurodiversity_patterns.
+        
+        Args:
+            batch: Multi-user InteractionBatch
+            
+        Returns:
+            Dict of pattern name -> score array (length n_users)
+        """
+        n_users = batch.n_users
+        group_mean = batch.group_mean
+        
+        # ADHD
+        adhd = np.zeros(n_users)
+        adhd += np.where(group_mean(batch.tab_switches) > 3, 0.3, 0.0)
+        adhd += np.where(group_mean(batch.focus_level) < 5, 0.3, 0.0)
+        adhd += np.where(group_mean(batch.completion_rate) < 60, 0.2, 0.0)
+        adhd += np.where(group_mean(batch.attention_span < 15) > 0.6, 0.2, 0.0)
+        
+        # Dyslexia
+        dyslexia = np.zeros(n_users)
+        dyslexia += np.where(group_mean(batch.rewinds) > 4, 0.3, 0.0)
+        dyslexia += np.where(group_mean(batch.playback_speed) < 0.9, 0.3, 0.0)
+        dyslexia += np.where(group_mean(batch.is_text & (batch.completion_rate < 50)) > 0.5, 0.4, 0.0)
+        
+        # Autism: routine adherence is the std of session hours
+        autism = np.zeros(n_users)
+        autism += np.where(batch.group_std(batch.hours) < 2, 0.3, 0.0)
+        autism += np.where(group_mean(batch.revisit_count > 2) > 0.4, 0.3, 0.0)
+        
+        return {
+            'adhd': np.minimum(1.0, adhd),
+            'dyslexia': np.minimum(1.0, dyslexia),
+            'autism': np.minimum(1.0, autism)
+        }
+    
     def _generate_recommendations(self, predicted_score: float, trend: str, 
                                  focus: float, completion: float, improvement: float) -> List[str]:
         """Generate personalized recommendations"""
@@ -402,91 +745,70 @@ class PerformancePredictor:
         return adaptations
 
 
+# Mastery models selectable in SkillMasteryTracker.update_skill_mastery
+SKILL_MODELS = ('ema', 'bkt')
+
+
 class SkillMasteryTracker:
     """Track progressive skill mastery (Feature #11)"""
     
-    def __init__(self):
+    def __init__(self, index: SkillIndex = None, bkt_params: str = None):
+        """
+        Args:
+            index: Skill interning table for the fitted BKT parameters
+                (default: a new one); request mastery arrays get their own
+            bkt_params: Fitted BKT parameters (.npz from src.knowledge_tracing);
+                unfitted skills use the BKT defaults
+        """
         self.mastery_threshold = 0.75
+        self.alpha = 0.3  # EMA learning rate
+        self.index = index if index is not None else SkillIndex()
+        if bkt_params:
+            self.bkt = BayesianKnowledgeTracer.load(bkt_params, self.index)
+        else:
+            self.bkt = BayesianKnowledgeTracer(self.index)
     
-    def update_skill_mastery(self, current_mastery: Dict, interaction: Dict) -> Dict:
+    def to_arrays(self, mastery: Union[Dict, SkillMasteryArrays]) -> SkillMasteryArrays:
+        """Array form of a skill mastery map (passed through if already arrays)"""
+        if isinstance(mastery, SkillMasteryArrays):
+            return mastery
+        return SkillMasteryArrays.from_dict(mastery or {})
+    
+    @timed_stage('inference')
+    def update_skill_mastery(self, current_mastery: Union[Dict, SkillMasteryArrays],
+                             interaction: Union[Dict, List[Dict]],
+                             model: str = 'ema') -> Union[Dict, SkillMasteryArrays]:
         """
         Update skill mastery levels based on new interaction
         
         Args:
-            current_mastery: Current skill mastery map
-            interaction: New interaction data with skill tags
+            current_mastery: Current skill mastery map, or SkillMasteryArrays
+                (updated in place and returned)
+            interaction: New interaction data with skill tags, or a list of
+                them oldest first (applied in one vectorized pass)
+            model: 'ema' (exponential moving average of scores) or 'bkt'
+                (Bayesian Knowledge Tracing posterior)
             
         Returns:
-            Updated skill mastery map
+            Updated skill mastery map (same form as current_mastery)
         """
-        skills = interaction.get('skills', [])
-        score = interaction.get('performance', {}).get('score', 0) / 100  # Normalize to 0-1
-        
-        for skill in skills:
-            if skill not in current_mastery:
-                current_mastery[skill] = {
-                    'masteryLevel': score,
-                    'practiceCount': 1,
-                    'averageScore': score,
-                    'lastPracticed': datetime.now()
-                }
-            else:
-                # Update with exponential moving average
-                alpha = 0.3  # Learning rate
-                old_mastery = current_mastery[skill]['masteryLevel']
-                new_mastery = old_mastery * (1 - alpha) + score * alpha
-                
-                # Update metrics
-                practice_count = current_mastery[skill]['practiceCount'] + 1
-                avg_score = ((current_mastery[skill]['averageScore'] * current_mastery[skill]['practiceCount']) + score) / practice_count
-                
-                current_mastery[skill] = {
-                    'masteryLevel': min(1.0, new_mastery),
-                    'practiceCount': practice_count,
-                    'averageScore': avg_score,
-                    'lastPracticed': datetime.now()
-                }
-        
-        return current_mastery
+        if model not in SKILL_MODELS:
+            raise ValueError(f"Unknown skill model '{model}'. Available: {', '.join(SKILL_MODELS)}")
+        arrays = self.to_arrays(current_mastery)
+        interactions = interaction if isinstance(interaction, list) else [interaction]
+        if model == 'bkt':
+            self.bkt.update_many(arrays, interactions)
+        else:
+            arrays.update_many(interactions, alpha=self.alpha)
+        return arrays if arrays is current_mastery else arrays.to_dict()
     
-    def get_skill_recommendations(self, skill_mastery: Dict) -> List[Dict]:
+    @timed_stage('inference')
+    def get_skill_recommendations(self, skill_mastery: Union[Dict, SkillMasteryArrays],
+                                  top_k: int = 10) -> List[Dict]:
         """
         Recommend skills to practice based on mastery levels
         
         Returns:
             List of skill recommendations with priorities
         """
-        recommendations = []
-        
-        for skill, data in skill_mastery.items():
-            mastery = data['masteryLevel']
-            last_practiced = data.get('lastPracticed', datetime.now())
-            days_since = (datetime.now() - last_practiced).days if isinstance(last_practiced, datetime) else 0
-            
-            # Prioritize skills that need improvement
-            if mastery < 0.5:
-                priority = 'high'
-                reason = 'Low mastery - needs focused practice'
-            elif mastery < self.mastery_threshold:
-                priority = 'medium'
-                reason = 'Approaching mastery - keep practicing'
-            elif days_since > 7:
-                priority = 'medium'
-                reason = 'Needs refresher to maintain mastery'
-            else:
-                priority = 'low'
-                reason = 'Well mastered'
-            
-            recommendations.append({
-                'skill': skill,
-                'masteryLevel': round(mastery, 2),
-                'priority': priority,
-                'reason': reason,
-                'daysSincePractice': days_since
-            })
-        
-        # Sort by priority and mastery level
-        priority_order = {'high': 3, 'medium': 2, 'low': 1}
-        recommendations.sort(key=lambda x: (priority_order[x['priority']], -x['masteryLevel']), reverse=True)
-        
-        return recommendations[:10]  # Top 10 recommendations
+        return self.to_arrays(skill_mastery).recommendations(top_k, self.mastery_threshold)
@@ -7,11 +7,18 @@ Handles preprocessing of user interaction data for ML models.
 Extracts features for adaptive learning algorithms.
 """
 
-import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
-import json
+from typing import Dict, List, Any, Union
+
+try:
+    from .interaction_batch import InteractionBatch
+    from .metrics import timed_stage
+    from .timestamps import US_PER_DAY, valid
+except ImportError:  # run as a script
+    from interaction_batch import InteractionBatch
+    from metrics import timed_stage
+    from timestamps import US_PER_DAY, valid
 
 
 class DataPreprocessor:
@@ -25,42 +32,42 @@ class DataPreprocessor:
             'pause_frequency', 'revisit_rate', 'hint_usage'
         ]
     
-    def extract_features(self, interactions: List[Dict]) -> Dict[str, float]:
+    @timed_stage('features')
+    def extract_features(self, interactions: Union[InteractionBatch, List[Dict]]) -> Dict[str, float]:
         """
         Extract features from user interactions
         
         Args:
-            interactions: List of interaction dictionaries
+            interactions: List of interaction dictionaries or an InteractionBatch
             
         Returns:
             Dictionary of extracted features
         """
-        if not interactions:
+        batch = InteractionBatch.coerce(interactions)
+        if not len(batch):
             return self._get_default_features()
         
         features = {}
         
         # Time-based features
-        features['avg_duration'] = np.mean([i.get('duration', 0) for i in interactions])
-        features['session_frequency'] = self._calculate_session_frequency(interactions)
+        features['avg_duration'] = np.mean(batch.duration)
+        features['session_frequency'] = self._calculate_session_frequency(batch)
         
         # Performance features
-        features['avg_completion_rate'] = np.mean([i.get('completionRate', 0) for i in interactions])
-        features['avg_focus_level'] = np.mean([i.get('focusLevel', 5) for i in interactions])
-        
-        performance_scores = [i.get('performance', {}).get('score', 0) for i in interactions]
-        features['performance_score'] = np.mean(performance_scores)
+        features['avg_completion_rate'] = np.mean(batch.completion_rate)
+        features['avg_focus_level'] = np.mean(batch.focus_level)
+        features['performance_score'] = np.mean(batch.score)
         
         # Behavioral features
-        features['pause_frequency'] = np.mean([i.get('features', {}).get('pauseFrequency', 0) for i in interactions])
-        features['revisit_rate'] = np.mean([i.get('features', {}).get('revisitCount', 0) for i in interactions])
-        features['hint_usage'] = np.mean([i.get('performance', {}).get('hints', 0) for i in interactions])
+        features['pause_frequency'] = np.mean(batch.pause_frequency)
+        features['revisit_rate'] = np.mean(batch.revisit_count)
+        features['hint_usage'] = np.mean(batch.hints)
         
         # Engagement features
-        features['interaction_count'] = len(interactions)
-        features['content_variety'] = len(set([i.get('contentId') for i in interactions]))
-        features['emotional_stability'] = self._calculate_emotional_stability(interactions)
-        features['learning_pace'] = self._calculate_learning_pace(interactions)
+        features['interaction_count'] = len(batch)
+        features['content_variety'] = len(set(batch.content_ids))
+        features['emotional_stability'] = self._calculate_emotional_stability(batch)
+        features['learning_pace'] = self._calculate_learning_pace(batch)
         
         return features
     
@@ -89,62 +96,39 @@ class DataPreprocessor:
         
         return np.array(normalized)
     
-    def _calculate_session_frequency(self, interactions: List[Dict]) -> float:
+    def _calculate_session_frequency(self, batch: InteractionBatch) -> float:
         """Calculate sessions per week"""
-        if len(interactions) < 2:
-            return 1.0
-        
-        timestamps = [i.get('timestamp') for i in interactions if i.get('timestamp')]
-        if not timestamps:
+        if len(batch) < 2:
             return 1.0
         
-        # Convert to datetime if strings
-        dates = []
-        for ts in timestamps:
-            if isinstance(ts, str):
-                try:
-                    dates.append(datetime.fromisoformat(ts.replace('Z', '+00:00')))
-                except:
-                    continue
-            else:
-                dates.append(ts)
-        
-        if len(dates) < 2:
+        # Decoded once per batch; missing or unparseable timestamps are skipped
+        epochs = valid(batch.epoch_us)
+        if len(epochs) < 2:
             return 1.0
         
-        date_range = (max(dates) - min(dates)).days or 1
-        sessions_per_week = (len(set([d.date() for d in dates])) / date_range) * 7
+        date_range = int((epochs.max() - epochs.min()) // US_PER_DAY) or 1
+        sessions_per_week = (len(np.unique(epochs // US_PER_DAY)) / date_range) * 7
         return min(sessions_per_week, 10)
     
-    def _calculate_emotional_stability(self, interactions: List[Dict]) -> float:
+    def _calculate_emotional_stability(self, batch: InteractionBatch) -> float:
         """Calculate emotional state consistency (0-1)"""
-        emotions = [i.get('emotionalState', 'neutral') for i in interactions]
-        if not emotions:
+        if not len(batch):
             return 0.5
         
-        # Map emotions to scores
-        emotion_scores = {
-            'confident': 1.0,
-            'engaged': 0.8,
-            'neutral': 0.5,
-            'confused': 0.3,
-            'frustrated': 0.1
-        }
-        
-        scores = [emotion_scores.get(e, 0.5) for e in emotions]
-        return 1.0 - np.std(scores)  # Lower variance = more stable
+        # Emotions are mapped to scores by InteractionBatch (EMOTION_SCORES)
+        return 1.0 - np.std(batch.emotion_score)  # Lower variance = more stable
     
-    def _calculate_learning_pace(self, interactions: List[Dict]) -> float:
+    def _calculate_learning_pace(self, batch: InteractionBatch) -> float:
         """Calculate learning pace (completions per hour)"""
-        completed = [i for i in interactions if i.get('interactionType') == 'complete']
+        completed = np.count_nonzero(batch.is_complete)
         if not completed:
             return 0.0
         
-        total_time = sum([i.get('duration', 0) for i in interactions]) / 3600  # hours
+        total_time = batch.duration.sum() / 3600  # hours
         if total_time == 0:
             return 0.0
         
-        return len(completed) / total_time
+        return completed / total_time
     
     def _get_default_features(self) -> Dict[str, float]:
         """Return default features for new users"""
@@ -8,11 +8,136 @@ Implements adaptive learning difficulty adjustment.
 """
 
 import numpy as np
-from typing import List, Dict, Any
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.neighbors import NearestNeighbors
-import joblib
-import os
+from typing import List, Dict, Any, Optional, Union
+
+DIFFICULTY_LEVELS = ('beginner', 'intermediate', 'advanced')
+
+# Content model vocabularies (backend/models/Content.js)
+CONTENT_SUBJECTS = ('math', 'science', 'english', 'history', 'geography', 'programming', 'art', 'music', 'other')
+CONTENT_TYPES = ('lesson', 'quiz', 'video', 'interactive', 'reading', 'practice')
+CONTENT_FORMATS = ('text', 'video', 'audio', 'interactive', 'visual', 'game')
+
+# Users scored together in adaptive_content_selection_batch, bounded by scored cells
+SELECTION_CELLS = 1 << 22
+
+# /api/ml/adaptive-difficulty thresholds on recent average score and completion rate
+ADAPTIVE_DIFFICULTY_THRESHOLDS = {
+    'advanced_score': 85,
+    'advanced_completion': 0.8,
+    'intermediate_score': 70,
+    'intermediate_completion': 0.6
+}
+
+
+def difficulty_levels(performance_score, focus_level, advanced: float = 75,
+                      intermediate: float = 50) -> np.ndarray:
+    """
+    Vectorized ContentRecommender.recommend_difficulty
+    
+    Args:
+        performance_score: Average performance (0-100), scalar or array
+        focus_level: Average focus level (1-10), scalar or array
+        advanced: Focus-adjusted score needed for 'advanced'
+        intermediate: Focus-adjusted score needed for 'intermediate'
+        
+    Returns:
+        Indices into DIFFICULTY_LEVELS
+    """
+    adjusted_score = np.asarray(performance_score) * (np.asarray(focus_level) / 10)
+    return (adjusted_score >= intermediate).astype(np.int8) + (adjusted_score >= advanced)
+
+
+def adaptive_difficulty_levels(avg_score, completion_rate, advanced_score: float = 85,
+                               advanced_completion: float = 0.8, intermediate_score: float = 70,
+                               intermediate_completion: float = 0.6) -> np.ndarray:
+    """
+    Next difficulty from recent performance, as /api/ml/adaptive-difficulty
+    
+    The endpoint additionally never drops an 'advanced' learner to 'beginner'.
+    
+    Args:
+        avg_score: Recent average score (0-100), scalar or array
+        completion_rate: Recent completion rate (0-1), scalar or array
+        
+    Returns:
+        Indices into DIFFICULTY_LEVELS
+    """
+    avg_score = np.asarray(avg_score)
+    completion_rate = np.asarray(completion_rate)
+    advanced = (avg_score >= advanced_score) & (completion_rate >= advanced_completion)
+    intermediate = (avg_score >= intermediate_score) & (completion_rate >= intermediate_completion)
+    return np.where(advanced, 2, intermediate.astype(np.int8)).astype(np.int8)
+
+
+def _codes(values: List[Any], vocabulary: tuple) -> np.ndarray:
+    """int8 index of each value in the vocabulary (-1 if missing or unknown)"""
+    lookup = {name: code for code, name in enumerate(vocabulary)}
+    return np.array([lookup.get(value, -1) for value in values], dtype=np.int8)
+
+
+class ContentCatalog:
+    """
+    Content items pre-encoded for vectorized scoring
+    
+    Difficulty, content type and subject are int8 codes (indices into
+    DIFFICULTY_LEVELS, CONTENT_TYPES and CONTENT_SUBJECTS, -1 if missing or
+    unknown) and formats a bitmask over CONTENT_FORMATS. Build it once per
+    catalog change; the items are kept to be returned by the selection.
+    """
+    
+    def __init__(self, items: List[Dict]):
+        self.items = list(items)
+        self.difficulty = _codes([item.get('difficulty') for item in self.items], DIFFICULTY_LEVELS)
+        self.content_type = _codes([item.get('contentType') for item in self.items], CONTENT_TYPES)
+        self.subject = _codes([item.get('subject') for item in self.items], CONTENT_SUBJECTS)
+        bits = {name: 1 << k for k, name in enumerate(CONTENT_FORMATS)}
+        formats = [item.get('format') or () for item in self.items]
+        self.formats = np.array([bits.get(f, 0) if isinstance(f, str) else sum(bits.get(name, 0) for name in set(f))
+                                 for f in formats], dtype=np.uint8)
+    
+    def __len__(self) -> int:
+        return len(self.items)
+    
+    def subset(self, rows: np.ndarray) -> 'ContentCatalog':
+        """Catalog of the given rows, in that order, without re-encoding"""
+        part = ContentCatalog.__new__(ContentCatalog)
+        part.items = [self.items[k] for k in rows.tolist()]
+        part.difficulty = self.difficulty[rows]
+        part.content_type = self.content_type[rows]
+        part.subject = self.subject[rows]
+        part.formats = self.formats[rows]
+        return part
+    
+    def mask(self, formats: Optional[List[str]] = None,
+             subjects: Optional[List[str]] = None) -> Optional[np.ndarray]:
+        """Items offered in any of the formats and in one of the subjects (None: no filter)"""
+        if not formats and not subjects:
+            return None
+        keep = np.ones(len(self.items), dtype=bool)
+        if formats:
+            wanted = sum(1 << CONTENT_FORMATS.index(f) for f in set(formats) if f in CONTENT_FORMATS)
+            keep &= (self.formats & wanted) != 0
+        if subjects:
+            keep &= np.isin(self.subject, [CONTENT_SUBJECTS.index(s) for s in subjects if s in CONTENT_SUBJECTS])
+        return keep
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Column indices of the k highest scores in each row, best first
+    
+    Ties keep column order, as a stable descending sort would. Scores
+    must be non-negative integers.
+    """
+    n = scores.shape[1]
+    # Unique keys: score, then earlier columns first (int32 when it fits, for speed)
+    dtype = np.int32 if (int(scores.max(initial=0)) + 1) * n < 2 ** 31 else np.int64
+    key = scores.astype(dtype) * dtype(n) + np.arange(n - 1, -1, -1, dtype=dtype)
+    if k >= n:
+        return np.argsort(-key, axis=1)
+    candidates = np.argpartition(key, n - k, axis=1)[:, n - k:]
+    order = np.argsort(-np.take_along_axis(key, candidates, axis=1), axis=1)
+    return np.take_along_axis(candidates, order, axis=1)
 
 
 class ContentRecommender:
@@ -20,7 +145,6 @@ class ContentRecommender:
     
     def __init__(self):
         self.model = None
-        self.content_embeddings = {}
         self.difficulty_thresholds = {
             'beginner': (0, 50),
             'intermediate': (50, 75),
@@ -40,14 +164,7 @@ class ContentRecommender:
             Recommended difficulty level
         """
         # Adjust score based on focus
-        adjusted_score = performance_score * (focus_level / 10)
-        
-        if adjusted_score >= 75:
-            return 'advanced'
-        elif adjusted_score >= 50:
-            return 'intermediate'
-        else:
-            return 'beginner'
+        return DIFFICULTY_LEVELS[int(difficulty_levels(performance_score, focus_level))]
     
     def recommend_content_format(self, neurodiversity_type: List[str],
                                 learning_style: str) -> List[str]:
@@ -144,60 +261,88 @@ class ContentRecommender:
         return base_interval
     
     def adaptive_content_selection(self, user_features: Dict[str, float],
-                                   available_content: List[Dict],
+                                   available_content: Union[List[Dict], ContentCatalog],
                                    limit: int = 5) -> List[Dict]:
         """
         Select content adaptively based on user features
         
         Args:
             user_features: Extracted user features
-            available_content: List of available content items
+            available_content: List of available content items, or a
+                ContentCatalog of them (encoded once, reusable across calls)
             limit: Number of recommendations to return
             
         Returns:
             List of recommended content items
         """
-        if not available_content:
-            return []
+        return self.adaptive_content_selection_batch([user_features], available_content, limit)[0]
+    
+    def selection_scores(self, users_features: List[Dict[str, float]]) -> np.ndarray:
+        """
+        Content score per user and item difficulty
         
-        # Score each content item
-        scored_content = []
-        recommended_difficulty = self.recommend_difficulty(
-            user_features.get('performance_score', 50),
-            user_features.get('avg_focus_level', 5)
-        )
+        Every scoring rule depends on the item only through its difficulty,
+        so a user's scores for the whole catalog are a lookup into one row.
         
-        for content in available_content:
-            score = 0
-            
-            # Match difficulty (+40 points)
-            if content.get('difficulty') == recommended_difficulty:
-                score += 40
-            
-            # Completion rate bonus (+30 points)
-            completion_rate = user_features.get('avg_completion_rate', 0)
-            if completion_rate > 80 and content.get('difficulty') != 'beginner':
-                score += 30
-            elif completion_rate < 50 and content.get('difficulty') == 'beginner':
-                score += 30
-            
-            # Variety bonus (+20 points)
-            if user_features.get('content_variety', 0) < 5:
-                score += 20
-            
-            # Engagement score influence (+10 points)
-            engagement = self.calculate_engagement_score(user_features)
-            if engagement > 70:
-                score += 10
+        Returns:
+            (users, 4) int array; columns follow DIFFICULTY_LEVELS and the
+            last is for items with a missing or unknown difficulty
+        """
+        performance = np.array([f.get('performance_score', 50) for f in users_features], dtype=float)
+        focus = np.array([f.get('avg_focus_level', 5) for f in users_features], dtype=float)
+        completion_rate = np.array([f.get('avg_completion_rate', 0) for f in users_features], dtype=float)
+        
+        table = np.zeros((len(users_features), 4), dtype=np.int32)
+        
+        # Match difficulty (+40 points)
+        table[np.arange(len(users_features)), difficulty_levels(performance, focus)] += 40
+        
+        # Completion rate bonus (+30 points)
+        table[:, 1:] += 30 * (completion_rate > 80)[:, None]
+        table[:, 0] += 30 * (completion_rate < 50)
+        
+        # Variety bonus (+20 points) and engagement score influence (+10 points)
+        table += np.array([20 * (f.get('content_variety', 0) < 5) + 10 * (self.calculate_engagement_score(f) > 70)
+                           for f in users_features], dtype=np.int32)[:, None]
+        return table
+    
+    def adaptive_content_selection_batch(self, users_features: List[Dict[str, float]],
+                                         available_content: Union[List[Dict], ContentCatalog],
+                                         limit: int = 5, formats: Optional[List[str]] = None,
+                                         subjects: Optional[List[str]] = None) -> List[List[Dict]]:
+        """
+        adaptive_content_selection for many users over one catalog
+        
+        Each user's catalog scores are computed in one vectorized pass and
+        the best `limit` items found with argpartition rather than a full
+        sort; ties keep catalog order.
+        
+        Args:
+            users_features: Extracted features of each user
+            available_content: List of available content items or a ContentCatalog
+            limit: Recommendations per user
+            formats: Only items offered in one of these formats
+            subjects: Only items in one of these subjects
             
-            scored_content.append({
-                'content': content,
-                'score': score
-            })
+        Returns:
+            Recommended content items for each user
+        """
+        catalog = available_content if isinstance(available_content, ContentCatalog) else ContentCatalog(available_content)
+        if not len(catalog) or limit <= 0:
+            return [[] for _ in users_features]
         
-        # Sort by score and return top items
-        scored_content.sort(key=lambda x: x['score'], reverse=True)
-        return [item['content'] for item in scored_content[:limit]]
+        table = self.selection_scores(users_features)
+        keep = catalog.mask(formats, subjects)
+        chunk = max(1, SELECTION_CELLS // len(catalog))
+        selections = []
+        for start in range(0, len(users_features), chunk):
+            # An unknown difficulty (-1) picks the last column
+            scores = table[start:start + chunk][:, catalog.difficulty]
+            if keep is not None:
+                scores = np.where(keep, scores + 1, 0)  # filtered-out items rank last and are dropped
+            for row in top_k(scores, limit).tolist():
+                selections.append([catalog.items[k] for k in row if keep is None or keep[k]])
+        return selections
     
     def generate_learning_path(self, user_features: Dict[str, float],
                               user_profile: Dict[str, Any]) -> Dict[str, Any]:
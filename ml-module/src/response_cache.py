@@ -0,0 +1,136 @@
+"""
+NeuroLearn Response Cache
+Content-addressed cache for pure ML endpoints
+
+Responses are keyed on a SHA-256 of the endpoint name plus a canonical
+JSON encoding of the request payload, so identical inputs map to the same
+entry regardless of key order. Entries live in an in-process LRU with a
+TTL, and optionally in a shared on-disk tier so several worker processes
+can reuse each other's results.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+try:
+    from .wire_format import json_dumps
+except ImportError:  # run as a script
+    from wire_format import json_dumps
+
+
+class ResponseCache:
+    """LRU + TTL cache with an optional on-disk second tier"""
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 300,
+                 disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def key(namespace: str, payload: Any) -> str:
+        """Canonical content hash of a payload for one endpoint"""
+        canonical = json_dumps(payload, sort_keys=True)
+        digest = hashlib.sha256(canonical).hexdigest()
+        return f"{namespace}-{digest}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached value, or None on a miss or expired entry"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        value = self._disk_get(key, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, value, now)
+        return value
+
+    def put(self, key: str, value: Any):
+        """Cache a JSON-serializable value in memory (and on disk if enabled)"""
+        with self._lock:
+            self._store(key, value, time.time())
+        self._disk_put(key, value)
+
+    def _store(self, key: str, value: Any, now: float):
+        """Insert into the memory tier (lock held)"""
+        self._entries[key] = (now + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        namespace, _, digest = key.rpartition('-')
+        return os.path.join(self.disk_dir, namespace, digest[:2], f"{digest}.json")
+
+    def _disk_get(self, key: str, now: float) -> Optional[Any]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl <= now:
+                os.remove(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _disk_put(self, key: str, value: Any):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f, separators=(',', ':'))
+            os.replace(tmp_path, path)  # atomic, safe across workers
+        except OSError:
+            pass
+
+    def clear(self):
+        """Drop the memory tier (the disk tier expires on its own)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'maxEntries': self.max_entries,
+                'ttlSeconds': self.ttl,
+                'diskTier': bool(self.disk_dir),
+                'hits': self.hits,
+                'diskHits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hitRate': round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0
+            }
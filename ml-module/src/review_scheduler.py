@@ -0,0 +1,368 @@
+"""
+NeuroLearn Review Scheduler
+SM-2 spaced-repetition scheduling with per-student due-time heaps
+
+Every practiced skill carries SM-2 state (easiness factor, interval in
+days, successful repetitions in a row) and the epoch second it is next
+due. Each review updates that state from the score (0-1 -> quality 0-5):
+
+- quality < 3: the streak resets and the skill is due again in a day
+- otherwise the interval grows 1 -> 6 -> interval * easiness days
+- easiness moves by 0.1 - (5 - q) * (0.08 + (5 - q) * 0.02), floor 1.3
+
+Reviews happen at their interactions' timestamps. Practice of a skill
+before its current due time is not a review: three attempts in one
+session count once, instead of stacking the interval 1 -> 6 -> 15 days.
+
+Each student's skills sit in a heap keyed by due time, so the next skill
+to review is found in O(log n) instead of scanning every skill. Reviews
+push a new entry and leave the old one behind; stale entries are
+dropped when they reach the top, and the heap is rebuilt once they
+outnumber the live ones.
+
+A ReviewScheduler holds the queues of many students. Each queue interns
+skill names in its own SkillIndex, so its arrays are sized to the skills
+that student has practiced. The scheduler computes whole classes' due
+lists in one vectorized pass and persists everything as one compressed
+.npz of flat typed columns (22 bytes per card before compression).
+"""
+
+import heapq
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .skill_mastery import SkillIndex, skill_scores
+from .timestamps import MISSING, US_PER_SECOND, decode_timestamps
+
+SECONDS_PER_DAY = 86400
+INITIAL_EASINESS = 2.5
+MIN_EASINESS = 1.3
+PASSING_QUALITY = 3
+
+
+def quality_from_score(score: float) -> int:
+    """SM-2 response quality (0-5) from a 0-1 score"""
+    return min(5, max(0, int(score * 5 + 0.5)))  # halves round up
+
+
+def sm2_step(easiness: float, interval: float, repetitions: int,
+             quality: int) -> Tuple[float, float, int]:
+    """
+    One SM-2 review
+
+    Returns:
+        (easiness, interval_days, repetitions) after the review
+    """
+    if quality < PASSING_QUALITY:
+        repetitions, interval = 0, 1.0
+    else:
+        repetitions += 1
+        if repetitions == 1:
+            interval = 1.0
+        elif repetitions == 2:
+            interval = 6.0
+        else:
+            interval = interval * easiness
+    lapse = 5 - quality
+    easiness = max(MIN_EASINESS, easiness + 0.1 - lapse * (0.08 + lapse * 0.02))
+    return easiness, interval, repetitions
+
+
+class ReviewQueue:
+    """One student's SM-2 state (arrays indexed by skill id) and due-time heap"""
+
+    def __init__(self, index: Optional[SkillIndex] = None, capacity: int = 0):
+        """
+        Args:
+            index: Skill interning table (default: a new one for this student)
+            capacity: Skills to allocate for up front
+        """
+        self.index = index if index is not None else SkillIndex()
+        self.easiness = np.full(capacity, INITIAL_EASINESS, dtype=np.float32)
+        self.interval = np.zeros(capacity, dtype=np.float32)
+        self.repetitions = np.zeros(capacity, dtype=np.int16)
+        self.due = np.zeros(capacity, dtype=np.int64)  # epoch seconds; 0 = never reviewed
+        self._heap: List[Tuple[int, int]] = []  # (due, skill_id), possibly stale
+        self._live = 0  # skills with a review scheduled
+
+    def _ensure_capacity(self, size: int):
+        if size <= len(self.due):
+            return
+        capacity = max(size, 2 * len(self.due), 16)
+        for name, fill in (('easiness', INITIAL_EASINESS), ('interval', 0),
+                           ('repetitions', 0), ('due', 0)):
+            old = getattr(self, name)
+            grown = np.full(capacity, fill, dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, name, grown)
+
+    @property
+    def scheduled(self) -> np.ndarray:
+        """Ids of skills with a review scheduled"""
+        return np.flatnonzero(self.due[:len(self.index)] > 0)
+
+    def _rebuild_heap(self):
+        ids = self.scheduled
+        self._heap = list(zip(self.due[ids].tolist(), ids.tolist()))
+        heapq.heapify(self._heap)
+        self._live = len(ids)
+
+    # Reviews
+
+    def review(self, skill_id: int, quality: int, now: Optional[float] = None) -> int:
+        """Apply one review and reschedule the skill; returns its new due time"""
+        self._ensure_capacity(skill_id + 1)
+        now = int(time.time() if now is None else now)
+        easiness, interval, repetitions = sm2_step(
+            float(self.easiness[skill_id]), float(self.interval[skill_id]),
+            int(self.repetitions[skill_id]), quality)
+        self.easiness[skill_id] = easiness
+        self.interval[skill_id] = interval
+        self.repetitions[skill_id] = min(repetitions, np.iinfo(np.int16).max)
+        due = now + max(1, int(round(interval * SECONDS_PER_DAY)))
+        if not self.due[skill_id]:
+            self._live += 1
+        self.due[skill_id] = due
+
+        heapq.heappush(self._heap, (due, skill_id))
+        if len(self._heap) > 2 * self._live + 64:
+            self._rebuild_heap()
+        return due
+
+    def review_many(self, interactions: List[Dict], now: Optional[float] = None):
+        """
+        Apply the skill reviews in some interactions (oldest first)
+
+        Each review happens at its interaction's timestamp. Practice that
+        falls before the skill's current due time is skipped, so repeats
+        within one interval collapse into the review that scheduled it.
+
+        Args:
+            interactions: Dicts with 'skills' (list of names), 'performance.score'
+                (0-100) and 'timestamp'
+            now: Epoch seconds of reviews without a timestamp (default: current time)
+        """
+        tagged = [interaction for interaction in interactions if interaction.get('skills')]
+        skills, scores = skill_scores(tagged)
+        if not skills:
+            return
+        ids = self.index.intern_many(skills)
+        self._ensure_capacity(len(self.index))
+        now = int(time.time() if now is None else now)
+        epochs = decode_timestamps([interaction.get('timestamp') for interaction in tagged])
+        seconds = np.where(epochs != MISSING, epochs // US_PER_SECOND, now)
+        times = np.repeat(seconds, [len(interaction['skills']) for interaction in tagged])
+        for skill_id, score, at in zip(ids.tolist(), scores, times.tolist()):
+            if at < self.due[skill_id]:
+                continue  # not due yet: SM-2 counts one review per interval
+            self.review(skill_id, quality_from_score(score), at)
+
+    # Queries
+
+    def peek(self) -> Optional[Tuple[int, int]]:
+        """(due, skill_id) of the next skill to review, or None"""
+        heap, due = self._heap, self.due
+        while heap and due[heap[0][1]] != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def next_reviews(self, limit: int = 5) -> List[Tuple[int, int]]:
+        """
+        The `limit` skills due soonest, as (due, skill_id) pairs
+
+        Pops them from the heap (dropping stale and duplicate entries on
+        the way) and pushes them back: O(limit log n).
+        """
+        heap, due = self._heap, self.due
+        taken, seen = [], set()
+        while heap and len(taken) < limit:
+            entry = heapq.heappop(heap)
+            if due[entry[1]] == entry[0] and entry[1] not in seen:
+                taken.append(entry)
+                seen.add(entry[1])
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return taken
+
+
+class ReviewScheduler:
+    """Review queues for many students, with class-wide queries and persistence"""
+
+    def __init__(self):
+        self._queues: Dict[str, ReviewQueue] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._queues)
+
+    def queue(self, user_id: str) -> ReviewQueue:
+        """The student's queue (created empty if new)"""
+        queue = self._queues.get(user_id)
+        if queue is None:
+            with self._lock:
+                queue = self._queues.setdefault(user_id, ReviewQueue())
+        return queue
+
+    def review(self, user_id: str, interactions: List[Dict], now: Optional[float] = None):
+        queue = self.queue(user_id)
+        with self._lock:
+            queue.review_many(interactions, now)
+
+    @staticmethod
+    def _describe(names: List[str], dues: np.ndarray, intervals: np.ndarray,
+                  easiness: np.ndarray, now: float) -> List[Dict[str, Any]]:
+        """Response entries for parallel lists of scheduled cards"""
+        overdue = np.round(np.maximum(0.0, now - dues) / SECONDS_PER_DAY, 1).tolist()
+        intervals = np.round(intervals.astype(np.float64), 1).tolist()
+        easiness = np.round(easiness.astype(np.float64), 2).tolist()
+        return [
+            {
+                'skill': name,
+                'dueAt': datetime.fromtimestamp(due).isoformat(),
+                'isDue': due <= now,
+                'overdueDays': overdue[k],
+                'intervalDays': intervals[k],
+                'easiness': easiness[k]
+            }
+            for k, (name, due) in enumerate(zip(names, dues.tolist()))
+        ]
+
+    def next_reviews(self, user_id: str, limit: int = 5, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        A student's next reviews, soonest first
+
+        Returns:
+            Up to `limit` entries (due or not) with skill, dueAt, isDue,
+            overdueDays, intervalDays and easiness
+        """
+        queue = self._queues.get(user_id)
+        if queue is None:
+            return []
+        now = time.time() if now is None else now
+        with self._lock:
+            entries = queue.next_reviews(limit)
+            dues = np.array([due for due, _ in entries], dtype=np.int64)
+            ids = np.array([skill_id for _, skill_id in entries], dtype=np.int64)
+            intervals, easiness = queue.interval[ids], queue.easiness[ids]
+            names = [queue.index.names[skill_id] for skill_id in ids.tolist()]
+        return self._describe(names, dues, intervals, easiness, now)
+
+    def class_due(self, user_ids: Iterable[str], limit: int = 5,
+                  now: Optional[float] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Due reviews for a whole class in one vectorized pass
+
+        Every student's scheduled skills are gathered into flat arrays,
+        filtered to those due by `now` and sorted by (student, due time);
+        the first `limit` per student are returned, most overdue first.
+        """
+        now = time.time() if now is None else now
+        user_ids = list(user_ids)
+        result: Dict[str, List[Dict[str, Any]]] = {user_id: [] for user_id in user_ids}
+        queues = [self._queues.get(user_id) for user_id in user_ids]
+        present = [k for k, queue in enumerate(queues) if queue is not None]
+        if not present:
+            return result
+
+        parts = {'due': [], 'interval': [], 'easiness': []}
+        names = []
+        with self._lock:
+            for k in present:
+                queue = queues[k]
+                ids = queue.scheduled
+                skill_names = queue.index.names
+                names.append([skill_names[skill_id] for skill_id in ids.tolist()])
+                for name in parts:
+                    parts[name].append(getattr(queue, name)[ids])
+        owner = np.repeat(np.array(present, dtype=np.int64), [len(queue_names) for queue_names in names])
+        columns = {name: np.concatenate(values) for name, values in parts.items()}
+        names = [name for queue_names in names for name in queue_names]
+
+        # Due cards sorted by (student, due time), first `limit` of each student
+        is_due = columns['due'] <= now
+        order = np.flatnonzero(is_due)[np.lexsort((columns['due'][is_due], owner[is_due]))]
+        owner = owner[order]
+        position = np.arange(len(owner)) - np.searchsorted(owner, owner)
+        order, owner = order[position < limit], owner[position < limit]
+
+        entries = self._describe([names[k] for k in order.tolist()], columns['due'][order],
+                                 columns['interval'][order], columns['easiness'][order], now)
+        for k, entry in zip(owner.tolist(), entries):
+            result[user_ids[k]].append(entry)
+        return result
+
+    def drop(self, user_id: str) -> bool:
+        with self._lock:
+            return self._queues.pop(user_id, None) is not None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            queues = list(self._queues.values())
+        return {
+            'students': len(queues),
+            'cards': int(sum(len(queue.scheduled) for queue in queues))
+        }
+
+    # Persistence
+
+    def save(self, path: str):
+        """
+        Write every queue to one compressed .npz
+
+        Cards are stored as flat columns (int32 skill, float32 easiness and
+        interval, int16 repetitions, int64 due) with per-student offsets;
+        skill names are stored once. Heaps are rebuilt on load. The file
+        is written to `path` exactly (no .npz suffix added) through a
+        temporary file and os.replace, so a crash never leaves it partial.
+        """
+        skills = SkillIndex()  # one numbering for the whole file
+        with self._lock:
+            users = list(self._queues)
+            columns = {name: [] for name in ('skill', 'easiness', 'interval', 'repetitions', 'due')}
+            for user_id in users:
+                queue = self._queues[user_id]
+                ids = queue.scheduled
+                skill_names = queue.index.names
+                columns['skill'].append(skills.intern_many(skill_names[k] for k in ids.tolist()).astype(np.int32))
+                for name in ('easiness', 'interval', 'repetitions', 'due'):
+                    columns[name].append(getattr(queue, name)[ids])
+            names = list(skills.names)
+
+        counts = [len(ids) for ids in columns['skill']]
+        dtypes = {'skill': np.int32, 'easiness': np.float32, 'interval': np.float32,
+                  'repetitions': np.int16, 'due': np.int64}
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(
+                f,
+                users=np.array(users, dtype=str),
+                offsets=np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+                skills=np.array(names, dtype=str),
+                **{name: np.concatenate(parts) if parts else np.zeros(0, dtype=dtypes[name])
+                   for name, parts in columns.items()}
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'ReviewScheduler':
+        scheduler = cls()
+        with np.load(path) as data:
+            names = data['skills'].tolist()
+            offsets = data['offsets']
+            saved_ids = data['skill']
+            columns = {name: data[name] for name in ('easiness', 'interval', 'repetitions', 'due')}
+            for k, user_id in enumerate(data['users'].tolist()):
+                lo, hi = offsets[k], offsets[k + 1]
+                # Saved skill numbers -> ids in the student's own index
+                queue = ReviewQueue(capacity=hi - lo)
+                ids = queue.index.intern_many(names[j] for j in saved_ids[lo:hi].tolist())
+                for name, values in columns.items():
+                    getattr(queue, name)[ids] = values[lo:hi]
+                queue._rebuild_heap()
+                scheduler._queues[user_id] = queue
+        return scheduler
@@ -0,0 +1,151 @@
+"""
+NeuroLearn Session Fatigue State
+Incremental fatigue tracking for live sessions
+
+PerformancePredictor.calculate_optimal_break_time reads the session's
+whole focus timeline on every call, and the timeline grows all session
+long. FatigueTracker keeps, per live session, only what that calculation
+needs:
+
+- the sum and count of the first `initial_window` focus samples
+- a ring buffer of the last `recent_window` samples
+- cumulative idle seconds and error count
+- the session start and latest update time
+
+Ingesting a sample and computing the break recommendation are both O(1),
+so a poll at minute 90 costs the same as one at minute 1. Malformed
+samples (not an object, non-numeric level) are skipped one by one. A
+session with no activity for idle_ttl seconds is dropped automatically.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, Optional
+
+from .session_registry import SessionRegistry
+
+
+def focus_level(sample: Any) -> Optional[float]:
+    """Level of a focusLevelTimeline entry (default 5), or None if it is malformed"""
+    if not isinstance(sample, dict):
+        return None
+    try:
+        level = float(sample.get('level', 5))
+    except (TypeError, ValueError):
+        return None
+    return None if level != level else level  # NaN
+
+
+class SessionFatigue:
+    """Running focus and activity statistics for one live session"""
+
+    __slots__ = ('initial_sum', 'initial_count', 'recent', 'samples', 'idle_seconds',
+                 'error_count', 'started', 'last_seen', 'duration')
+
+    def __init__(self, started: float, recent_window: int = 3):
+        self.initial_sum = 0.0
+        self.initial_count = 0
+        self.recent = deque(maxlen=recent_window)
+        self.samples = 0
+        self.idle_seconds = 0.0
+        self.error_count = 0
+        self.started = started
+        self.last_seen = started
+        self.duration = None  # client-reported duration in seconds, if any
+
+    def add_focus(self, level: float, initial_window: int = 3):
+        if self.initial_count < initial_window:
+            self.initial_sum += level
+            self.initial_count += 1
+        self.recent.append(level)
+        self.samples += 1
+
+    @property
+    def initial_focus(self) -> Optional[float]:
+        return self.initial_sum / self.initial_count if self.initial_count else None
+
+    @property
+    def recent_focus(self) -> Optional[float]:
+        return sum(self.recent) / len(self.recent) if self.recent else None
+
+    def session_seconds(self) -> float:
+        return self.duration if self.duration is not None else self.last_seen - self.started
+
+
+class FatigueTracker:
+    """Per-session fatigue state for many concurrent sessions"""
+
+    def __init__(self, idle_ttl: float = 1800, initial_window: int = 3, recent_window: int = 3):
+        """
+        Args:
+            idle_ttl: Drop sessions with no updates for this many seconds
+            initial_window: Focus samples averaged as the session's starting focus
+            recent_window: Focus samples averaged as its current focus
+        """
+        self.initial_window = initial_window
+        self.recent_window = recent_window
+        self._sessions = SessionRegistry(idle_ttl)
+        self._lock = threading.Lock()
+        self.samples_processed = 0
+        self.samples_skipped = 0
+
+    def ingest(self, session_id: str, focus_samples: Iterable[Dict] = (), idle_seconds: float = 0,
+               errors: int = 0, duration: Optional[float] = None) -> SessionFatigue:
+        """
+        Add what happened since the session's previous update
+
+        Args:
+            session_id: Live session identifier
+            focus_samples: New focusLevelTimeline entries ({'level', 'timestamp'}),
+                oldest first; malformed ones are skipped
+            idle_seconds: Idle time since the previous update
+            errors: Errors since the previous update
+            duration: Client-reported session duration in seconds (default:
+                time since the session's first update)
+
+        Returns:
+            The session's updated state
+        """
+        wall = time.time()
+        with self._lock:
+            self._sessions.maybe_sweep(wall)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions.add(session_id, SessionFatigue(wall, self.recent_window))
+
+            for sample in focus_samples:
+                level = focus_level(sample)
+                if level is None:
+                    self.samples_skipped += 1
+                    continue
+                session.add_focus(level, self.initial_window)
+                self.samples_processed += 1
+            session.idle_seconds += idle_seconds or 0
+            session.error_count += errors or 0
+            session.last_seen = wall
+            if duration is not None:
+                session.duration = float(duration)
+            return session
+
+    def get(self, session_id: str) -> Optional[SessionFatigue]:
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def end(self, session_id: str) -> bool:
+        """Forget a finished session. Returns True if it existed."""
+        with self._lock:
+            return self._sessions.end(session_id)
+
+    def expire_idle(self, now: Optional[float] = None) -> int:
+        """Drop sessions with no updates for idle_ttl seconds; returns how many"""
+        with self._lock:
+            return self._sessions.expire(time.time() if now is None else now)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._sessions.stats(),
+                'samplesProcessed': self.samples_processed,
+                'samplesSkipped': self.samples_skipped
+            }
@@ -0,0 +1,69 @@
+"""
+NeuroLearn Session Registry
+Live-session map with idle expiry
+
+The per-session trackers (StruggleStream, FatigueTracker) keep one state
+object per live session and drop sessions nobody ended explicitly once
+they have been idle for idle_ttl seconds. SessionRegistry holds that map
+and the expiry: states carry a `last_seen` wall time, and sweeps run at
+most once per sweep_interval. Client timestamps never drive expiry, so
+no client can push the clock forward and drop other sessions.
+
+The registry takes no lock of its own; the owning tracker calls it with
+its lock held.
+"""
+
+from typing import Any, Dict, Optional
+
+
+class SessionRegistry:
+    """session id -> state with last_seen, expired after idle_ttl seconds"""
+
+    def __init__(self, idle_ttl: float = 1800, sweep_interval: float = 60):
+        """
+        Args:
+            idle_ttl: Drop sessions whose last_seen is this many seconds old
+            sweep_interval: Least time between automatic sweeps
+        """
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self._sessions: Dict[str, Any] = {}
+        self.expired = 0
+        self._next_sweep = None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Optional[Any]:
+        return self._sessions.get(session_id)
+
+    def add(self, session_id: str, session: Any) -> Any:
+        self._sessions[session_id] = session
+        return session
+
+    def end(self, session_id: str) -> bool:
+        """Forget a finished session. Returns True if it existed."""
+        return self._sessions.pop(session_id, None) is not None
+
+    def expire(self, now: float) -> int:
+        """Drop sessions idle for more than idle_ttl at `now`; returns how many"""
+        stale = [sid for sid, s in self._sessions.items() if now - s.last_seen > self.idle_ttl]
+        for session_id in stale:
+            del self._sessions[session_id]
+        self.expired += len(stale)
+        return len(stale)
+
+    def maybe_sweep(self, now: float):
+        """Expire idle sessions if sweep_interval has passed since the last sweep"""
+        if self._next_sweep is None:
+            self._next_sweep = now + self.sweep_interval
+        elif now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_interval
+            self.expire(now)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'sessions': len(self._sessions),
+            'idleTtl': self.idle_ttl,
+            'expired': self.expired
+        }
@@ -0,0 +1,281 @@
+"""
+NeuroLearn Skill Mastery Arrays
+Compact array-backed skill mastery state
+
+Skill names are interned to integer ids (SkillIndex) and one student's
+mastery is held in parallel NumPy arrays indexed by skill id: float32
+mastery and average score, int32 practice counts and int64 last-practiced
+epoch seconds (int32 would overflow in 2038). Each SkillMasteryArrays
+gets its own index unless one is passed in, so a request's arrays are
+sized to the skills it names rather than every skill any client has sent.
+Updates for many interactions are applied in one vectorized pass, and
+recommendations use argpartition to pick the top k without sorting the
+whole catalog. The nested-dict format the API uses is produced only at
+the edge, by from_dict() and to_dict().
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+PRIORITY_NAMES = ('low', 'medium', 'high')  # index = priority rank
+PRIORITY_REASONS = {
+    'high': 'Low mastery - needs focused practice',
+    'medium': 'Approaching mastery - keep practicing',
+    'refresh': 'Needs refresher to maintain mastery',
+    'low': 'Well mastered'
+}
+
+
+def _epoch(value: Any, default: float) -> float:
+    """Epoch seconds from a datetime, ISO-8601 string or number"""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return value / 1000.0 if value > 1e11 else float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return default
+    return default
+
+
+def interaction_skills(interaction: Dict, content_fallback: bool = False) -> List[str]:
+    """Skill names an interaction practiced: its 'skills' tags, else (with content_fallback) its contentId"""
+    tags = interaction.get('skills')
+    if tags or not content_fallback:
+        return tags or []
+    return [interaction['contentId']] if interaction.get('contentId') else []
+
+
+def skill_scores(interactions: Iterable[Dict], content_fallback: bool = False):
+    """Flatten interactions (oldest first) to parallel lists of skill names and 0-1 scores"""
+    skills, scores = [], []
+    add_skills, add_scores = skills.extend, scores.extend
+    for interaction in interactions:
+        tags = interaction_skills(interaction, content_fallback)
+        if tags:
+            score = (interaction.get('performance') or {}).get('score', 0) / 100  # Normalize to 0-1
+            add_skills(tags)
+            add_scores([score] * len(tags))
+    return skills, scores
+
+
+def group_occurrences(keys: np.ndarray):
+    """
+    Stable grouping of integer keys
+
+    Returns:
+        (order, unique, starts, counts, group, position): `order` sorts the
+        occurrences by key keeping their original order within a key;
+        after sorting, occurrence i belongs to group[i] (unique[group[i]])
+        and is its position[i]-th occurrence, starting at starts[group[i]]
+    """
+    order = np.argsort(keys, kind='stable')
+    unique, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+    group = np.repeat(np.arange(len(unique)), counts)
+    position = np.arange(len(order)) - starts[group]
+    return order, unique, starts, counts, group, position
+
+
+class SkillIndex:
+    """Thread-safe interning table: skill name <-> dense integer id"""
+
+    def __init__(self):
+        self._ids = {}
+        self.names = []
+        self._lock = threading.Lock()
+
+    def intern(self, name: str) -> int:
+        skill_id = self._ids.get(name)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._ids.get(name)
+                if skill_id is None:
+                    skill_id = self._ids[name] = len(self.names)
+                    self.names.append(name)
+        return skill_id
+
+    def lookup_many(self, names: Iterable[str]) -> np.ndarray:
+        """Ids of already interned names (-1 for unknown ones); nothing is added"""
+        ids = self._ids
+        names = list(names)
+        return np.fromiter((ids.get(name, -1) for name in names), dtype=np.int64, count=len(names))
+
+    def intern_many(self, names: Iterable[str]) -> np.ndarray:
+        names = list(names)
+        try:
+            return np.array([self._ids[name] for name in names], dtype=np.int64)
+        except KeyError:  # some names are new
+            return np.fromiter((self.intern(name) for name in names), dtype=np.int64, count=len(names))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class SkillMasteryArrays:
+    """One student's mastery for every skill in a SkillIndex"""
+
+    def __init__(self, index: Optional[SkillIndex] = None, capacity: int = 0):
+        """
+        Args:
+            index: Skill interning table; pass one to share skill ids
+                between students (default: a new one for these arrays)
+            capacity: Skills to allocate for up front
+        """
+        self.index = index if index is not None else SkillIndex()
+        self.mastery = np.zeros(capacity, dtype=np.float32)
+        self.average_score = np.zeros(capacity, dtype=np.float32)
+        self.practice_count = np.zeros(capacity, dtype=np.int32)
+        self.last_practiced = np.zeros(capacity, dtype=np.int64)
+
+    def _ensure_capacity(self, size: int):
+        if size <= len(self.mastery):
+            return
+        capacity = max(size, 2 * len(self.mastery), 16)
+        for name in ('mastery', 'average_score', 'practice_count', 'last_practiced'):
+            old = getattr(self, name)
+            grown = np.zeros(capacity, dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, name, grown)
+
+    @property
+    def practiced(self) -> np.ndarray:
+        """Ids of skills this student has practiced"""
+        return np.flatnonzero(self.practice_count[:len(self.index)] > 0)
+
+    # Conversion at the API edge
+
+    @classmethod
+    def from_dict(cls, mastery: Dict[str, Dict], index: Optional[SkillIndex] = None) -> 'SkillMasteryArrays':
+        """Build from the {skill: {masteryLevel, practiceCount, averageScore, lastPracticed}} format"""
+        arrays = cls(index)
+        if not mastery:
+            return arrays
+        ids = arrays.index.intern_many(mastery.keys())
+        arrays._ensure_capacity(len(arrays.index))
+        now = time.time()
+        entries = list(mastery.values())
+        arrays.mastery[ids] = [e.get('masteryLevel', 0) for e in entries]
+        arrays.average_score[ids] = [e.get('averageScore', e.get('masteryLevel', 0)) for e in entries]
+        arrays.practice_count[ids] = [max(1, int(e.get('practiceCount', 1))) for e in entries]
+        arrays.last_practiced[ids] = [int(_epoch(e.get('lastPracticed'), now)) for e in entries]
+        return arrays
+
+    def to_dict(self) -> Dict[str, Dict]:
+        """Back to the nested-dict format (only practiced skills)"""
+        ids = self.practiced
+        names = self.index.names
+        mastery = np.round(self.mastery[ids].astype(np.float64), 6).tolist()  # float32 precision
+        average = np.round(self.average_score[ids].astype(np.float64), 6).tolist()
+        counts = self.practice_count[ids].tolist()
+        last = self.last_practiced[ids].tolist()
+        # Batched updates share one timestamp, so build each datetime once
+        stamps = {epoch: datetime.fromtimestamp(epoch) for epoch in set(last)}
+        return {
+            names[skill_id]: {
+                'masteryLevel': mastery[k],
+                'practiceCount': counts[k],
+                'averageScore': average[k],
+                'lastPracticed': stamps[last[k]]
+            }
+            for k, skill_id in enumerate(ids.tolist())
+        }
+
+    # Updates
+
+    def update_many(self, interactions: List[Dict], alpha: float = 0.3, now: Optional[float] = None):
+        """
+        Apply many interactions (oldest first) in one vectorized pass
+
+        Equivalent to applying SkillMasteryTracker's per-interaction EMA
+        update to each interaction in order: a skill's first score sets
+        its mastery, later scores move it by alpha.
+
+        Args:
+            interactions: Dicts with 'skills' (list of names) and 'performance.score' (0-100)
+            alpha: EMA learning rate
+            now: Epoch seconds to record as lastPracticed (default: current time)
+        """
+        skills, scores = skill_scores(interactions)
+        if not skills:
+            return
+
+        ids = self.index.intern_many(skills)
+        self._ensure_capacity(len(self.index))
+        scores = np.asarray(scores, dtype=np.float64)
+
+        # Group occurrences by skill, keeping their order within each skill
+        order, unique, starts, counts, group, position = group_occurrences(ids)
+        scores = scores[order]
+
+        is_new = self.practice_count[unique] == 0
+        # A new skill's first score is its starting mastery rather than an EMA step
+        ema_step = ~(is_new[group] & (position == 0))
+        steps = counts - is_new.astype(np.int64)
+        remaining = (steps[group] - 1) - (position - is_new[group])  # later EMA steps in the same skill
+        weights = np.where(ema_step, alpha * (1 - alpha) ** remaining, 0.0)
+
+        start_mastery = np.where(is_new, scores[starts], self.mastery[unique].astype(np.float64))
+        mastery = start_mastery * (1 - alpha) ** steps + np.bincount(group, weights=weights * scores)
+        # Existing skills are capped at 1.0 after each EMA step; a brand-new single score is not
+        self.mastery[unique] = np.where(steps > 0, np.minimum(1.0, mastery), mastery)
+        self.record_practice(unique, counts, np.bincount(group, weights=scores), now)
+
+    def record_practice(self, skill_ids: np.ndarray, counts: np.ndarray, score_sums: np.ndarray,
+                        now: Optional[float] = None):
+        """Add practice counts and scores (0-1) for unique skill ids; mastery is left to the caller"""
+        old_count = self.practice_count[skill_ids].astype(np.int64)
+        old_total = self.average_score[skill_ids].astype(np.float64) * old_count
+        new_count = old_count + counts
+
+        self.average_score[skill_ids] = (old_total + score_sums) / new_count
+        self.practice_count[skill_ids] = new_count
+        self.last_practiced[skill_ids] = int(time.time() if now is None else now)
+
+    # Recommendations
+
+    def recommendations(self, k: int = 10, mastery_threshold: float = 0.75,
+                        now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Top-k skills to practice, highest priority first, then lowest mastery
+
+        Ties on rounded mastery keep skill id (first-seen) order, as the
+        stable dict-based sort kept insertion order.
+        """
+        ids = self.practiced
+        if not len(ids):
+            return []
+        now = time.time() if now is None else now
+        mastery = self.mastery[ids].astype(np.float64)
+        days_since = np.maximum(0, (now - self.last_practiced[ids]) // 86400).astype(np.int64)
+
+        needs_refresh = (mastery >= mastery_threshold) & (days_since > 7)
+        priority = np.where(mastery < 0.5, 2, np.where((mastery < mastery_threshold) | needs_refresh, 1, 0))
+        rounded = np.round(mastery, 2)
+        cents = np.clip(np.rint(rounded * 100), 0, 1000).astype(np.int64)
+
+        # One integer key: priority, then lower rounded mastery, then earlier skill
+        n = len(ids)
+        key = (priority * 2000 + (1000 - cents)) * n + (n - 1 - np.arange(n))
+        top = np.argpartition(-key, k - 1)[:k] if n > k else np.arange(n)
+        top = top[np.argsort(-key[top])]
+
+        names = self.index.names
+        results = []
+        for skill_id, rank, level, refresh, days in zip(
+                ids[top].tolist(), priority[top].tolist(), rounded[top].tolist(),
+                needs_refresh[top].tolist(), days_since[top].tolist()):
+            name = PRIORITY_NAMES[rank]
+            results.append({
+                'skill': names[skill_id],
+                'masteryLevel': level,
+                'priority': name,
+                'reason': PRIORITY_REASONS['refresh' if refresh else name],
+                'daysSincePractice': days
+            })
+        return results
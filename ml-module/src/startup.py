@@ -0,0 +1,108 @@
+"""
+NeuroLearn Startup Helpers
+Deferred loading and startup timing for the ML API
+
+LazyValue wraps anything expensive to build (modules that import numpy,
+pickled models) so it is created either eagerly at startup or on first
+use, and StartupTimer records how long each piece took.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+
+class StartupTimer:
+    """Records named startup phases and their wall-clock durations"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ready_at = None
+        self.phases = []
+        self._depth = threading.local()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as one phase (phases may nest)"""
+        depth = getattr(self._depth, 'value', 0)
+        entry = {'phase': name, 'seconds': 0.0, 'depth': depth, 'deferred': self.ready_at is not None}
+        self.phases.append(entry)
+        self._depth.value = depth + 1
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry['seconds'] = round(time.perf_counter() - begin, 4)
+            self._depth.value = depth
+
+    def mark_ready(self):
+        """Startup is finished; later phases are reported as deferred"""
+        self.ready_at = time.perf_counter()
+
+    def report(self) -> Dict[str, Any]:
+        """Startup breakdown as a JSON-friendly dict"""
+        total = (self.ready_at or time.perf_counter()) - self.started
+        return {
+            'totalSeconds': round(total, 4),
+            'phases': list(self.phases)
+        }
+
+    def format(self) -> str:
+        """Startup breakdown as a printable table"""
+        report = self.report()
+        lines = [f"Startup time: {report['totalSeconds'] * 1000:.1f} ms"]
+        for p in report['phases']:
+            tag = ' (deferred)' if p['deferred'] else ''
+            label = '  ' * p['depth'] + p['phase']
+            lines.append(f"  {label:<40s} {p['seconds'] * 1000:8.1f} ms{tag}")
+        return '\n'.join(lines)
+
+
+class LazyValue:
+    """Thread-safe value built once by a factory, eagerly or on first get()"""
+
+    def __init__(self, name: str, factory: Callable[[], Any],
+                 timer: Optional[StartupTimer] = None):
+        self.name = name
+        self._factory = factory
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._value = None
+        self.loaded = False
+
+    def get(self) -> Any:
+        if not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    if self._timer is not None:
+                        with self._timer.phase(self.name):
+                            self._value = self._factory()
+                    else:
+                        self._value = self._factory()
+                    self.loaded = True
+        return self._value
+
+    def peek(self) -> Any:
+        """Current value without triggering a load (None if not loaded yet)"""
+        return self._value
+
+
+def load_model(path: str, mmap: bool = True) -> Any:
+    """
+    Load a joblib-pickled model, memory-mapping its arrays when possible
+
+    With mmap_mode='r' large numpy arrays stay in the file and are paged in
+    on demand (and shared between forked workers). Estimators that copy
+    their arrays while unpickling, like sklearn's tree structures, still
+    load correctly but see less benefit.
+    """
+    import joblib
+
+    return joblib.load(path, mmap_mode='r' if mmap else None)
+
+
+def preload(values: List[LazyValue]):
+    """Build every lazy value now (eager startup mode)"""
+    for value in values:
+        value.get()
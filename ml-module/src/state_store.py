@@ -0,0 +1,177 @@
+"""
+NeuroLearn User State Store
+Server-side per-user interaction history
+
+Keeps a bounded window of recent interactions per user so clients can
+append single interactions instead of re-sending whole histories, and
+memoizes per-user results until the next append. Users are evicted in
+least-recently-used order once the store is full.
+
+Trackers are incremental per-user statistics (e.g. OnlinePerformanceState)
+fed every appended interaction, so reading them costs O(1) instead of a
+pass over the stored history. A tracker is built by factory(max_history)
+and must provide push(interaction) and reset(), keeping its own window of
+max_history interactions in step with the stored history.
+"""
+
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class UserState:
+    """Bounded interaction window plus memoized results for one user"""
+
+    __slots__ = ('history', 'results', 'version', 'trackers')
+
+    def __init__(self, max_history: int, trackers: Optional[Dict[str, Any]] = None):
+        self.history = deque(maxlen=max_history)
+        self.results = {}
+        self.version = 0
+        self.trackers = trackers or {}
+
+    def extend(self, interactions: Iterable[Dict]):
+        """Append interactions to the window and every tracker"""
+        for interaction in interactions:
+            self.history.append(interaction)
+            for tracker in self.trackers.values():
+                tracker.push(interaction)
+
+    def invalidate(self):
+        """Drop memoized results after the history changed"""
+        self.results.clear()
+        self.version += 1
+
+
+class UserStateStore:
+    """Thread-safe LRU map of userId -> UserState"""
+
+    def __init__(self, max_users: int = 10000, max_history: int = 50,
+                 trackers: Optional[Dict[str, Callable[[int], Any]]] = None):
+        self.max_users = max_users
+        self.max_history = max_history
+        self.tracker_factories = trackers or {}
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _touch(self, user_id: str, create: bool = False) -> Optional[UserState]:
+        """Look up a user's state and mark it most recently used (lock held)"""
+        state = self._states.get(user_id)
+        if state is not None:
+            self._states.move_to_end(user_id)
+        elif create:
+            trackers = {name: factory(self.max_history) for name, factory in self.tracker_factories.items()}
+            state = UserState(self.max_history, trackers)
+            self._states[user_id] = state
+            if len(self._states) > self.max_users:
+                self._states.popitem(last=False)
+                self.evictions += 1
+        return state
+
+    def append(self, user_id: str, interactions: Iterable[Dict]) -> Optional[int]:
+        """
+        Append new interactions to a user's window
+
+        An unknown user (never seeded, or evicted) gets no state: a window
+        holding only the new interactions would pass for their full history,
+        so the caller must seed it instead.
+
+        Args:
+            user_id: User identifier
+            interactions: New interactions, oldest first
+
+        Returns:
+            Size of the user's stored history after the append, or None if
+            the user is unknown
+        """
+        with self._lock:
+            state = self._touch(user_id)
+            if state is None:
+                return None
+            state.extend(interactions)
+            state.invalidate()
+            return len(state.history)
+
+    def seed(self, user_id: str, interactions: List[Dict]) -> int:
+        """Replace a user's stored history (e.g. after an ML service restart)"""
+        with self._lock:
+            state = self._touch(user_id, create=True)
+            state.history.clear()
+            for tracker in state.trackers.values():
+                tracker.reset()
+            state.extend(interactions[-self.max_history:])
+            state.invalidate()
+            return len(state.history)
+
+    def get_history(self, user_id: str) -> Optional[List[Dict]]:
+        """Return a copy of the stored history, or None if the user is unknown"""
+        with self._lock:
+            state = self._touch(user_id)
+            return list(state.history) if state is not None else None
+
+    def cached(self, user_id: str, key: str,
+               compute: Callable[[List[Dict]], Any]) -> Optional[Any]:
+        """
+        Return a memoized result for a user's stored history
+
+        The result is computed once per history version; any append or
+        seed invalidates it.
+
+        Args:
+            user_id: User identifier
+            key: Name of the memoized computation
+            compute: Function of the stored history
+
+        Returns:
+            Result of compute, or None if the user is unknown
+        """
+        with self._lock:
+            state = self._touch(user_id)
+            if state is None:
+                return None
+            if key in state.results:
+                return state.results[key]
+            history = list(state.history)
+            version = state.version
+
+        result = compute(history)
+
+        with self._lock:
+            # Skip memoizing if the history changed while computing
+            if state.version == version:
+                state.results[key] = result
+        return result
+
+    def read_tracker(self, user_id: str, name: str, read: Callable[[Any], Any]) -> Optional[Any]:
+        """
+        Read a user's tracker under the store lock
+
+        Args:
+            user_id: User identifier
+            name: Tracker name given to the store
+            read: Function of the tracker (must not keep a reference to it)
+
+        Returns:
+            Result of read, or None if the user is unknown
+        """
+        with self._lock:
+            state = self._touch(user_id)
+            if state is None:
+                return None
+            return read(state.trackers[name])
+
+    def drop(self, user_id: str) -> bool:
+        """Forget a user's state. Returns True if it existed."""
+        with self._lock:
+            return self._states.pop(user_id, None) is not None
+
+    def stats(self) -> Dict[str, int]:
+        """Store occupancy for health reporting"""
+        with self._lock:
+            return {
+                'users': len(self._states),
+                'maxUsers': self.max_users,
+                'maxHistory': self.max_history,
+                'evictions': self.evictions
+            }
@@ -0,0 +1,328 @@
+"""
+NeuroLearn Streaming Struggle Detector
+Real-time struggle detection over raw session events
+
+detect_struggle scores a snapshot of counters the client has already
+aggregated. StruggleStream consumes the raw events of live sessions
+(pause, rewind, error, help, focus samples) and keeps time-windowed
+counts per session in fixed-size ring buffers of time buckets. Every
+event is O(1): expired buckets are subtracted from running totals as
+the window slides (only buckets that hold data are visited). Memory per
+session is bounded by the bucket count, not by how many events arrive.
+
+The struggle score uses the same indicators, weights and level
+thresholds as PerformancePredictor.detect_struggle, applied to the
+sliding window. A change is emitted whenever a session's struggle
+level changes.
+
+Malformed events (unparseable timestamp, non-numeric focus value,
+unknown type) are skipped one by one; the rest of the batch still counts.
+Each session's window runs on its own clock, the latest of its event
+times, with event times clamped to at most MAX_CLOCK_SKEW seconds past
+the server's wall clock. Idle sessions are expired by wall time since
+their last update, so neither replayed nor skewed client clocks (one
+session's or another's) can drop live sessions.
+"""
+
+import threading
+import time
+from array import array
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .session_registry import SessionRegistry
+
+# Event type -> ring index (focus keeps a sum and a sample count)
+EVENT_TYPES = ('pause', 'rewind', 'error', 'help')
+_PAUSE, _REWIND, _ERROR, _HELP, _FOCUS_SUM, _FOCUS_COUNT = range(6)
+_CHANNELS = 6
+_EVENT_INDEX = {name: index for index, name in enumerate(EVENT_TYPES)}
+_EMPTY_BUCKET = array('d', [0.0] * _CHANNELS)
+
+# Most seconds an event may be stamped ahead of the server's clock
+MAX_CLOCK_SKEW = 60
+
+# (indicator, weight) as in PerformancePredictor.detect_struggle
+INDICATOR_WEIGHTS = {
+    'high_pause_frequency': 0.2,
+    'multiple_rewinds': 0.2,
+    'frequent_help_requests': 0.25,
+    'high_error_rate': 0.25,
+    'low_focus': 0.15,
+    'excessive_time': 0.15
+}
+
+
+def event_time(value: Any) -> Optional[float]:
+    """Event timestamp in epoch seconds (accepts seconds, milliseconds or ISO-8601); None if unparseable"""
+    if value is None:
+        return time.time()
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        if value != value:  # NaN
+            return None
+        return value / 1000.0 if value > 1e11 else float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def parse_event(event: Any) -> Optional[Tuple[float, int, float]]:
+    """(epoch seconds, channel, value) of a raw event, or None if it is malformed or of an unknown type"""
+    if not isinstance(event, dict):
+        return None
+    kind = event.get('type')
+    if kind == 'focus':
+        value = event.get('value')
+        try:
+            channel, value = _FOCUS_SUM, 5.0 if value is None else float(value)
+        except (TypeError, ValueError):
+            return None
+        if value != value:
+            return None
+    elif kind in _EVENT_INDEX:
+        channel, value = _EVENT_INDEX[kind], 1.0
+    else:
+        return None
+    now = event_time(event.get('timestamp'))
+    return None if now is None else (now, channel, value)
+
+
+def struggle_level(score: float) -> str:
+    if score >= 0.7:
+        return 'high'
+    if score >= 0.4:
+        return 'moderate'
+    return 'low'
+
+
+class SessionWindow:
+    """Ring buffer of per-bucket event counts for one live session"""
+
+    __slots__ = ('buckets', 'occupied', 'totals', 'head', 'started', 'clock', 'last_seen',
+                 'expected_duration', 'level', 'score')
+
+    def __init__(self, n_buckets: int, started: float, expected_duration: float, wall: float):
+        # Fixed-size ring of unboxed doubles, bucket-major: [slot * _CHANNELS + channel]
+        self.buckets = array('d', bytes(8 * n_buckets * _CHANNELS))
+        self.occupied = deque()  # absolute indices of non-empty buckets, oldest first
+        self.totals = [0.0] * _CHANNELS
+        self.head = None  # absolute index of the newest bucket
+        self.started = started
+        self.clock = started  # latest event time
+        self.last_seen = wall  # wall time of the latest update (idle expiry)
+        self.expected_duration = expected_duration
+        self.level = 'low'
+        self.score = 0.0
+
+
+class StruggleStream:
+    """Sliding-window struggle detection for many concurrent sessions"""
+
+    def __init__(self, window_seconds: float = 300, bucket_seconds: float = 10,
+                 idle_ttl: float = 1800, default_expected_duration: float = 600,
+                 struggle_threshold: float = 0.6):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = max(1, int(round(window_seconds / bucket_seconds)))
+        self.default_expected_duration = default_expected_duration
+        self.struggle_threshold = struggle_threshold
+        self._sessions = SessionRegistry(idle_ttl)
+        self._lock = threading.Lock()
+        self.events_processed = 0
+        self.events_skipped = 0
+
+    # Window maintenance
+
+    def _advance(self, session: SessionWindow, bucket: int):
+        """Slide the window so `bucket` is the newest, expiring older buckets"""
+        if session.head is None or bucket > session.head:
+            session.head = bucket
+        # Only buckets that hold data need clearing
+        occupied, oldest = session.occupied, bucket - self.n_buckets
+        while occupied and occupied[0] <= oldest:
+            base = (occupied.popleft() % self.n_buckets) * _CHANNELS
+            buckets, totals = session.buckets, session.totals
+            for channel in range(_CHANNELS):
+                totals[channel] -= buckets[base + channel]
+            buckets[base:base + _CHANNELS] = _EMPTY_BUCKET
+
+    def _add(self, session: SessionWindow, bucket: int, channel: int, value: float) -> bool:
+        """Add to a bucket still inside the window (False if it is too old)"""
+        if session.head is None or bucket > session.head:
+            self._advance(session, bucket)
+        elif bucket <= session.head - self.n_buckets:
+            return False
+
+        occupied = session.occupied
+        if not occupied or bucket > occupied[-1]:
+            occupied.append(bucket)
+        elif bucket not in occupied:  # late event for an empty older bucket (rare)
+            position = len(occupied)
+            while position and occupied[position - 1] > bucket:
+                position -= 1
+            occupied.insert(position, bucket)
+
+        session.buckets[(bucket % self.n_buckets) * _CHANNELS + channel] += value
+        session.totals[channel] += value
+        return True
+
+    # Scoring
+
+    def _indicators(self, session: SessionWindow, now: float) -> List[str]:
+        totals = session.totals
+        indicators = []
+        if totals[_PAUSE] > 5:
+            indicators.append('high_pause_frequency')
+        if totals[_REWIND] > 3:
+            indicators.append('multiple_rewinds')
+        if totals[_HELP] > 2:
+            indicators.append('frequent_help_requests')
+        if totals[_ERROR] > 3:
+            indicators.append('high_error_rate')
+        if totals[_FOCUS_COUNT] and totals[_FOCUS_SUM] / totals[_FOCUS_COUNT] < 4:
+            indicators.append('low_focus')
+        if now - session.started > session.expected_duration * 1.5:
+            indicators.append('excessive_time')
+        return indicators
+
+    def _rescore(self, session_id: str, session: SessionWindow, now: float) -> Optional[Dict[str, Any]]:
+        """Recompute the session's level; return a change record if it moved"""
+        indicators = self._indicators(session, now)
+        raw_score = 0.0
+        for indicator in indicators:  # same summation order as detect_struggle
+            raw_score += INDICATOR_WEIGHTS[indicator]
+        raw_score = min(1.0, raw_score)
+        level = struggle_level(raw_score)
+        score = session.score = round(raw_score, 2)
+        if level == session.level:
+            return None
+        previous, session.level = session.level, level
+        return {
+            'sessionId': session_id,
+            'previousLevel': previous,
+            'struggleLevel': level,
+            'struggleScore': score,
+            'isStruggling': score >= self.struggle_threshold,
+            'indicators': indicators,
+            'timestamp': now
+        }
+
+    # Public API
+
+    def process(self, session_id: str, events: Iterable[Dict],
+                expected_duration: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Feed raw events for one session
+
+        Args:
+            session_id: Live session identifier
+            events: Dicts with 'type' (pause, rewind, error, help or focus),
+                'timestamp' (epoch s/ms or ISO-8601, default now) and, for
+                focus samples, 'value' (focus level 1-10, default 5). Oldest
+                first. Malformed events are skipped.
+            expected_duration: Expected session length in seconds
+
+        Returns:
+            Struggle-level changes caused by these events, in order
+        """
+        changes = []
+        wall = time.time()
+        with self._lock:
+            self._sessions.maybe_sweep(wall)
+            session = self._sessions.get(session_id)
+            if session is not None and expected_duration:
+                session.expected_duration = expected_duration
+            for event in events:
+                parsed = parse_event(event)
+                if parsed is None:
+                    self.events_skipped += 1
+                    continue
+                now, channel, value = parsed
+                now = min(now, wall + MAX_CLOCK_SKEW)
+                if session is None:
+                    session = self._sessions.add(session_id, SessionWindow(
+                        self.n_buckets, now,
+                        expected_duration or self.default_expected_duration, wall
+                    ))
+
+                bucket = int(now // self.bucket_seconds)
+                if self._add(session, bucket, channel, value) and channel == _FOCUS_SUM:
+                    self._add(session, bucket, _FOCUS_COUNT, 1.0)
+
+                session.clock = max(session.clock, now)
+                session.last_seen = wall
+                self.events_processed += 1
+                change = self._rescore(session_id, session, session.clock)
+                if change is not None:
+                    changes.append(change)
+        return changes
+
+    def poll(self, session_id: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Slide a session's window to `now` and report its current state
+
+        Args:
+            session_id: Live session identifier
+            now: Epoch seconds (default: the session's latest event time;
+                pass time.time() to let a quiet session's window drain).
+                Clamped like event times.
+
+        Returns:
+            Current level, score, indicators and window counts (plus
+            'change' if sliding the window changed the level), or None
+            for an unknown session
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            wall = time.time()
+            now = session.clock if now is None else max(min(now, wall + MAX_CLOCK_SKEW), session.clock)
+            session.clock, session.last_seen = now, wall
+            self._advance(session, int(now // self.bucket_seconds))
+            change = self._rescore(session_id, session, now)
+            totals = session.totals
+            state = {
+                'sessionId': session_id,
+                'struggleLevel': session.level,
+                'struggleScore': session.score,
+                'isStruggling': session.score >= self.struggle_threshold,
+                'indicators': self._indicators(session, now),
+                'windowSeconds': self.window_seconds,
+                'windowCounts': {
+                    'pause': int(totals[_PAUSE]),
+                    'rewind': int(totals[_REWIND]),
+                    'error': int(totals[_ERROR]),
+                    'help': int(totals[_HELP]),
+                    'focusSamples': int(totals[_FOCUS_COUNT])
+                },
+                'averageFocus': round(totals[_FOCUS_SUM] / totals[_FOCUS_COUNT], 2) if totals[_FOCUS_COUNT] else None,
+                'sessionSeconds': round(now - session.started, 1)
+            }
+        if change is not None:
+            state['change'] = change
+        return state
+
+    def end(self, session_id: str) -> bool:
+        """Forget a finished session. Returns True if it existed."""
+        with self._lock:
+            return self._sessions.end(session_id)
+
+    def expire_idle(self, now: Optional[float] = None) -> int:
+        """Drop sessions with no updates for idle_ttl seconds (wall time); returns how many"""
+        with self._lock:
+            return self._sessions.expire(time.time() if now is None else now)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._sessions.stats(),
+                'windowSeconds': self.window_seconds,
+                'bucketSeconds': self.bucket_seconds,
+                'eventsProcessed': self.events_processed,
+                'eventsSkipped': self.events_skipped
+            }
@@ -0,0 +1,124 @@
+"""
+NeuroLearn Timestamp Decoding
+Vectorized timestamp normalization for time-based features
+
+Interaction timestamps arrive as ISO-8601 strings (with or without a
+'Z' / +hh:mm suffix, or date-only), datetime objects, epoch seconds or
+milliseconds, or not at all. decode_timestamps turns a whole column of
+them into one int64 array of epoch microseconds in a single pass. Time-
+based features (hour of day, distinct study days, date ranges) all read
+that array. InteractionBatch caches it per request or batch.
+
+Values are wall-clock readings: a UTC offset is dropped rather than
+applied, so the hour and date are the ones written in the timestamp
+(as datetime.fromisoformat(...).hour and .date() give). Missing or
+unparseable values decode to MISSING.
+
+ISO strings, the common case, are parsed by NumPy's datetime64 parser
+in C (after stripping any offsets). Anything it rejects falls back to a
+per-value parse.
+"""
+
+import warnings
+from datetime import datetime, timedelta
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+MISSING = np.iinfo(np.int64).min  # same bit pattern as NaT
+US_PER_SECOND = 1_000_000
+US_PER_HOUR = 3600 * US_PER_SECOND
+US_PER_DAY = 24 * US_PER_HOUR
+
+_EPOCH = datetime(1970, 1, 1)
+_ONE_US = timedelta(microseconds=1)
+
+
+def _decode_one(value: Any) -> int:
+    """Epoch microseconds for one timestamp of any supported type"""
+    if value is None or value == '':
+        return MISSING
+    if isinstance(value, datetime):
+        return (value.replace(tzinfo=None) - _EPOCH) // _ONE_US
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if value != value:  # NaN
+            return MISSING
+        seconds = value / 1000.0 if abs(value) > 1e11 else value  # milliseconds
+        return int(round(seconds * US_PER_SECOND))
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return MISSING
+        return (parsed.replace(tzinfo=None) - _EPOCH) // _ONE_US
+    return MISSING
+
+
+def _strip_offset(value: str) -> str:
+    if value[-3:-2] == ':' and value[-6:-5] in ('+', '-') and len(value) > 10:
+        return value[:-6]
+    return value
+
+
+def _decode_strings(values: Sequence[str]) -> np.ndarray:
+    # NumPy warns on (and would apply) UTC offsets. JavaScript's toISOString
+    # always ends in 'Z'; every ISO date has two '-', so more (or any '+')
+    # means explicit offsets. Strip them all to keep wall-clock time.
+    joined = '\0'.join(values)
+    if 'Z' in joined and joined.count('\0') == len(values) - 1:
+        # In C, as the old per-value parse did: replace every 'Z'
+        values = joined.replace('Z', '').split('\0')
+    if '+' in joined or joined.count('-') > 2 * len(values):
+        values = [_strip_offset(v) for v in values]
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        try:
+            return np.array(values, dtype='datetime64[us]').view(np.int64)
+        except (ValueError, Warning):
+            pass
+    return np.fromiter((_decode_one(v) for v in values), dtype=np.int64, count=len(values))
+
+
+def decode_timestamps(values: Sequence[Any]) -> np.ndarray:
+    """
+    Decode a column of timestamps
+
+    Args:
+        values: ISO-8601 strings, datetimes, epoch seconds/milliseconds or None
+
+    Returns:
+        int64 epoch microseconds (wall clock), MISSING where absent or invalid
+    """
+    if not len(values):
+        return np.zeros(0, dtype=np.int64)
+    if set(map(type, values)) == {str}:
+        return _decode_strings(values)
+    others = [k for k, v in enumerate(values) if type(v) is not str]
+
+    # Mixed column: strings in one vectorized parse, everything else per value
+    out = np.empty(len(values), dtype=np.int64)
+    if len(others) < len(values):
+        strings = np.ones(len(values), dtype=bool)
+        strings[others] = False
+        out[strings] = _decode_strings([v for v in values if type(v) is str])
+    out[others] = [_decode_one(values[k]) for k in others]
+    return out
+
+
+def valid(epoch_us: np.ndarray) -> np.ndarray:
+    """Decoded values that are not MISSING"""
+    return epoch_us[epoch_us != MISSING]
+
+
+def hour_of_day(epoch_us: np.ndarray, default: Optional[int] = None) -> np.ndarray:
+    """Hour of day (0-23) of each value; `default` (current hour if None) where missing"""
+    hours = (epoch_us // US_PER_HOUR) % 24
+    missing = epoch_us == MISSING
+    if missing.any():
+        hours[missing] = datetime.now().hour if default is None else default
+    return hours
+
+
+def day_numbers(epoch_us: np.ndarray) -> np.ndarray:
+    """Calendar day index (days since 1970-01-01) of each valid value"""
+    return valid(epoch_us) // US_PER_DAY
@@ -0,0 +1,78 @@
+"""
+NeuroLearn Wire Format
+JSON and MessagePack codecs for the ML API
+
+JSON goes through orjson when it is installed (several times faster than
+the stdlib encoder on large interaction histories) and falls back to the
+json module otherwise. MessagePack is offered when the msgpack package is
+installed; clients opt in with Content-Type / Accept headers.
+
+Both encoders handle the types the ML code returns: NumPy scalars and
+arrays, datetimes and sets.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional binary encoding
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, 'application/x-msgpack', 'application/vnd.msgpack')
+
+_ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def _to_builtin(obj: Any) -> Any:
+    """Convert the non-JSON types the ML code produces"""
+    if hasattr(obj, 'tolist'):  # NumPy arrays and scalars
+        return obj.tolist()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    return str(obj)
+
+
+def json_dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    """Encode obj as compact UTF-8 JSON"""
+    if orjson is not None:
+        options = _ORJSON_OPTIONS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=_to_builtin, option=options)
+    return json.dumps(obj, default=_to_builtin, sort_keys=sort_keys, ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def json_loads(data: Any) -> Any:
+    """Decode JSON from bytes or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def msgpack_available() -> bool:
+    return msgpack is not None
+
+
+def msgpack_dumps(obj: Any) -> bytes:
+    """Encode obj as MessagePack"""
+    return msgpack.packb(obj, default=_to_builtin, use_bin_type=True, datetime=False)
+
+
+def msgpack_loads(data: bytes) -> Any:
+    """Decode MessagePack (maps with non-string keys are allowed)"""
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def is_msgpack(mimetype: Optional[str]) -> bool:
+    return bool(mimetype) and mimetype.lower() in MSGPACK_MIMETYPES
+
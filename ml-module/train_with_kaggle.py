@@ -13,6 +13,8 @@ from sklearn.metrics import mean_squared_error, r2_score
 import joblib
 import os
 
+from src.model_server import model_feature_vector, MODEL_FEATURE_NAMES
+
 def load_processed_data():
     """Load preprocessed Kaggle data"""
     print("\n" + "="*70)
@@ -36,23 +38,8 @@ def extract_features(interactions):
     labels_performance = []
     
     for interaction in interactions:
-        # Extract 12 features
-        feature_vector = [
-            interaction['duration'] / 3600,  # Convert to hours
-            interaction['completionRate'] / 100,
-            interaction['focusLevel'] / 10,
-            1.0,  # session_frequency (normalized)
-            1.0,  # content_variety (normalized)
-            interaction['performance']['score'] / 100,
-            0.8,  # emotional_stability (estimated)
-            1.0,  # learning_pace (normalized)
-            1.0,  # interaction_count (normalized)
-            interaction['features']['pauseFrequency'] / 20,
-            interaction['features']['revisitCount'] / 10,
-            interaction['performance']['hints'] / 20
-        ]
-        
-        features.append(feature_vector)
+        # Extract 12 features (shared with ml_api's model server)
+        features.append(model_feature_vector(interaction))
         
         # Labels
         if interaction['neurodiversityType']:
@@ -115,10 +102,7 @@ def train_neurodiversity_classifier(X, y):
     print(classification_report(y_test, y_pred, zero_division=0))
     
     # Feature importance
-    feature_names = ['duration', 'completion_rate', 'focus_level', 
-                     'session_freq', 'content_variety', 'performance',
-                     'emotional_stability', 'learning_pace', 'interaction_count',
-                     'pause_freq', 'revisit_rate', 'hint_usage']
+    feature_names = MODEL_FEATURE_NAMES
     
     print("\nTop 5 Most Important Features:")
     importances = clf.feature_importances_